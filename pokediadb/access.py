@@ -0,0 +1,418 @@
+"""Thread-safe read-only access to a generated pokédia database.
+
+The builders work with the global ``pokediadb.models.db``. Readers running in
+several threads instead use a ReadOnlyPool that opens its own read-only
+sqlite3 connections and never touches ``models.db``. A HotSwapPool follows
+the generations published by pokediadb.publish without restarting.
+
+"""
+
+import os
+import time
+import queue
+import sqlite3
+import threading
+import contextlib
+from urllib.request import pathname2url
+
+from pokediadb.publish import get_current
+
+
+# Put in the idle queue on close, wakes the threads waiting for a connection
+CLOSED = object()
+
+
+def get_uri(path, immutable=False):
+    """Get the read-only sqlite URI of a database file.
+
+    Args:
+        path (str): Path to the sqlite database file.
+        immutable (bool): If True, sqlite assumes that the file can't change
+            and skips every lock. Only use it for files that are never
+            rewritten in place.
+
+    Returns:
+        str: URI to give to sqlite3.connect with uri=True.
+
+    """
+    uri = "file:{}?mode=ro".format(pathname2url(os.path.abspath(path)))
+    if immutable:
+        uri += "&immutable=1"
+
+    return uri
+
+
+def enable_wal(path):
+    """Switch a database file to the WAL journal mode.
+
+    With WAL, readers are never blocked by a writer. The mode is stored in
+    the file, so it must be set once, before opening read-only connections.
+
+    Args:
+        path (str): Path to the sqlite database file.
+
+    Returns:
+        str: Journal mode of the database after the change.
+
+    """
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+    finally:
+        conn.close()
+
+
+class ReadOnlyPool(object):
+    """Pool of read-only connections shared by several threads.
+
+    A thread holds at most one connection at a time: nested calls to
+    connection() return the same one. Connections are created on demand up
+    to max_connections and reused afterwards.
+
+    Statements registered with prepare() are shared by every connection, so
+    each of them finds the statement in its sqlite3 statement cache.
+
+    Args:
+        path (str): Path to the sqlite database file.
+        max_connections (int): Maximum number of opened connections.
+        timeout (float): Seconds to wait for a free connection, None to wait
+            forever.
+        immutable (bool): Open the file with the immutable URI parameter.
+        cached_statements (int): Size of each connection's statement cache.
+
+    Raises:
+        FileNotFoundError: Raised if the database does not exist.
+
+    """
+
+    def __init__(self, path, max_connections=8, timeout=None, immutable=False,
+                 cached_statements=256):
+        if not os.path.isfile(path):
+            msg = "The database '{}' does not exist.".format(path)
+            raise FileNotFoundError(msg)
+
+        self.path = path
+        self.uri = get_uri(path, immutable)
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.cached_statements = cached_statements
+
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._created = 0
+        self._closed = False
+        self._statements = {}
+
+    def _connect(self):
+        conn = sqlite3.connect(
+            self.uri, uri=True, check_same_thread=False,
+            cached_statements=self.cached_statements
+        )
+        conn.execute("PRAGMA query_only=1")
+        return conn
+
+    def _take(self, conn):
+        if conn is CLOSED:
+            # Leave it for the other waiting threads
+            self._idle.put(CLOSED)
+            raise sqlite3.ProgrammingError("Cannot operate on a closed pool.")
+
+        return conn
+
+    def _acquire(self):
+        try:
+            return self._take(self._idle.get_nowait())
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            create = self._created < self.max_connections
+            if create:
+                self._created += 1
+
+        if create:
+            try:
+                return self._connect()
+            except sqlite3.Error:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+        try:
+            return self._take(self._idle.get(timeout=self.timeout))
+        except queue.Empty:
+            raise TimeoutError(
+                "No connection available to '{}' after {} seconds.".format(
+                    self.path, self.timeout
+                )
+            )
+
+    @contextlib.contextmanager
+    def connection(self):
+        """Borrow a connection for the current thread.
+
+        Yields:
+            sqlite3.Connection: Read-only connection.
+
+        Raises:
+            TimeoutError: Raised if no connection got free before the timeout.
+            sqlite3.ProgrammingError: Raised if the pool is closed, also
+                while waiting for a connection.
+
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            yield conn
+            return
+
+        if self._closed:
+            raise sqlite3.ProgrammingError("Cannot operate on a closed pool.")
+
+        conn = self._acquire()
+        self._local.conn = conn
+        try:
+            yield conn
+        finally:
+            self._local.conn = None
+            # Under the lock, close() can't drain the queue before the put
+            with self._lock:
+                closed = self._closed
+                if not closed:
+                    self._idle.put(conn)
+            if closed:
+                conn.close()
+
+    def prepare(self, name, query):
+        """Register a statement shared by every connection of the pool.
+
+        Args:
+            name (str): Name used to execute the statement.
+            query (str or peewee.Query): SQL statement with ``?``
+                placeholders, or a peewee query whose SQL is used. Values of
+                a peewee query are only placeholders, parameters are given to
+                execute().
+
+        Returns:
+            str: SQL of the statement.
+
+        """
+        sql = query if isinstance(query, str) else query.sql()[0]
+        with self._lock:
+            self._statements[name] = sql
+
+        return sql
+
+    def execute(self, query, params=()):
+        """Run a statement and fetch all its rows.
+
+        Args:
+            query (str): Name of a prepared statement or SQL statement.
+            params (sequence): Parameters of the statement.
+
+        Returns:
+            list: Fetched rows.
+
+        """
+        sql = self._statements.get(query, query)
+        with self.connection() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    def close(self):
+        """Close the idle connections, borrowed ones are closed on release.
+
+        Threads waiting for a connection fail at once.
+
+        """
+        idle = []
+        with self._lock:
+            if self._closed:
+                return
+
+            self._closed = True
+            while True:
+                try:
+                    idle.append(self._idle.get_nowait())
+                except queue.Empty:
+                    break
+            self._idle.put(CLOSED)
+
+        for conn in idle:
+            conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+
+class HotSwapPool(object):
+    """Read-only pool following the published generations of a database.
+
+    Between two requests, the pointer file of the publish directory is read
+    again, at most every check_interval seconds. When it names a new
+    generation, the next requests get connections to it while requests in
+    flight finish on the previous one, whose connections are closed when
+    released. Nothing waits for the swap.
+
+    Args:
+        directory (str): Path to the publish directory.
+        name (str): Name of the published database, like pokediadb.sql.
+        check_interval (float): Minimum seconds between two checks of the
+            pointer file.
+        **pool_options: Other ReadOnlyPool arguments, generations are opened
+            as immutable files by default.
+
+    Raises:
+        FileNotFoundError: Raised if no generation is published.
+
+    """
+
+    def __init__(self, directory, name="pokediadb.sql", check_interval=1.0,
+                 **pool_options):
+        self.directory = directory
+        self.name = name
+        self.check_interval = check_interval
+        self.pool_options = dict({"immutable": True}, **pool_options)
+
+        self.generation = None
+        self._pool = None
+        self._checked = 0
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._local = threading.local()
+        self._statements = {}
+        self._closed = False
+
+        if not self.refresh():
+            raise FileNotFoundError(
+                "No generation of '{}' is published in '{}'.".format(
+                    name, directory
+                )
+            )
+
+    def refresh(self):
+        """Switch to the current generation if it changed.
+
+        A thread finding another one refreshing does not wait for it.
+
+        Returns:
+            bool: True if the pool uses a generation.
+
+        """
+        if not self._refresh_lock.acquire(blocking=False):
+            return self._pool is not None
+
+        try:
+            self._checked = time.monotonic()
+            generation, path = get_current(self.directory, self.name)
+            if generation is None or generation == self.generation:
+                return self._pool is not None
+
+            try:
+                pool = ReadOnlyPool(str(path), **self.pool_options)
+            except FileNotFoundError:
+                return self._pool is not None
+
+            with self._lock:
+                for name, sql in self._statements.items():
+                    pool.prepare(name, sql)
+                old_pool, self._pool = self._pool, pool
+                self.generation = generation
+        finally:
+            self._refresh_lock.release()
+
+        # Borrowed connections of the old generation are closed on release
+        if old_pool is not None:
+            old_pool.close()
+
+        return True
+
+    @contextlib.contextmanager
+    def connection(self):
+        """Borrow a connection to the current generation.
+
+        Nested calls of a thread use the connection of the outer one, so a
+        request never mixes two generations.
+
+        Yields:
+            sqlite3.Connection: Read-only connection.
+
+        Raises:
+            TimeoutError: Raised if no connection got free before the timeout.
+            sqlite3.ProgrammingError: Raised if the pool is closed.
+
+        """
+        pool = getattr(self._local, "pool", None)
+        if pool is not None:
+            with pool.connection() as conn:
+                yield conn
+            return
+
+        if self._closed:
+            raise sqlite3.ProgrammingError("Cannot operate on a closed pool.")
+
+        if time.monotonic() - self._checked >= self.check_interval:
+            self.refresh()
+
+        with contextlib.ExitStack() as stack:
+            conn = None
+            while conn is None:
+                pool = self._pool
+                try:
+                    conn = stack.enter_context(pool.connection())
+                except sqlite3.ProgrammingError:
+                    # Retired by a concurrent refresh, use the new one
+                    if pool is self._pool:
+                        raise
+
+            self._local.pool = pool
+            try:
+                yield conn
+            finally:
+                self._local.pool = None
+
+    def prepare(self, name, query):
+        """Register a statement shared by every generation.
+
+        Args:
+            name (str): Name used to execute the statement.
+            query (str or peewee.Query): SQL statement, see
+                ReadOnlyPool.prepare.
+
+        Returns:
+            str: SQL of the statement.
+
+        """
+        with self._lock:
+            sql = self._pool.prepare(name, query)
+            self._statements[name] = sql
+
+        return sql
+
+    def execute(self, query, params=()):
+        """Run a statement on the current generation and fetch its rows.
+
+        Args:
+            query (str): Name of a prepared statement or SQL statement.
+            params (sequence): Parameters of the statement.
+
+        Returns:
+            list: Fetched rows.
+
+        """
+        sql = self._statements.get(query, query)
+        with self.connection() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    def close(self):
+        """Close the pool of the current generation."""
+        self._closed = True
+        self._pool.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
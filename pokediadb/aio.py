@@ -0,0 +1,181 @@
+"""Asyncio interface to a generated pokédia database.
+
+Queries run on a ReadOnlyPool inside a dedicated thread pool, so they never
+block the event loop. Concurrent identical requests are coalesced: they wait
+for the same query instead of running it again, each caller still gets its
+own copy of the result.
+
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from pokediadb.access import ReadOnlyPool
+from pokediadb.database import get_variable_limit
+
+
+def get_select(model, field, filters, size):
+    """Build the SELECT statement of a batched lookup.
+
+    Args:
+        model (pokediadb.models.BaseModel): Model of the read table.
+        field (peewee.Field): Field matched against the looked up values.
+        filters (list): Fields whose values are given as extra parameters.
+        size (int): Number of looked up values.
+
+    Returns:
+        str: SQL statement.
+
+    """
+    # pylint: disable=W0212
+    return "SELECT {} FROM \"{}\" WHERE \"{}\" IN ({}){}".format(
+        ", ".join(
+            "\"{}\"".format(f.db_column) for f in model._meta.sorted_fields
+        ),
+        model._meta.db_table, field.db_column, ", ".join("?" * size),
+        "".join(" AND \"{}\" = ?".format(f.db_column) for f in filters)
+    )
+
+
+class AsyncReader(object):
+    """Non-blocking reader of a pokédia database.
+
+    Args:
+        path (str): Path to the sqlite database file.
+        workers (int): Number of threads, and of connections, used to run
+            the queries.
+        **pool_options: Other ReadOnlyPool arguments (timeout, immutable and
+            cached_statements).
+
+    Raises:
+        FileNotFoundError: Raised if the database does not exist.
+
+    """
+
+    def __init__(self, path, workers=4, **pool_options):
+        self.pool = ReadOnlyPool(path, max_connections=workers, **pool_options)
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self._pending = {}
+
+    async def _run(self, key, func, *args):
+        """Run a function in the thread pool, sharing it between callers.
+
+        Args:
+            key (tuple): Identify the request, same key means same result.
+            func (callable): Blocking function to run.
+            *args: Arguments of the function.
+
+        Returns:
+            object: Result of the function.
+
+        """
+        future = self._pending.get(key)
+        if future is None:
+            loop = asyncio.get_event_loop()
+            future = loop.run_in_executor(self.executor, func, *args)
+            self._pending[key] = future
+            future.add_done_callback(lambda _: self._pending.pop(key, None))
+
+        # A cancelled caller must not cancel the others
+        return await asyncio.shield(future)
+
+    async def execute(self, query, params=()):
+        """Run a statement and fetch all its rows.
+
+        Args:
+            query (str): Name of a statement prepared on the pool or SQL
+                statement.
+            params (sequence): Parameters of the statement.
+
+        Returns:
+            list: Fetched rows.
+
+        """
+        params = tuple(params)
+        rows = await self._run(
+            ("execute", query, params), self.pool.execute, query, params
+        )
+        return list(rows)
+
+    def _get_many(self, model, values, field, filter_fields, filter_values):
+        # pylint: disable=W0212
+        size = max(get_variable_limit() - len(filter_values), 1)
+        names = [f.name for f in model._meta.sorted_fields]
+        key_index = model._meta.sorted_fields.index(field)
+
+        results = {}
+        with self.pool.connection() as conn:
+            for i in range(0, len(values), size):
+                chunk = values[i:i+size]
+                sql = get_select(model, field, filter_fields, len(chunk))
+                for row in conn.execute(sql, chunk + filter_values):
+                    results[row[key_index]] = dict(zip(names, row))
+
+        return results
+
+    async def get_many(self, model, values, field=None, **filters):
+        """Get many rows of a table in one round-trip.
+
+        Args:
+            model (pokediadb.models.BaseModel): Model of the read table.
+            values (iterable): Looked up values of the field.
+            field (str): Name of the matched field, default to the primary
+                key. With the filters, it must identify one row by value.
+            **filters: Values of other fields by field name, like the
+                ``lang`` of a translation.
+
+        Returns:
+            dict: Row (dict by field name) by value of the field. Values
+                without row are missing. The rows are copies, they can be
+                modified without changing the result of coalesced callers.
+
+        Raises:
+            ValueError: Raised if no field is given for a model with a
+                composite primary key.
+
+        """
+        # pylint: disable=W0212
+        if field is None and model._meta.composite_key:
+            raise ValueError(
+                "A field is needed to look up {} rows.".format(model.__name__)
+            )
+        elif field is None:
+            field = model._meta.primary_key
+        else:
+            field = model._meta.fields[field]
+
+        filter_fields = [model._meta.fields[name] for name in sorted(filters)]
+        filter_values = tuple(
+            f.db_value(filters[f.name]) for f in filter_fields
+        )
+        values = tuple(sorted({field.db_value(value) for value in values}))
+
+        key = (
+            "get_many", model._meta.db_table, field.name, values,
+            tuple(f.name for f in filter_fields), filter_values
+        )
+        results = await self._run(
+            key, self._get_many, model, values, field, filter_fields,
+            filter_values
+        )
+        return {value: dict(row) for value, row in results.items()}
+
+    def close(self):
+        """Wait for running queries then close the threads and connections.
+
+        This blocks until the running queries end, use aclose from a
+        coroutine.
+
+        """
+        self.executor.shutdown(wait=True)
+        self.pool.close()
+
+    async def aclose(self):
+        """Close the reader without blocking the event loop."""
+        await asyncio.get_event_loop().run_in_executor(None, self.close)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_):
+        await self.aclose()
@@ -0,0 +1,423 @@
+"""Vectorized calculators over the pokédia tables (needs numpy).
+
+load_stat_table reads the base stats of every pokémon once into a contiguous
+array, compute_stats then gives the final stats of whole batches of pokémons
+at a level, nature, individual (IV) and effort (EV) values in one call
+instead of one formula evaluation per pokémon and stat.
+
+DamageCalculator preloads the moves and the type efficacy matrix the same
+way and computes the damage ranges of every attacker, move and defender
+combination of a batch at once.
+
+Natures are numbered from 0 (Hardy) to 24 (Quirky) like in the games: nature
+n raises NATURE_STATS[n // 5] and lowers NATURE_STATS[n % 5], the five
+natures raising and lowering the same stat are neutral.
+
+"""
+
+import time
+
+from pokediadb import models
+from pokediadb.enums import Stat
+
+# Stats of a stat row, in column order
+STATS = tuple(Stat)
+
+# Stats raised or lowered by the natures, in nature order
+NATURE_STATS = (
+    Stat.attack, Stat.defense, Stat.speed, Stat.special_attack,
+    Stat.special_defense
+)
+NATURE_COUNT = len(NATURE_STATS) ** 2
+
+MAX_LEVEL = 100
+MAX_IV = 31
+MAX_EV = 255
+
+# Ids of the damage classes in the DamageClass table
+STATUS = 1
+PHYSICAL = 2
+SPECIAL = 3
+
+# Random damage factors in percent, the lowest and highest rolls
+MIN_ROLL = 85
+MAX_ROLL = 100
+
+
+def get_numpy():
+    """Import the numpy package.
+
+    Returns:
+        module: numpy module.
+
+    Raises:
+        ImportError: Raised if numpy is not installed.
+
+    """
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("The calculators need the numpy package.")
+
+    return numpy
+
+
+def get_nature_multipliers():
+    """Get the stat multipliers of the natures.
+
+    Returns:
+        numpy.ndarray: Multipliers in tenths (9, 10 or 11) by nature and
+            stat, with shape (NATURE_COUNT, len(STATS)).
+
+    """
+    np = get_numpy()
+    multipliers = np.full((NATURE_COUNT, len(STATS)), 10, dtype=np.int64)
+    for nature in range(NATURE_COUNT):
+        raised = NATURE_STATS[nature // len(NATURE_STATS)]
+        lowered = NATURE_STATS[nature % len(NATURE_STATS)]
+        if raised != lowered:
+            multipliers[nature, STATS.index(raised)] = 11
+            multipliers[nature, STATS.index(lowered)] = 9
+
+    return multipliers
+
+
+def load_stat_table():
+    """Load the base stats of the built pokémons.
+
+    Returns:
+        numpy.ndarray: Sorted ids of the pokémons.
+        numpy.ndarray: C-contiguous base stats by pokémon, in id order, and
+            stat, in STATS order.
+
+    Raises:
+        ImportError: Raised if numpy is not installed.
+        peewee.OperationalError: Raised if the stat table hasn't been build.
+
+    """
+    np = get_numpy()
+    rows = np.array(list(models.PokemonStat.select(
+        models.PokemonStat.pokemon, models.PokemonStat.stat,
+        models.PokemonStat.base
+    ).tuples()), dtype=np.int64).reshape(-1, 3)
+
+    pkm_ids, rows_index = np.unique(rows[:, 0], return_inverse=True)
+    base = np.zeros((len(pkm_ids), len(STATS)), dtype=np.int64)
+    base[rows_index, rows[:, 1] - STATS[0]] = rows[:, 2]
+
+    return pkm_ids, np.ascontiguousarray(base)
+
+
+def get_rows(table_ids, ids):
+    """Get the rows of ids in a preloaded table.
+
+    Args:
+        table_ids (numpy.ndarray): Sorted ids of the table rows.
+        ids (array_like): Looked up ids.
+
+    Returns:
+        numpy.ndarray: Row of each id.
+
+    Raises:
+        KeyError: Raised if an id is not in the table.
+
+    """
+    np = get_numpy()
+    ids = np.asarray(ids, dtype=np.int64)
+    rows = np.searchsorted(table_ids, ids)
+    found = rows < len(table_ids)
+    found[found] = table_ids[rows[found]] == ids[found]
+    if not found.all():
+        raise KeyError("Unknown ids {}.".format(
+            sorted(set(ids[~found].tolist()))
+        ))
+
+    return rows
+
+
+def check_range(name, values, low, high):
+    """Raise a ValueError if some values are out of [low, high]."""
+    if values.size and (values.min() < low or values.max() > high):
+        raise ValueError("{} must be between {} and {}.".format(
+            name, low, high
+        ))
+
+
+def compute_stats(base, levels, natures=0, ivs=MAX_IV, evs=0):
+    """Compute the final stats of a batch of pokémons.
+
+    Arguments are broadcast against each other, per pokémon arguments
+    (levels and natures) having one value by row of base and per stat
+    arguments (ivs and evs) one value by stat or a row by pokémon.
+
+    Args:
+        base (array_like): Base stats with shape (n, len(STATS)), or of one
+            pokémon.
+        levels (array_like): Levels between 1 and MAX_LEVEL.
+        natures (array_like): Natures between 0 and NATURE_COUNT - 1.
+        ivs (array_like): Individual values between 0 and MAX_IV.
+        evs (array_like): Effort values between 0 and MAX_EV.
+
+    Returns:
+        numpy.ndarray: Final stats with shape (n, len(STATS)).
+
+    Raises:
+        ImportError: Raised if numpy is not installed.
+        ValueError: Raised if an argument is out of its range.
+
+    """
+    np = get_numpy()
+    base = np.asarray(base, dtype=np.int64).reshape(-1, len(STATS))
+    levels = np.asarray(levels, dtype=np.int64).reshape(-1, 1)
+    natures = np.asarray(natures, dtype=np.int64).reshape(-1)
+    ivs = np.asarray(ivs, dtype=np.int64)
+    evs = np.asarray(evs, dtype=np.int64)
+
+    check_range("Levels", levels, 1, MAX_LEVEL)
+    check_range("Natures", natures, 0, NATURE_COUNT - 1)
+    check_range("IVs", ivs, 0, MAX_IV)
+    check_range("EVs", evs, 0, MAX_EV)
+
+    stats = (2 * base + ivs + evs // 4) * levels // 100
+    stats[:, 1:] = (stats[:, 1:] + 5) * \
+        get_nature_multipliers()[natures, 1:] // 10
+    stats[:, 0] += levels[:, 0] + 10
+
+    # A single hit point is the special case of Shedinja
+    stats[:, 0] = np.where(base[:, 0] == 1, 1, stats[:, 0])
+
+    return stats
+
+
+def compute_pokemon_stats(stat_table, pokemons, levels, natures=0,
+                          ivs=MAX_IV, evs=0):
+    """Compute the final stats of a batch of pokémons by id.
+
+    Args:
+        stat_table (tuple): Pokémon ids and base stats returned by
+            load_stat_table.
+        pokemons (array_like): Ids of the pokémons.
+        levels (array_like): Levels between 1 and MAX_LEVEL.
+        natures (array_like): Natures between 0 and NATURE_COUNT - 1.
+        ivs (array_like): Individual values between 0 and MAX_IV.
+        evs (array_like): Effort values between 0 and MAX_EV.
+
+    Returns:
+        numpy.ndarray: Final stats with shape (len(pokemons), len(STATS)).
+
+    Raises:
+        KeyError: Raised if a pokémon is not in the table.
+        ValueError: Raised if an argument is out of its range.
+
+    """
+    pkm_ids, base = stat_table
+    return compute_stats(
+        base[get_rows(pkm_ids, pokemons)], levels, natures, ivs, evs
+    )
+
+
+class DamageCalculator(object):
+    """Damage calculator over the preloaded Move and TypeEfficacy tables.
+
+    The moves are kept as arrays indexed by move row (ids, power, accuracy,
+    priority, type row and damage class) and the efficacies as a matrix of
+    damage factors in percent by attacking and defending type row. Type
+    row 0 stands for no type, for the second type of single typed pokémons,
+    and is neutral.
+
+    Damages follow the formula of the main games without the situational
+    modifiers (critical hits, weather, abilities, items or burn).
+
+    Raises:
+        ImportError: Raised if numpy is not installed.
+        peewee.OperationalError: Raised if the type or move tables haven't
+            been build.
+
+    """
+
+    def __init__(self):
+        np = get_numpy()
+
+        self.type_ids = np.array([0] + [type_id for type_id, in models.Type
+                                        .select(models.Type.id)
+                                        .order_by(models.Type.id)
+                                        .tuples()], dtype=np.int64)
+        self.efficacy = np.full(
+            (len(self.type_ids), len(self.type_ids)), 100, dtype=np.int64
+        )
+        efficacies = np.array(list(models.TypeEfficacy.select(
+            models.TypeEfficacy.damage_type, models.TypeEfficacy.target_type,
+            models.TypeEfficacy.damage_factor
+        ).tuples()), dtype=np.int64).reshape(-1, 3)
+        self.efficacy[
+            get_rows(self.type_ids, efficacies[:, 0]),
+            get_rows(self.type_ids, efficacies[:, 1])
+        ] = efficacies[:, 2]
+
+        moves = np.array(list(models.Move.select(
+            models.Move.id, models.Move.power, models.Move.accuracy,
+            models.Move.priority, models.Move.type, models.Move.damage_class
+        ).order_by(models.Move.id).tuples()), dtype=np.int64).reshape(-1, 6)
+        self.move_ids = np.ascontiguousarray(moves[:, 0])
+        self.power = np.ascontiguousarray(moves[:, 1])
+        self.accuracy = np.ascontiguousarray(moves[:, 2])
+        self.priority = np.ascontiguousarray(moves[:, 3])
+        self.move_types = get_rows(self.type_ids, moves[:, 4])
+        self.damage_classes = np.ascontiguousarray(moves[:, 5])
+
+    def get_type_rows(self, types, count):
+        """Get the type rows of a batch of pokémons.
+
+        Args:
+            types (array_like): Type ids with shape (count, 2), 0 for no
+                type, None if the types are unknown.
+            count (int): Number of pokémons of the batch.
+
+        Returns:
+            numpy.ndarray: Type rows with shape (count, 2).
+
+        Raises:
+            KeyError: Raised if a type is unknown.
+
+        """
+        np = get_numpy()
+        if types is None:
+            return np.zeros((count, 2), dtype=np.int64)
+
+        types = np.asarray(types, dtype=np.int64).reshape(-1, 2)
+        return np.broadcast_to(get_rows(self.type_ids, types), (count, 2))
+
+    def get_damaging_moves(self):
+        """Get the ids of the moves dealing damages by their power."""
+        return self.move_ids[
+            (self.damage_classes != STATUS) & (self.power > 0)
+        ]
+
+    def damage_ranges(self, attackers, moves, defenders, levels=50,
+                      attacker_types=None, defender_types=None):
+        """Compute the damage ranges of a batch of matchups.
+
+        Every attacker uses every move on every defender: results have the
+        shape (len(attackers), len(moves), len(defenders)). Status moves,
+        moves without power and immune defenders take no damage, the others
+        at least one point.
+
+        Args:
+            attackers (array_like): Final stats of the attackers with shape
+                (a, len(STATS)), see compute_stats.
+            moves (array_like): Ids of the moves.
+            defenders (array_like): Final stats of the defenders with shape
+                (d, len(STATS)).
+            levels (array_like): Level of each attacker, or of all of them.
+            attacker_types (array_like): Type ids of the attackers with
+                shape (a, 2), for the same type attack bonus. None to skip
+                the bonus.
+            defender_types (array_like): Type ids of the defenders with
+                shape (d, 2). None to skip the type efficacy.
+
+        Returns:
+            numpy.ndarray: Lowest damage of each matchup.
+            numpy.ndarray: Highest damage of each matchup.
+
+        Raises:
+            KeyError: Raised if a move or a type is unknown.
+
+        """
+        np = get_numpy()
+        attackers = np.asarray(attackers, dtype=np.int64).reshape(
+            -1, len(STATS)
+        )
+        defenders = np.asarray(defenders, dtype=np.int64).reshape(
+            -1, len(STATS)
+        )
+        levels = np.asarray(levels, dtype=np.int64).reshape(-1, 1, 1)
+        rows = get_rows(self.move_ids, moves)
+        power = self.power[rows]
+        move_types = self.move_types[rows]
+        special = self.damage_classes[rows] == SPECIAL
+
+        # Attack and defense used by each move, (a, m, 1) and (1, m, d)
+        attack = np.where(
+            special, attackers[:, [STATS.index(Stat.special_attack)]],
+            attackers[:, [STATS.index(Stat.attack)]]
+        )[:, :, None]
+        defense = np.where(
+            special, defenders[:, [STATS.index(Stat.special_defense)]],
+            defenders[:, [STATS.index(Stat.defense)]]
+        ).T[None, :, :]
+        base = (2 * levels // 5 + 2) * power[None, :, None] * attack // \
+            defense // 50 + 2
+
+        atk_types = self.get_type_rows(attacker_types, len(attackers))
+        stab = (atk_types[:, :, None] == move_types[None, None, :]).any(
+            axis=1
+        )[:, :, None]
+        factors = self.efficacy[
+            move_types[:, None, None],
+            self.get_type_rows(defender_types, len(defenders))[None, :, :]
+        ][None]
+        hit = ((self.damage_classes[rows] != STATUS) & (power > 0))[
+            None, :, None
+        ] & (factors[..., 0] * factors[..., 1] > 0)
+
+        def roll(percent):
+            damage = base * percent // 100
+            damage = np.where(stab, damage * 3 // 2, damage)
+            damage = damage * factors[..., 0] // 100 * factors[..., 1] // 100
+            return np.where(hit, np.maximum(damage, 1), 0)
+
+        return roll(MIN_ROLL), roll(MAX_ROLL)
+
+
+def benchmark_damage(calculator, stat_table, size=100, repeat=3, seed=0):
+    """Measure the throughput of DamageCalculator.damage_ranges.
+
+    A batch of size random attackers and defenders, at random levels and
+    natures and with random types, is matched with every damaging move.
+
+    Args:
+        calculator (DamageCalculator): Calculator to measure.
+        stat_table (tuple): Pokémon ids and base stats returned by
+            load_stat_table.
+        size (int): Number of attackers and of defenders of the batch.
+        repeat (int): Number of timed runs, the fastest one is kept.
+        seed (int): Seed of the random batch.
+
+    Returns:
+        dict: Number of matchups of the batch (matchups), seconds of the
+            fastest run (seconds) and matchups computed per second
+            (per_second).
+
+    Raises:
+        ValueError: Raised if there is no pokémon or damaging move.
+
+    """
+    np = get_numpy()
+    _, base = stat_table
+    moves = calculator.get_damaging_moves()
+    if not len(base) or not len(moves):
+        raise ValueError("The benchmark needs pokémon stats and damaging "
+                         "moves.")
+
+    rng = np.random.RandomState(seed)
+    levels = rng.randint(1, MAX_LEVEL + 1, size=size)
+    stats = compute_stats(
+        base[rng.randint(len(base), size=size)], levels,
+        rng.randint(NATURE_COUNT, size=size)
+    )
+    types = calculator.type_ids[
+        rng.randint(len(calculator.type_ids), size=(size, 2))
+    ]
+
+    seconds = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        calculator.damage_ranges(stats, moves, stats, levels, types, types)
+        elapsed = time.perf_counter() - start
+        seconds = elapsed if seconds is None else min(seconds, elapsed)
+
+    matchups = size * len(moves) * size
+    return {
+        "matchups": matchups, "seconds": seconds,
+        "per_second": matchups / seconds if seconds else float("inf")
+    }
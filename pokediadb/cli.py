@@ -5,15 +5,28 @@ See: https://github.com/PokeAPI/pokeapi
 """
 
 import shutil
+import threading
 import subprocess
+import multiprocessing
 from pathlib import Path
 
 import click
+from peewee import OperationalError
 
 from pokediadb import log
+from pokediadb import models
 from pokediadb import database as pdb
+from pokediadb.utils import fts5_available
 from pokediadb.utils import on_rmtree_error
 
+# Other pokediadb modules are imported by the commands using them, starting
+# the cli (or a variant worker) only loads what it runs.
+
+POKEAPI_REPOSITORY = "https://github.com/PokeAPI/pokeapi.git"
+
+# Codecs of the shared texts, pokediadb.texts.CODECS without importing it
+SHARED_TEXT_CODECS = ("plain", "zlib", "zstd")
+
 
 def validate_dbname(ctx, params, value):
     """Validate a database name."""
@@ -41,41 +54,494 @@ def validate_dbname(ctx, params, value):
     return value
 
 
-def extract_dirs(pokeapi_dir):
-    """Extract csv and sprite dirs from pokeapi repository.
+def run_git(*args):
+    """Run a git command.
+
+    Args:
+        *args (str): Arguments of the git command.
+
+    Raises:
+        click.Abort: Raised if git is not installed or if the command failed.
+
+    """
+    try:
+        result = subprocess.run(["git"] + list(args))
+    except OSError as err:
+        if err.errno == shutil.errno.ENOENT:
+            log.error((
+                "Git must be installed on your system to download data from "
+                "https://github.com/PokeAPI/pokeapi."
+            ))
+            raise click.Abort()
+        else:
+            # Something else went wrong while trying to run `git`
+            raise
+
+    if result.returncode:
+        log.error("Command 'git {}' failed.".format(" ".join(args)))
+        raise click.Abort()
+
+
+def extract_dir(pokeapi_dir, name):
+    """Extract a data folder from the cloned pokeapi repository.
 
-    Extract csv and sprites folders in the given path directory and remove
-    pokeapi repository.
+    The folder is checked out from data/v2 and moved next to the pokeapi
+    repository.
 
     Args:
-        pokeapi_dir (pathlib.Path): Path to the downloaded pokeapi repo.
+        pokeapi_dir (pathlib.Path): Path to the cloned pokeapi repo.
+        name (str): Name of the folder to extract (csv or sprites).
 
     Raises:
-        click.Abort: Raised if there is no csv or sprites folder inside the
-            pokeapi repository.
+        click.Abort: Raised if there is no such folder inside the pokeapi
+            repository.
 
     """
-    log.info("Extracting csv and sprites folders.")
-    csv = pokeapi_dir / "data/v2/csv"
-    sprites = pokeapi_dir / "data/v2/sprites"
+    folder = pokeapi_dir / "data/v2" / name
+    run_git(
+        "-C", str(pokeapi_dir), "checkout", "-q", "HEAD", "--",
+        "data/v2/" + name
+    )
 
     try:
-        shutil.move(str(csv), str(pokeapi_dir.parent))
-        shutil.move(str(sprites), str(pokeapi_dir.parent))
+        shutil.move(str(folder), str(pokeapi_dir.parent))
     except FileNotFoundError as err:  # pragma: no cover
-        log.error(err)
-        if csv.exists():
-            shutil.rmtree(str(csv), onerror=on_rmtree_error)
+        log.error(str(err))
+        raise click.Abort()
 
-        if sprites.exists():
-            shutil.rmtree(str(sprites), onerror=on_rmtree_error)
 
-        shutil.rmtree(str(pokeapi_dir), onerror=on_rmtree_error)
+def fetch_pokeapi(path, repository, verbose, csv_ready=None):
+    """Download the csv and sprites folders from a pokeapi repository.
+
+    The repository is cloned without checkout. The csv folder is extracted
+    first so that its files can be parsed while the sprites folder is still
+    being fetched and extracted.
+
+    Args:
+        path (pathlib.Path): Directory receiving the csv and sprites folders.
+        repository (str): Url or path of the pokeapi repository.
+        verbose (bool): If True, explain the process.
+        csv_ready (threading.Event): Set once the csv folder is extracted.
+
+    Raises:
+        click.Abort: Raised if the folders could not be downloaded.
+
+    """
+    # Create a pokeapi directory to clone the repository into
+    try:
+        pokeapi_dir = path / "pokeapi"
+        pokeapi_dir.mkdir()
+    except FileExistsError:
+        log.error("A pokeapi folder already exists in {}".format(path))
         raise click.Abort()
+
+    try:
+        # Check if there is no csv nor sprites folders in the given directory
+        if (path / "csv").exists() or (path / "sprites").exists():
+            log.error(
+                "Dir: {} contains a csv or sprites directory!".format(path)
+            )
+            raise click.Abort()
+
+        # Clone pokeapi repository, blobs are fetched when they are checked out
+        log.info("Cloning pokeapi repository", verbose)
+        run_git(
+            "clone", "-q", "--no-checkout", "--filter=blob:none", repository,
+            str(pokeapi_dir)
+        )
+
+        log.info("Extracting csv folder.", verbose)
+        extract_dir(pokeapi_dir, "csv")
+        if csv_ready is not None:
+            csv_ready.set()
+
+        log.info("Extracting sprites folder.", verbose)
+        extract_dir(pokeapi_dir, "sprites")
     finally:
         shutil.rmtree(str(pokeapi_dir), onerror=on_rmtree_error)
 
 
+class FetchThread(threading.Thread):
+    """Thread downloading the pokeapi data while the database is built.
+
+    Attributes:
+        csv_ready (threading.Event): Set once the csv folder is extracted.
+        error (Exception): Exception raised by the download, if any.
+
+    """
+
+    def __init__(self, path, repository, verbose):
+        super().__init__(daemon=True)
+        self.path = path
+        self.repository = repository
+        self.verbose = verbose
+        self.csv_ready = threading.Event()
+        self.error = None
+
+    def run(self):
+        try:
+            fetch_pokeapi(
+                self.path, self.repository, self.verbose, self.csv_ready
+            )
+        except Exception as err:  # pylint: disable=W0703
+            self.error = err
+
+    def wait_csv(self):
+        """Block until the csv folder is extracted.
+
+        Raises:
+            click.Abort: Raised if the download failed before.
+
+        """
+        while not self.csv_ready.wait(0.1):
+            if not self.is_alive():
+                break
+
+        if not self.csv_ready.is_set():
+            raise self.error or click.Abort()
+
+    def finish(self):
+        """Wait for the end of the download.
+
+        Raises:
+            click.Abort: Raised if the download failed.
+
+        """
+        self.join()
+        if self.error is not None:
+            raise self.error
+
+
+def build_tables(db, languages, csv_path, verbose, tables=None, **subset):
+    """Build the tables of the database, in dependency order.
+
+    Each stage is committed as a checkpoint, stages already completed by a
+    previous run are skipped.
+
+    Args:
+        db (pokedia.models.db): Pokediadb database.
+        languages (dict): Dictionary of supported languages.
+        csv_path (pathlib.Path): Path to csv directory.
+        verbose (bool): If True, explain the process.
+        tables (list): Names of the built stages, None for all of them.
+        **subset: Generation and version group filters of the builders.
+
+    Raises:
+        click.Abort: Raised if the version group is unknown, does not belong
+            to the generation or differs from the resumed build.
+
+    """
+    for name, build, stage_tables in pdb.BUILD_STAGES:
+        if tables is not None and name not in tables:
+            continue
+
+        log.info("Building {} tables...".format(name), verbose)
+        try:
+            built = pdb.run_stage(
+                db, name, stage_tables, build, db, languages, csv_path,
+                **subset
+            )
+        except ValueError as err:
+            log.error("{}".format(err))
+            raise click.Abort()
+
+        if not built:
+            log.info("Skipped {} tables, already built.".format(name), verbose)
+
+
+def build_outputs(db, languages, file_path, pokedex_view, columnar,
+                  shared_texts, verbose):
+    """Build the search index and the optional outputs of a built database.
+
+    Args:
+        db (pokedia.models.db): Pokediadb database.
+        languages (dict): Dictionary of supported languages.
+        file_path (pathlib.Path): Path to the sqlite database file.
+        pokedex_view (bool): If True, build the denormalized pokédex tables.
+        columnar (bool): If True, export the database to a columnar file.
+        shared_texts (str): Codec of the deduplicated effect texts, None to
+            keep them in the translation tables.
+        verbose (bool): If True, explain the process.
+
+    Raises:
+        ImportError: Raised if the codec needs a missing package.
+
+    """
+    if fts5_available():
+        from pokediadb import search
+        log.info("Building search index...", verbose)
+        search.build_search_index(db, languages)
+    else:
+        log.info("Search index skipped: sqlite has no FTS5 support.", verbose)
+
+    if pokedex_view:
+        from pokediadb import pokedex
+        log.info("Building pokedex tables...", verbose)
+        pokedex.build_pokedex_views(db, languages)
+
+    if columnar:
+        from pokediadb import export
+        columnar_path = file_path.with_suffix(".pkdc")
+        log.info("Exporting columnar file {}...".format(columnar_path.name),
+                 verbose)
+        export.export_columnar(db, str(columnar_path))
+
+    # The outputs above read shared effects from the Text table, so they are
+    # complete when rebuilt on a resumed build whose effects are shared
+    if shared_texts:
+        from pokediadb import texts
+        log.info("Sharing effect texts...", verbose)
+        stats = texts.share_texts(db, shared_texts)
+        log.info("{} effects stored as {} texts: {} -> {} bytes.".format(
+            stats["effects"], stats["texts"], stats["raw_size"],
+            stats["stored_size"]
+        ), verbose)
+
+
+def finish_file(file_path, compact, wal, verbose):
+    """Apply the storage options of a built and closed database file.
+
+    Args:
+        file_path (pathlib.Path): Path to the sqlite database file.
+        compact (bool): If True, rebuild the natural key tables WITHOUT
+            ROWID and vacuum the file.
+        wal (bool): If True, switch the database to the WAL journal mode.
+        verbose (bool): If True, explain the process.
+
+    """
+    if compact:
+        from pokediadb.compact import compact_database
+        log.info("Compacting database...", verbose)
+        report = compact_database(str(file_path))
+        log.info(
+            "Compacted {}: {} -> {} bytes, point lookup {:.1f} -> {:.1f} us"
+            .format(file_path.name, report["size_before"],
+                    report["size_after"], report["lookup_before"] * 1e6,
+                    report["lookup_after"] * 1e6), verbose
+        )
+
+    if wal:
+        from pokediadb import access
+        log.info("Switching to WAL journal mode...", verbose)
+        access.enable_wal(str(file_path))
+
+
+def build_variant(dir_path, variant, resume=False, verbose=False):
+    """Build the database of one variant.
+
+    Args:
+        dir_path (pathlib.Path): Directory of the csv folder and of the
+            database.
+        variant (dict): Options of the variant, see pokediadb.variants.
+        resume (bool): If True, complete the build of an existing database.
+        verbose (bool): If True, explain the process.
+
+    Returns:
+        dict: Insertion metrics by table name.
+
+    Raises:
+        click.Abort: Raised if the database already exists or if the build
+            options are invalid.
+
+    """
+    file_path = dir_path / variant["name"]
+    log.info("Initialing {}".format(variant["name"]), verbose)
+    try:
+        db, languages = pdb.db_init(
+            str(file_path), resume, variant["languages"]
+        )
+    except FileExistsError as err:
+        log.error("{}".format(err))
+        raise click.Abort()
+
+    try:
+        # Rows out of the selected generation or version group are never
+        # inserted
+        build_tables(
+            db, languages, dir_path / "csv", verbose, variant["tables"],
+            generation=variant["generation"],
+            version_group=variant["version_group"]
+        )
+        build_outputs(
+            db, languages, file_path, variant["pokedex_view"],
+            variant["columnar"], variant["shared_texts"], verbose
+        )
+    finally:
+        db.close()
+
+    finish_file(file_path, variant["compact"], variant["wal"], verbose)
+
+    return dict(pdb.BUILD_METRICS)
+
+
+def build_routed_variant(dir_path, variant, resume, csv_rows):
+    """Build the database of one variant from already parsed csv rows.
+
+    Args:
+        dir_path (pathlib.Path): Directory of the csv folder and of the
+            database.
+        variant (dict): Options of the variant, see pokediadb.variants.
+        resume (bool): If True, complete the build of an existing database.
+        csv_rows (dict): Rows read by the variant by csv file name, see
+            pokediadb.database.get_variant_rows.
+
+    Returns:
+        dict: Insertion metrics by table name.
+
+    """
+    from pokediadb.dbuilder import reader
+
+    reader.set_preloaded_rows((dir_path / "csv").absolute(), csv_rows)
+    try:
+        return build_variant(dir_path, variant, resume)
+    finally:
+        reader.clear_preloaded_rows()
+
+
+def build_variants(dir_path, targets, jobs, resume, verbose):
+    """Build several database variants in parallel worker processes.
+
+    The csv files are parsed once and each worker only receives the rows
+    read by its variant. Workers are spawned, not forked, so that the
+    download thread is never copied in them.
+
+    Args:
+        dir_path (pathlib.Path): Directory of the csv folder and of the
+            databases.
+        targets (list): Options of each variant, see pokediadb.variants.
+        jobs (int): Number of worker processes, None for the number of CPUs.
+        resume (bool): If True, complete the build of existing databases.
+        verbose (bool): If True, explain the process.
+
+    Raises:
+        click.Abort: Raised if the build of a variant failed.
+
+    """
+    csv_path = str(dir_path / "csv")
+    log.info("Parsing csv files...", verbose)
+    csv_rows = pdb.load_csv_rows(csv_path)
+
+    failed = False
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(jobs, maxtasksperchild=1) as pool:
+        results = []
+        for variant in targets:
+            try:
+                variant_rows = pdb.get_variant_rows(
+                    csv_path, csv_rows, variant["tables"],
+                    variant["generation"], variant["version_group"]
+                )
+            except ValueError as err:
+                log.error("Building {} failed. {}".format(
+                    variant["name"], err
+                ))
+                failed = True
+                continue
+
+            results.append((variant["name"], pool.apply_async(
+                build_routed_variant,
+                (dir_path, variant, resume, variant_rows)
+            )))
+
+        for name, result in results:
+            try:
+                metrics = result.get()
+            except Exception as err:  # pylint: disable=W0703
+                log.error("Building {} failed. {}".format(name, err))
+                failed = True
+                continue
+
+            log.info("Built {}: {} rows.".format(
+                name, sum(table["rows"] for table in metrics.values())
+            ), verbose)
+
+    if failed:
+        raise click.Abort()
+
+
+def load_targets(variants_file):
+    """Load the variants of a variants file.
+
+    Args:
+        variants_file (str): Path to the TOML variants file.
+
+    Returns:
+        list: Options of each variant, see pokediadb.variants.
+
+    Raises:
+        click.Abort: Raised if the variants file is invalid.
+
+    """
+    from pokediadb import variants
+    try:
+        targets = variants.load_variants(variants_file)
+    except (ImportError, ValueError) as err:
+        log.error("{}".format(err))
+        raise click.Abort()
+
+    for variant in targets:
+        try:
+            variant["name"] = validate_dbname(None, None, variant["name"])
+        except click.BadParameter:
+            log.error("Invalid variant name '{}'.".format(variant["name"]))
+            raise click.Abort()
+
+    return targets
+
+
+def check_targets(dir_path, targets, resume):
+    """Check that the variants can be built before starting anything.
+
+    Args:
+        dir_path (pathlib.Path): Directory of the databases.
+        targets (list): Options of each variant, see pokediadb.variants.
+        resume (bool): If True, existing databases are completed.
+
+    Raises:
+        click.Abort: Raised if a database already exists or if a text codec
+            needs a missing package.
+
+    """
+    for variant in targets:
+        file_path = dir_path / variant["name"]
+        if file_path.is_file() and not resume:
+            log.error("The database '{}' already exist.".format(file_path))
+            raise click.Abort()
+
+        if variant["shared_texts"] == "zstd":
+            from pokediadb import texts
+            try:
+                texts.get_zstd()
+            except ImportError as err:
+                log.error("{}".format(err))
+                raise click.Abort()
+
+
+def start_fetch(dir_path, repository, verbose):
+    """Download the csv and sprites folders in the background if needed.
+
+    Args:
+        dir_path (pathlib.Path): Directory of the csv and sprites folders.
+        repository (str): Url or path of the pokeapi repository.
+        verbose (bool): If True, explain the process.
+
+    Returns:
+        FetchThread: Running download, once the csv folder is extracted, or
+            None if both folders already exist.
+
+    Raises:
+        click.Abort: Raised if the csv folder could not be downloaded.
+
+    """
+    if (dir_path / "csv").is_dir() and (dir_path / "sprites").is_dir():
+        return None
+
+    fetcher = FetchThread(dir_path, repository, verbose)
+    fetcher.start()
+    fetcher.wait_csv()
+    return fetcher
+
+
 @click.group()
 def pokediadb():
     pass
@@ -84,45 +550,17 @@ def pokediadb():
 @pokediadb.command(short_help="Download csv and sprites folders")
 @click.argument("path", type=click.Path(exists=1, file_okay=0, writable=1),
                 default=".")
+@click.option("--repository", default=POKEAPI_REPOSITORY,
+              envvar="POKEDIADB_REPOSITORY",
+              help="Url or path of the pokeapi repository")
 @click.option("-v", "--verbose", is_flag=True, help="Explain the process")
-def download(path, verbose):
+def download(path, repository, verbose):
     """Download the csv and sprites folders from pokeapi repository.
 
     They contains needed data to build the sqlite pokémon database.
 
     """
-    # Create a pokeapi directory to clone the repository into
-    path = Path(path).absolute()
-    try:
-        pokeapi_dir = path / "pokeapi"
-        pokeapi_dir.mkdir()
-    except FileExistsError:
-        log.error("A pokeapi folder already exists in {}".format(path))
-        raise click.Abort()
-
-    # Check if there is no csv nor sprites folders in the given directory
-    if (path / "csv").exists() or (path / "sprites").exists():
-        log.error("Dir: {} contains a csv or sprites directory!".format(path))
-        raise click.Abort()
-
-    # Clone pokeapi repository
-    log.info("Cloning pokeapi repository", verbose)
-    try:
-        subprocess.run([
-            "git", "clone", "-q", "https://github.com/PokeAPI/pokeapi.git",
-            str(pokeapi_dir)
-        ])
-    except OSError as err:
-        if err.errno == shutil.errno.ENOENT:
-            log.error((
-                "Git must be installed on your system to download data from "
-                "https://github.com/PokeAPI/pokeapi."
-            ))
-        else:
-            # Something else went wrong while trying to run `wget`
-            raise
-
-    extract_dirs(pokeapi_dir)
+    fetch_pokeapi(Path(path).absolute(), repository, verbose)
 
 
 @pokediadb.command(short_help="Generate PKM sqlite database.")
@@ -130,37 +568,172 @@ def download(path, verbose):
                 default=".")
 @click.option("--name", "-n", type=str, default="pokediadb.sql",
               callback=validate_dbname)
+@click.option("--repository", default=POKEAPI_REPOSITORY,
+              envvar="POKEDIADB_REPOSITORY",
+              help="Url or path of the pokeapi repository")
+@click.option("--generation", type=click.IntRange(1), default=None,
+              help="Only build data up to this generation")
+@click.option("--version-group", type=int, default=None,
+              help="Only build data of this version group")
+@click.option("--pokedex-view", is_flag=True,
+              help="Build denormalized pokedex tables for fast lookups")
+@click.option("--columnar", is_flag=True,
+              help="Also export the database to a columnar .pkdc file")
+@click.option("--shared-texts", type=click.Choice(SHARED_TEXT_CODECS),
+              default=None,
+              help="Store each effect text once, with this compression")
+@click.option("--compact", is_flag=True,
+              help="Cluster the key tables WITHOUT ROWID and vacuum the file")
+@click.option("--wal", is_flag=True,
+              help="Use the WAL journal mode for concurrent readers")
+@click.option("--variants", "variants_file",
+              type=click.Path(exists=1, dir_okay=0),
+              help="TOML file describing several databases to build at once")
+@click.option("--jobs", "-j", type=click.IntRange(1), default=None,
+              help="Number of processes building variants")
+@click.option("--resume", is_flag=True,
+              help="Complete the interrupted build of an existing database")
 @click.option("-v", "--verbose", is_flag=True, help="Explain the process")
-@click.pass_context
-def generate(ctx, path, name, verbose):
+def generate(path, name, repository, generation, version_group, pokedex_view,
+             columnar, shared_texts, compact, wal, variants_file, jobs,
+             resume, verbose):
+    from pokediadb import variants
     dir_path = Path(path).absolute()
-    file_path = dir_path / name
-    csv_path = dir_path / "csv"
+    if variants_file is None:
+        targets = [dict(
+            variants.DEFAULT_OPTIONS, name=name, generation=generation,
+            version_group=version_group, pokedex_view=pokedex_view,
+            columnar=columnar, shared_texts=shared_texts, compact=compact,
+            wal=wal
+        )]
+    else:
+        targets = load_targets(variants_file)
+
+    # Refuse existing databases before downloading anything
+    check_targets(dir_path, targets, resume)
+
+    # Search for csv and sprites directories. If they are not in the provided
+    # directory, they are downloaded in the background and the build starts
+    # as soon as the csv files are extracted.
+    fetcher = start_fetch(dir_path, repository, verbose)
 
-    # Database initialization
-    log.info("Initialing {}".format(name), verbose)
     try:
-        db, languages = pdb.db_init(str(file_path))
-    except FileExistsError as err:
+        if variants_file is None:
+            metrics = build_variant(dir_path, targets[0], resume, verbose)
+            for table, infos in sorted(metrics.items()):
+                log.info("{}: {} rows inserted ({:.0f} rows/s)".format(
+                    table, infos["rows"],
+                    infos["rows"] / max(infos["seconds"], 1e-9)
+                ), verbose)
+        else:
+            build_variants(dir_path, targets, jobs, resume, verbose)
+    finally:
+        # Never leave the download running behind an interrupted build
+        if fetcher is not None:
+            fetcher.join()
+
+    if fetcher is not None:
+        fetcher.finish()
+
+
+@pokediadb.command(short_help="Diff two generated databases")
+@click.argument("old", type=click.Path(exists=1, dir_okay=0))
+@click.argument("new", type=click.Path(exists=1, dir_okay=0))
+@click.option("--output", "-o", type=click.Path(dir_okay=0), default=None,
+              help="Path of the patch file, default to NEW with .patch")
+@click.option("-v", "--verbose", is_flag=True, help="Explain the process")
+def diff(old, new, output, verbose):
+    """Write the row changes from the OLD database to the NEW one.
+
+    The patch file updates a copy of OLD with the patch command.
+
+    """
+    from pokediadb import delta
+    if output is None:
+        output = str(Path(new).with_suffix(".patch"))
+
+    log.info("Comparing {} and {}...".format(old, new), verbose)
+    changes = delta.diff_databases(old, new)
+    size = delta.write_patch(changes, output)
+
+    stats = delta.get_stats(changes)
+    log.info("Wrote {}: {} inserts, {} updates, {} deletes in {} bytes."
+             .format(output, stats["insert"], stats["update"],
+                     stats["delete"], size), verbose)
+
+
+@pokediadb.command(short_help="Apply a patch to a database")
+@click.argument("database", type=click.Path(exists=1, dir_okay=0))
+@click.argument("patch_file", type=click.Path(exists=1, dir_okay=0))
+@click.option("-v", "--verbose", is_flag=True, help="Explain the process")
+def patch(database, patch_file, verbose):
+    """Apply the row changes of PATCH_FILE to DATABASE.
+
+    Nothing is changed if DATABASE is not the old database of the patch.
+
+    """
+    from pokediadb import delta
+    try:
+        stats = delta.apply_patch(database, delta.read_patch(patch_file))
+    except ValueError as err:
         log.error("{}".format(err))
         raise click.Abort()
 
-    # Search for csv and sprites directories. If they are not in the provided
-    # directory, they will be downloaded.
-    if not csv_path.is_dir() or not (dir_path / "sprites").is_dir():
-        ctx.invoke(download, path=path, verbose=verbose)
+    log.info("Patched {}: {} inserts, {} updates, {} deletes.".format(
+        database, stats["insert"], stats["update"], stats["delete"]
+    ), verbose)
 
-    log.info("Building versions tables...", verbose)
-    pdb.build_versions(db, languages, csv_path)
 
-    log.info("Building types tables...", verbose)
-    pdb.build_types(db, languages, csv_path)
+@pokediadb.command("publish",
+                   short_help="Publish a database for running readers")
+@click.argument("database", type=click.Path(exists=1, dir_okay=0))
+@click.argument("directory", type=click.Path(exists=1, file_okay=0,
+                                             writable=1))
+@click.option("--keep", type=click.IntRange(1), default=None,
+              help="Number of generations kept in the directory")
+@click.option("-v", "--verbose", is_flag=True, help="Explain the process")
+def publish_db(database, directory, keep, verbose):
+    """Move DATABASE in DIRECTORY as its next generation.
+
+    Readers following DIRECTORY with pokediadb.access.HotSwapPool switch to
+    it between two requests.
+
+    """
+    from pokediadb import publish
+    if keep is None:
+        keep = publish.KEEP_GENERATIONS
+
+    generation, path = publish.publish_database(database, directory, keep)
+    log.info("Published {} as generation {}.".format(path, generation),
+             verbose)
+
 
-    log.info("Building abilities tables...", verbose)
-    pdb.build_abilities(db, languages, csv_path)
+@pokediadb.command(short_help="Measure the damage calculator throughput")
+@click.argument("database", type=click.Path(exists=1, dir_okay=0))
+@click.option("--size", type=click.IntRange(1), default=100,
+              help="Number of attackers and of defenders of the batch")
+@click.option("--repeat", type=click.IntRange(1), default=3,
+              help="Number of timed runs")
+def benchmark(database, size, repeat):
+    """Time pokediadb.calc on a random batch of DATABASE pokémons.
 
-    log.info("Building moves tables...", verbose)
-    pdb.build_moves(db, languages, csv_path)
+    Every attacker uses every damaging move on every defender and the
+    fastest run gives the number of matchups computed per second.
+
+    """
+    from pokediadb import calc
+    models.db.init(database)
+    try:
+        calculator = calc.DamageCalculator()
+        stats = calc.benchmark_damage(
+            calculator, calc.load_stat_table(), size, repeat
+        )
+    except (ImportError, OperationalError, ValueError) as err:
+        log.error("{}".format(err))
+        raise click.Abort()
+    finally:
+        models.db.close()
 
-    log.info("Building pokemons tables...", verbose)
-    pdb.build_pokemons(db, languages, csv_path)
+    log.info("{} matchups in {:.4f}s: {:,.0f} matchups/s.".format(
+        stats["matchups"], stats["seconds"], stats["per_second"]
+    ))
@@ -0,0 +1,256 @@
+"""Storage compaction of a generated pokédia database.
+
+Translation and link tables are only read by their natural key. As plain
+tables, sqlite stores their rows in a hidden rowid b-tree plus a separate
+index for the primary key. Rebuilt WITHOUT ROWID, the rows are stored once,
+clustered by the key. The file is then rewritten with VACUUM INTO, which
+drops the free pages left by the build.
+
+"""
+
+import os
+import time
+import sqlite3
+
+from pokediadb import models
+from pokediadb.access import get_uri
+
+# Maximum number of keys by table timed by measure_lookups
+LOOKUP_SAMPLES = 500
+
+
+def get_key_columns(model):
+    """Get the primary key columns of a model's table.
+
+    Args:
+        model (pokediadb.models.BaseModel): Model of the table.
+
+    Returns:
+        list: Column names of the primary key.
+
+    """
+    # pylint: disable=W0212
+    meta = model._meta
+    if meta.composite_key:
+        fields = [meta.fields[name] for name in meta.primary_key.field_names]
+    else:
+        fields = [meta.primary_key]
+
+    return [field.db_column for field in fields]
+
+
+def get_table_sql(conn, table):
+    """Get the CREATE TABLE statement of a table.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the database.
+        table (str): Name of the table.
+
+    Returns:
+        str: Statement, None if the table does not exist.
+
+    """
+    row = conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?",
+        (table,)
+    ).fetchone()
+
+    return row[0] if row else None
+
+
+def get_index_columns(conn, index):
+    """Get the columns of an index, in index order.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the database.
+        index (str): Name of the index.
+
+    Returns:
+        list: Column names of the index.
+
+    """
+    return [row[2] for row in conn.execute(
+        "PRAGMA index_info(\"{}\")".format(index)
+    )]
+
+
+def get_kept_indexes(conn, table, key):
+    """Get the indexes of a table still needed once clustered by its key.
+
+    A plain index whose columns are a prefix of the key duplicates the
+    clustered rows, lookups on those columns already use the key. Unique and
+    partial indexes are kept for their constraint or their filter.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the database.
+        table (str): Name of the table.
+        key (list): Primary key columns of the table.
+
+    Returns:
+        list: CREATE INDEX statements of the kept indexes.
+
+    """
+    indexes = conn.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND "
+        "tbl_name = ? AND sql IS NOT NULL", (table,)
+    ).fetchall()
+
+    kept = []
+    for name, sql in indexes:
+        columns = get_index_columns(conn, name)
+        redundant = (
+            not sql.upper().startswith("CREATE UNIQUE") and
+            " WHERE " not in sql.upper() and
+            None not in columns and key[:len(columns)] == columns
+        )
+        if not redundant:
+            kept.append(sql)
+
+    return kept
+
+
+def rebuild_without_rowid(conn, model):
+    """Rebuild the table of a model WITHOUT ROWID, sorted by its key.
+
+    Indexes duplicating a prefix of the key are not created again.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the database, inside a
+            transaction.
+        model (pokediadb.models.BaseModel): Model of the table.
+
+    Returns:
+        bool: True if the table was rebuilt, False if it does not exist or
+            is already WITHOUT ROWID.
+
+    """
+    # pylint: disable=W0212
+    table = model._meta.db_table
+    sql = get_table_sql(conn, table)
+    if sql is None or sql.rstrip().upper().endswith("WITHOUT ROWID"):
+        return False
+
+    key = get_key_columns(model)
+    indexes = get_kept_indexes(conn, table, key)
+
+    tmp_table = "{}_compact".format(table)
+    conn.execute("{} WITHOUT ROWID".format(
+        sql.replace("\"{}\"".format(table), "\"{}\"".format(tmp_table), 1)
+    ))
+    conn.execute("INSERT INTO \"{}\" SELECT * FROM \"{}\" ORDER BY {}".format(
+        tmp_table, table, ", ".join("\"{}\"".format(col) for col in key)
+    ))
+    conn.execute("DROP TABLE \"{}\"".format(table))
+    conn.execute("ALTER TABLE \"{}\" RENAME TO \"{}\"".format(
+        tmp_table, table
+    ))
+    for index in indexes:
+        conn.execute(index)
+
+    return True
+
+
+def measure_lookups(path):
+    """Measure the mean time of a point lookup in the compacted tables.
+
+    Up to LOOKUP_SAMPLES keys of each table are looked up one by one.
+
+    Args:
+        path (str): Path to the sqlite database file.
+
+    Returns:
+        float: Mean time of a lookup in seconds, 0 if no table is built.
+
+    """
+    # pylint: disable=W0212
+    conn = sqlite3.connect(get_uri(path), uri=True)
+    try:
+        lookups = []
+        for model in models.WITHOUT_ROWID_MODELS:
+            table = model._meta.db_table
+            if get_table_sql(conn, table) is None:
+                continue
+
+            columns = ", ".join(
+                "\"{}\"".format(col) for col in get_key_columns(model)
+            )
+            query = "SELECT * FROM \"{}\" WHERE {}".format(table, " AND ".join(
+                "\"{}\" = ?".format(col) for col in get_key_columns(model)
+            ))
+            keys = conn.execute(
+                "SELECT {0} FROM \"{1}\" ORDER BY {0} LIMIT ?".format(
+                    columns, table
+                ), (LOOKUP_SAMPLES,)
+            )
+            lookups.extend((query, key) for key in keys)
+
+        if not lookups:
+            return 0.0
+
+        start = time.perf_counter()
+        for query, key in lookups:
+            conn.execute(query, key).fetchall()
+
+        return (time.perf_counter() - start) / len(lookups)
+    finally:
+        conn.close()
+
+
+def compact_database(path):
+    """Rebuild the natural key tables WITHOUT ROWID and vacuum the database.
+
+    The database must not be opened by another connection.
+
+    Args:
+        path (str): Path to the sqlite database file.
+
+    Returns:
+        dict: File size in bytes and mean point lookup time in seconds,
+            before and after the compaction (size_before, size_after,
+            lookup_before and lookup_after).
+
+    Raises:
+        FileNotFoundError: Raised if the database does not exist.
+
+    """
+    if not os.path.isfile(path):
+        raise FileNotFoundError("The database '{}' does not exist.".format(
+            path
+        ))
+
+    report = {
+        "size_before": os.path.getsize(path),
+        "lookup_before": measure_lookups(path)
+    }
+
+    tmp_path = "{}.compact".format(path)
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    conn = sqlite3.connect(path, isolation_level=None)
+    try:
+        conn.execute("BEGIN")
+        try:
+            for model in models.WITHOUT_ROWID_MODELS:
+                rebuild_without_rowid(conn, model)
+        except sqlite3.Error:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+        # VACUUM INTO needs sqlite 3.27, older ones vacuum in place
+        if sqlite3.sqlite_version_info >= (3, 27):
+            conn.execute("VACUUM INTO ?", (tmp_path,))
+        else:
+            conn.execute("VACUUM")
+            tmp_path = None
+    finally:
+        conn.close()
+
+    if tmp_path is not None:
+        os.replace(tmp_path, path)
+
+    report["size_after"] = os.path.getsize(path)
+    report["lookup_after"] = measure_lookups(path)
+
+    return report
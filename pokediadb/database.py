@@ -1,69 +1,192 @@
-"""Helper functions with database."""
+"""Helper functions with database.
+
+The dbuilder modules and the sqlite limit probe are only loaded when a build
+needs them, so importing this module stays cheap.
+
+"""
 
 import os
+import json
+import time
+import functools
+import importlib
 from pathlib import Path
 
-import click
-
-from pokediadb import log
 from pokediadb import models
 from pokediadb.enums import Lang
 from pokediadb.utils import max_sql_variables
-from pokediadb import dbuilder
 
+# Insertion metrics by table name, filled by bulk_insert
+BUILD_METRICS = {}
+
+# Prepared INSERT statements by model, see get_insert_statement
+_INSERT_STATEMENTS = {}
+
+
+@functools.lru_cache(maxsize=None)
+def get_variable_limit():
+    """Get the maximum number of variables allowed in one sqlite query.
+
+    The limit is probed on the first call and then cached.
+
+    Returns:
+        int: SQLITE_MAX_VARIABLE_NUMBER of the current sqlite3 library.
+
+    """
+    return max_sql_variables()
+
+
+def get_insert_statement(model):
+    """Get the INSERT statement used to fill the table of the given model.
+
+    The statement is built once per model from its peewee fields and then
+    reused, so sqlite3 keeps a single prepared statement for each table.
+
+    Args:
+        model (pokediadb.models.BaseModel): Model of the table to fill.
+
+    Returns:
+        str: Parametrized INSERT statement.
+        list: Fields bound by the statement, in the order of its columns.
+
+    """
+    # pylint: disable=W0212
+    if model not in _INSERT_STATEMENTS:
+        fields = model._meta.declared_fields
+        query = "INSERT INTO \"{}\" ({}) VALUES ({})".format(
+            model._meta.db_table,
+            ", ".join("\"{}\"".format(field.db_column) for field in fields),
+            ", ".join("?" for _ in fields)
+        )
+        _INSERT_STATEMENTS[model] = (query, fields)
+
+    return _INSERT_STATEMENTS[model]
+
+
+def get_language_ids(languages):
+    """Get the database id of each supported language.
+
+    dbuilder functions get these ids instead of the Language instances, so
+    that their cached results only hold plain values.
+
+    Args:
+        languages (dict): Dictionary of supported languages.
 
-SQLITE_LIMIT_VARIABLE_NUMBER = max_sql_variables()
+    Returns:
+        dict: Id of the Language row by pokeapi language id.
 
+    """
+    return {int(lang): language.id for lang, language in languages.items()}
 
-def get_max_size(data):
-    """Get the maximum of numbers rows from data to be used in one time.
+
+def sort_rows(model, data):
+    """Sort rows by the primary key of their model.
+
+    Builds insert rows in this order, so that generating a database twice
+    from the same csv files gives the same tables.
 
     Args:
-        data (list): List of dict containing infos to build a
-            pokediadb.models object.
+        model (pokediadb.models.BaseModel): Model of the rows.
+        data (list): List of dict containing infos to build
+            pokediadb.models objects.
 
     Returns:
-        int: Max number of data's row.
+        list: Sorted rows.
 
     """
-    if data:
-        return (SQLITE_LIMIT_VARIABLE_NUMBER // len(data[0])) - 1
+    # pylint: disable=W0212
+    meta = model._meta
+    if meta.composite_key:
+        fields = [meta.fields[name] for name in meta.primary_key.field_names]
     else:
-        log.error("Provided an empty data list to get_max_size function.")
-        raise click.Abort()
+        fields = [meta.primary_key]
+
+    return sorted(data, key=lambda row: tuple(
+        field.db_value(row.get(field.name, field.default)) for field in fields
+    ))
 
 
-def db_init(path):
+def bulk_insert(pkm_db, model, data):
+    """Insert rows in the table of a model without building peewee queries.
+
+    Values are converted with the ``db_value`` method of each model's field
+    and written with ``sqlite3.Cursor.executemany`` in primary key order.
+    The number of rows and the time spent are added to BUILD_METRICS under
+    the name of the table.
+
+    Args:
+        pkm_db (pokedia.models.db): Pokediadb database.
+        model (pokediadb.models.BaseModel): Model of the table to fill.
+        data (list): List of dict containing infos to build
+            pokediadb.models objects.
+
+    Returns:
+        int: Number of inserted rows.
+
+    """
+    # pylint: disable=W0212
+    start = time.perf_counter()
+    query, fields = get_insert_statement(model)
+    rows = [
+        tuple(field.db_value(row.get(field.name, field.default))
+              for field in fields)
+        for row in sort_rows(model, data)
+    ]
+
+    cursor = pkm_db.get_cursor()
+    cursor.executemany(query, rows)
+
+    metrics = BUILD_METRICS.setdefault(
+        model._meta.db_table, {"rows": 0, "seconds": 0}
+    )
+    metrics["rows"] += len(rows)
+    metrics["seconds"] += time.perf_counter() - start
+
+    return len(rows)
+
+
+def db_init(path, resume=False, lang_codes=None):
     """Initialize pokémon database with the given name.
 
     Args:
         path (str): Path the sqlite database file.
+        resume (bool): If True, an existing database is reopened to complete
+            its build instead of being refused.
+        lang_codes (iterable): Codes of the languages to support, None for
+            every language of pokediadb.enums.Lang.
 
     Returns:
         peewee.SqliteDatabase : Database instance.
         dict: Dictionary with Language instances.
 
     Raises:
-        FileExistsError: Raised if the database already exist.
+        FileExistsError: Raised if the database already exist and resume is
+            False.
         peewee.OperationalError: Raised if languages or DamageClass tables
             already exists or they objects already exist.
 
     """
     # Check if there is a preexisting database
-    if os.path.isfile(path):
+    if os.path.isfile(path) and not resume:
         msg = "The database '{}' already exist.".format(path)
         raise FileExistsError(msg)
 
+    BUILD_METRICS.clear()
+
     # Connection and creation and initialization of Language table
     models.db.init(path)
     models.db.connect()
-    models.db.create_tables([models.Language, models.DamageClass], safe=True)
+    models.db.create_tables(
+        [models.Language, models.DamageClass, models.BuildState], safe=True
+    )
 
     # Create languages
-    languages = {
-        Lang.fr: models.Language.get_or_create(code="fr", name="Français")[0],
-        Lang.en: models.Language.get_or_create(code="en", name="English")[0],
-    }
+    languages = {}
+    for lang, name in ((Lang.fr, "Français"), (Lang.en, "English")):
+        if lang_codes is None or lang.name in lang_codes:
+            languages[lang] = models.Language.get_or_create(
+                code=lang.name, name=name
+            )[0]
 
     # Create damage class
     models.DamageClass.get_or_create(id=1, name="Status", image="status.png")
@@ -75,177 +198,533 @@ def db_init(path):
     return models.db, languages
 
 
+def get_completed_stages(pkm_db):
+    """Get the build stages already committed in the database.
+
+    Args:
+        pkm_db (pokedia.models.db): Pokediadb database.
+
+    Returns:
+        dict: Options (JSON string) by completed stage name.
+
+    """
+    return {
+        state.stage: state.options for state in models.BuildState.select()
+    }
+
+
+def run_stage(pkm_db, stage, tables, build, *args, **kwargs):
+    """Run a build stage unless it has already been completed.
+
+    The stage tables are dropped, rebuilt and the stage recorded in the
+    BuildState table within one transaction. An interrupted stage then leaves
+    nothing behind and is simply run again by the next call.
+
+    Args:
+        pkm_db (pokedia.models.db): Pokediadb database.
+        stage (str): Name of the stage.
+        tables (iterable): Models of the tables built by the stage.
+        build (callable): Function building the tables.
+        *args: Arguments of the build function.
+        **kwargs: Options of the build function, recorded with the stage.
+
+    Returns:
+        bool: True if the stage ran, False if it was already completed.
+
+    Raises:
+        ValueError: Raised if the stage was completed with other options.
+
+    """
+    options = json.dumps(kwargs, sort_keys=True)
+    completed = get_completed_stages(pkm_db)
+    if stage in completed:
+        if completed[stage] != options:
+            raise ValueError(
+                "The {} stage was built with other options: {}.".format(
+                    stage, completed[stage]
+                )
+            )
+        return False
+
+    with pkm_db.atomic():
+        pkm_db.drop_tables(list(tables), safe=True)
+        build(*args, **kwargs)
+        models.BuildState.create(stage=stage, options=options)
+
+    return True
+
+
 # =========================================================================== #
 #                               Version builder                               #
 # =========================================================================== #
-def build_versions(pkm_db, languages, csv_dir):
+def build_versions(pkm_db, languages, csv_dir, generation=None,
+                   version_group=None):
     """Build the pokémon's version database with data from pokeapi's csv files.
 
     Args:
         pkm_db (pokedia.models.db): Pokediadb database.
         languages (dict): Dictionary of supported languages.
         csv_dir (str): Path to csv directory.
+        generation (int): Last built generation, None for all of them.
+        version_group (int): Only built version group, None for all of them.
+
+    Raises:
+        ValueError: Raised if the version group is unknown or does not
+            belong to the generation.
 
     """
-    pkm_db.create_tables([models.Version, models.VersionTranslation])
+    from pokediadb.dbuilder import version as version_builder
+
     csv_dir = Path(csv_dir).absolute()
+    subset = version_builder.get_subset(csv_dir, generation, version_group)
+    pkm_db.create_tables([models.Version, models.VersionTranslation])
 
     # Extract data about versions from pokedia csv files
-    pkm_versions = dbuilder.version.get_version_groups(
-        csv_dir, dbuilder.version.get_versions(csv_dir)
+    pkm_versions = version_builder.get_version_groups(
+        csv_dir, version_builder.get_versions(csv_dir),
+        subset["version_groups"]
     )
-    pkm_version_names = dbuilder.version.get_version_names(
-        csv_dir, pkm_versions, languages
+    pkm_version_names = version_builder.get_version_names(
+        csv_dir, pkm_versions, get_language_ids(languages)
     )
 
     # Insert all collected data about versions in the database
     with pkm_db.atomic():
-        models.Version.insert_many(pkm_versions).execute()
-        models.VersionTranslation.insert_many(pkm_version_names).execute()
+        bulk_insert(pkm_db, models.Version, pkm_versions)
+        bulk_insert(pkm_db, models.VersionTranslation, pkm_version_names)
 
 
 # =========================================================================== #
 #                                 Type builder                                #
 # =========================================================================== #
-def build_types(pkm_db, languages, csv_dir):
+def build_types(pkm_db, languages, csv_dir, generation=None,
+                version_group=None):
     """Build the pokémon's types database with data from pokeapi's csv files.
 
     Args:
         pkm_db (pokedia.models.db): Pokediadb database.
         languages (dict): Dictionary of supported languages.
         csv_dir (str): Path to csv directory.
+        generation (int): Last built generation, None for all of them.
+        version_group (int): Only built version group, None for all of them.
+
+    Raises:
+        ValueError: Raised if the version group is unknown or does not
+            belong to the generation.
 
     """
+    from pokediadb.dbuilder import type as type_builder
+    from pokediadb.dbuilder import version as version_builder
+
+    csv_dir = Path(csv_dir).absolute()
+    subset = version_builder.get_subset(csv_dir, generation, version_group)
     pkm_db.create_tables([
         models.Type, models.TypeTranslation, models.TypeEfficacy
     ])
-    csv_dir = Path(csv_dir).absolute()
 
     # Extract data about types from pokedia csv files
-    pkm_types = dbuilder.type.get_types(csv_dir)
-    pkm_type_eff = dbuilder.type.get_type_efficacies(csv_dir, pkm_types)
-    pkm_type_names = dbuilder.type.get_type_names(
-        csv_dir, pkm_types, languages
+    pkm_types = type_builder.get_types(csv_dir, subset["generation"])
+    pkm_type_eff = type_builder.get_type_efficacies(csv_dir, pkm_types)
+    pkm_type_names = type_builder.get_type_names(
+        csv_dir, pkm_types, get_language_ids(languages)
     )
 
     # Insert all collected data about types in the database
     with pkm_db.atomic():
-        models.Type.insert_many(list(pkm_types.values())).execute()
-        models.TypeEfficacy.insert_many(pkm_type_eff).execute()
-        models.TypeTranslation.insert_many(pkm_type_names).execute()
+        bulk_insert(pkm_db, models.Type, list(pkm_types.values()))
+        bulk_insert(pkm_db, models.TypeEfficacy, pkm_type_eff)
+        bulk_insert(pkm_db, models.TypeTranslation, pkm_type_names)
 
 
 # =========================================================================== #
 #                               Ability builder                               #
 # =========================================================================== #
-def build_abilities(pkm_db, languages, csv_dir):
+def build_abilities(pkm_db, languages, csv_dir, generation=None,
+                    version_group=None):
     """Build pokémon's abilities database with data from pokeapi's csv files.
 
     Args:
         pkm_db (pokedia.models.db): Pokediadb database.
         languages (dict): Dictionary of supported languages.
         csv_dir (str): Path to csv directory.
+        generation (int): Last built generation, None for all of them.
+        version_group (int): Only built version group, None for all of them.
+
+    Raises:
+        ValueError: Raised if the version group is unknown or does not
+            belong to the generation.
 
     """
-    pkm_db.create_tables([models.Ability, models.AbilityTranslation])
+    from pokediadb.dbuilder import ability as ability_builder
+    from pokediadb.dbuilder import version as version_builder
+
     csv_dir = Path(csv_dir).absolute()
+    subset = version_builder.get_subset(csv_dir, generation, version_group)
+    pkm_db.create_tables([models.Ability, models.AbilityTranslation])
 
     # Extract data about abilities from pokedia csv files
-    pkm_abilities = dbuilder.ability.get_abilities(csv_dir)
-    pkm_ability_trans = dbuilder.ability.get_ability_names(
-        csv_dir, pkm_abilities, languages
+    pkm_abilities = ability_builder.get_abilities(
+        csv_dir, subset["generation"]
+    )
+    pkm_ability_trans = ability_builder.get_ability_names(
+        csv_dir, pkm_abilities, get_language_ids(languages)
     )
-    dbuilder.ability.update_ability_effects(
-        csv_dir, pkm_ability_trans, languages
+    ability_builder.update_ability_effects(
+        csv_dir, pkm_ability_trans, languages, subset["flavor_version_group"]
     )
 
     # Insert all collected data about abilities in the database
     with pkm_db.atomic():
-        models.Ability.insert_many(list(pkm_abilities.values())).execute()
-
-        data = list(pkm_ability_trans.values())
-        size = get_max_size(data)
-        for i in range(0, len(data), size):
-            models.AbilityTranslation.insert_many(data[i:i+size]).execute()
+        bulk_insert(pkm_db, models.Ability, list(pkm_abilities.values()))
+        bulk_insert(
+            pkm_db, models.AbilityTranslation, list(pkm_ability_trans.values())
+        )
 
 
 # =========================================================================== #
 #                                 Move builder                                #
 # =========================================================================== #
-def build_moves(pkm_db, languages, csv_dir):
+def build_moves(pkm_db, languages, csv_dir, generation=None,
+                version_group=None):
     """Build the pokémon moves database with data from pokeapi's csv files.
 
     Args:
         pkm_db (pokedia.models.db): Pokediadb database.
         languages (dict): Dictionary of supported languages.
         csv_dir (str): Path to csv directory.
+        generation (int): Last built generation, None for all of them.
+        version_group (int): Only built version group, None for all of them.
+
+    Raises:
+        ValueError: Raised if the version group is unknown or does not
+            belong to the generation.
 
     """
-    pkm_db.create_tables([models.Move, models.MoveTranslation])
+    from pokediadb.dbuilder import move as move_builder
+    from pokediadb.dbuilder import version as version_builder
+
     csv_dir = Path(csv_dir).absolute()
+    subset = version_builder.get_subset(csv_dir, generation, version_group)
+    pkm_db.create_tables([models.Move, models.MoveTranslation])
 
     # Extract data about moves from pokedia csv files
-    pkm_moves = dbuilder.move.get_moves(csv_dir)
-    pkm_move_trans = dbuilder.move.get_move_names(
-        csv_dir, pkm_moves, languages
+    pkm_moves = move_builder.get_moves(csv_dir, subset["generation"])
+    pkm_move_trans = move_builder.get_move_names(
+        csv_dir, pkm_moves, get_language_ids(languages)
+    )
+    move_builder.update_move_effects(
+        csv_dir, pkm_move_trans, languages, subset["flavor_version_group"]
     )
-    dbuilder.move.update_move_effects(csv_dir, pkm_move_trans, languages)
 
     # Insert all collected data about moves in the database
     with pkm_db.atomic():
-        move_data = list(pkm_moves.values())
-        size = get_max_size(move_data)
-        for i in range(0, len(move_data), size):
-            models.Move.insert_many(move_data[i:i+size]).execute()
-
-        move_trans_data = list(pkm_move_trans.values())
-        size = get_max_size(move_trans_data)
-        for i in range(0, len(move_data), size):
-            models.MoveTranslation.insert_many(
-                move_trans_data[i:i+size]
-            ).execute()
+        bulk_insert(pkm_db, models.Move, list(pkm_moves.values()))
+        bulk_insert(
+            pkm_db, models.MoveTranslation, list(pkm_move_trans.values())
+        )
 
 
 # =========================================================================== #
 #                               Pokemon builder                               #
 # =========================================================================== #
-def build_pokemons(pkm_db, languages, csv_dir):
+def build_pokemons(pkm_db, languages, csv_dir, generation=None,
+                   version_group=None):
     """Build the pokémon abilities database with data from pokeapi's csv files.
 
     Args:
         pkm_db (pokedia.models.db): Pokediadb database.
         languages (dict): Dictionary of supported languages.
         csv_dir (str): Path to csv directory.
+        generation (int): Last built generation, None for all of them.
+        version_group (int): Only built version group, None for all of them.
 
     Raises:
         peewee.OperationalError: Raised if ability tables haven't been build.
+        ValueError: Raised if the version group is unknown or does not
+            belong to the generation.
 
     """
+    from pokediadb.dbuilder import pokemon as pokemon_builder
+    from pokediadb.dbuilder import version as version_builder
+
+    csv_dir = Path(csv_dir).absolute()
+    subset = version_builder.get_subset(csv_dir, generation, version_group)
     pkm_db.create_tables([
         models.Pokemon, models.PokemonTranslation, models.PokemonAbility
     ])
-    csv_dir = Path(csv_dir).absolute()
 
     # Extract data about pokémons from pokedia csv files
-    pkms = dbuilder.pokemon.get_pokemons(csv_dir)
-    pkm_abilities = dbuilder.pokemon.get_pokemon_abilities(csv_dir, pkms)
-    pkm_trans = dbuilder.pokemon.get_pokemon_trans(csv_dir, pkms, languages)
+    pkms = pokemon_builder.get_pokemons(csv_dir, subset["generation"])
+    ability_ids = [ability_id for ability_id, in models.Ability.select(
+        models.Ability.id
+    ).tuples()]
+    pkm_abilities = pokemon_builder.get_pokemon_abilities(
+        csv_dir, pkms, ability_ids
+    )
+    pkm_trans = pokemon_builder.get_pokemon_trans(
+        csv_dir, pkms, get_language_ids(languages)
+    )
 
     # Insert all collected data about pokémons in the database
     with pkm_db.atomic():
-        pkm_data = list(pkms.values())
-        size = get_max_size(pkm_data)
-        for i in range(0, len(pkm_data), size):
-            models.Pokemon.insert_many(pkm_data[i:i+size]).execute()
-
-        size = get_max_size(pkm_abilities)
-        for i in range(0, len(pkm_abilities), size):
-            models.PokemonAbility.insert_many(
-                pkm_abilities[i:i+size]
-            ).execute()
-
-        size = get_max_size(pkm_trans)
-        for i in range(0, len(pkm_trans), size):
-            models.PokemonTranslation.insert_many(
-                pkm_trans[i:i+size]
-            ).execute()
+        bulk_insert(pkm_db, models.Pokemon, list(pkms.values()))
+        bulk_insert(pkm_db, models.PokemonAbility, pkm_abilities)
+        bulk_insert(pkm_db, models.PokemonTranslation, pkm_trans)
+
+
+def build_pokemon_moves(pkm_db, languages, csv_dir, generation=None,
+                        version_group=None):
+    """Build the table of the moves learned by each pokémon.
+
+    Args:
+        pkm_db (pokedia.models.db): Pokediadb database.
+        languages (dict): Dictionary of supported languages.
+        csv_dir (str): Path to csv directory.
+        generation (int): Last built generation, None for all of them.
+        version_group (int): Only built version group, None for all of them.
+
+    Raises:
+        peewee.OperationalError: Raised if pokémon or move tables haven't
+            been build.
+        ValueError: Raised if the version group is unknown or does not
+            belong to the generation.
+
+    """
+    # pylint: disable=W0613
+    from pokediadb.dbuilder import pokemon as pokemon_builder
+    from pokediadb.dbuilder import version as version_builder
+
+    csv_dir = Path(csv_dir).absolute()
+    subset = version_builder.get_subset(csv_dir, generation, version_group)
+    pkm_db.create_tables([models.PokemonMove])
+
+    pkm_ids = [pkm_id for pkm_id, in models.Pokemon.select(
+        models.Pokemon.id
+    ).tuples()]
+    move_ids = [move_id for move_id, in models.Move.select(
+        models.Move.id
+    ).tuples()]
+    pkm_moves = pokemon_builder.get_pokemon_moves(
+        csv_dir, pkm_ids, move_ids, subset["version_groups"]
+    )
+
+    with pkm_db.atomic():
+        bulk_insert(pkm_db, models.PokemonMove, pkm_moves)
+
+
+def build_learnsets(pkm_db, languages, csv_dir, generation=None,
+                    version_group=None):
+    """Build the learnset bitsets from the pokémon moves table.
+
+    Args:
+        pkm_db (pokedia.models.db): Pokediadb database.
+        languages (dict): Dictionary of supported languages.
+        csv_dir (str): Path to csv directory.
+        generation (int): Last built generation, None for all of them.
+        version_group (int): Only built version group, None for all of them.
+
+    Raises:
+        peewee.OperationalError: Raised if the pokémon moves table hasn't
+            been build.
+
+    """
+    # pylint: disable=W0613
+    from pokediadb import learnset
+
+    learnset.build_learnsets(pkm_db)
+
+
+def build_pokemon_stats(pkm_db, languages, csv_dir, generation=None,
+                        version_group=None):
+    """Build the table of the base stats and effort values of each pokémon.
+
+    Args:
+        pkm_db (pokedia.models.db): Pokediadb database.
+        languages (dict): Dictionary of supported languages.
+        csv_dir (str): Path to csv directory.
+        generation (int): Last built generation, None for all of them.
+        version_group (int): Only built version group, None for all of them.
+
+    Raises:
+        peewee.OperationalError: Raised if the pokémon tables haven't been
+            build.
+
+    """
+    # pylint: disable=W0613
+    from pokediadb.dbuilder import pokemon as pokemon_builder
+
+    csv_dir = Path(csv_dir).absolute()
+    pkm_db.create_tables([models.PokemonStat])
+
+    pkm_ids = [pkm_id for pkm_id, in models.Pokemon.select(
+        models.Pokemon.id
+    ).tuples()]
+    pkm_stats = pokemon_builder.get_pokemon_stats(csv_dir, pkm_ids)
+
+    with pkm_db.atomic():
+        bulk_insert(pkm_db, models.PokemonStat, pkm_stats)
+
+
+# =========================================================================== #
+#                              Evolution builder                              #
+# =========================================================================== #
+def build_evolutions(pkm_db, languages, csv_dir, generation=None,
+                     version_group=None):
+    """Build the evolution chains of the pokémons and their closure.
+
+    Args:
+        pkm_db (pokedia.models.db): Pokediadb database.
+        languages (dict): Dictionary of supported languages.
+        csv_dir (str): Path to csv directory.
+        generation (int): Last built generation, None for all of them.
+        version_group (int): Only built version group, None for all of them.
+
+    Raises:
+        peewee.OperationalError: Raised if the pokémon tables haven't been
+            build.
+
+    """
+    # pylint: disable=W0613
+    from pokediadb.dbuilder import evolution as evolution_builder
+
+    csv_dir = Path(csv_dir).absolute()
+    pkm_db.create_tables([models.PokemonEvolution, models.EvolutionClosure])
+
+    # Pokémons out of the generation are not built and end chains
+    pkm_ids = [pkm_id for pkm_id, in models.Pokemon.select(
+        models.Pokemon.id
+    ).order_by(models.Pokemon.id).tuples()]
+    evolutions = evolution_builder.get_evolutions(csv_dir, pkm_ids)
+    closure = evolution_builder.get_evolution_closure(evolutions)
+
+    with pkm_db.atomic():
+        bulk_insert(
+            pkm_db, models.PokemonEvolution, list(evolutions.values())
+        )
+        bulk_insert(pkm_db, models.EvolutionClosure, closure)
+
+
+def load_csv_rows(csv_dir):
+    """Parse the csv files read by the builders once.
+
+    Rows of the files in VERSION_GROUP_FILES are partitioned by version
+    group, so that get_variant_rows routes each variant the rows it reads.
+
+    Args:
+        csv_dir (str): Path to csv directory.
+
+    Returns:
+        dict: Rows (without header) by csv file name, or dict of rows by
+            version group id (str) for the files in VERSION_GROUP_FILES.
+            Missing files are skipped.
+
+    """
+    from pokediadb.dbuilder import cache
+    from pokediadb.dbuilder import reader
+
+    # Importing the builders registers the csv files they read
+    for builder in ("version", "type", "ability", "move", "pokemon",
+                    "evolution"):
+        importlib.import_module("pokediadb.dbuilder." + builder)
+
+    csv_dir = Path(csv_dir).absolute()
+    csv_rows = {}
+    for name in sorted(cache.SOURCE_FILES):
+        if not (csv_dir / name).is_file():
+            continue
+
+        rows = reader.read_rows(csv_dir / name)
+        if name not in VERSION_GROUP_FILES:
+            csv_rows[name] = list(rows)
+            continue
+
+        _, column = VERSION_GROUP_FILES[name]
+        groups = csv_rows[name] = {}
+        for row in rows:
+            groups.setdefault(row[column], []).append(row)
+
+    return csv_rows
+
+
+def get_variant_rows(csv_dir, csv_rows, tables=None, generation=None,
+                     version_group=None):
+    """Select the parsed csv rows read by the build of one variant.
+
+    Files of VERSION_GROUP_FILES only keep the rows of the built version
+    groups, and are left out when their stage is not built. The other files
+    are small and kept whole.
+
+    Args:
+        csv_dir (str): Path to csv directory.
+        csv_rows (dict): Parsed rows returned by load_csv_rows.
+        tables (list): Names of the built stages, None for all of them.
+        generation (int): Last built generation, None for all of them.
+        version_group (int): Only built version group, None for all of them.
+
+    Returns:
+        dict: Rows (without header) by csv file name.
+
+    Raises:
+        ValueError: Raised if the version group is unknown or does not
+            belong to the generation.
+
+    """
+    from pokediadb.dbuilder import version as version_builder
+
+    version_groups = version_builder.get_subset(
+        Path(csv_dir).absolute(), generation, version_group
+    )["version_groups"]
+
+    variant_rows = {}
+    for name, rows in csv_rows.items():
+        if name not in VERSION_GROUP_FILES:
+            variant_rows[name] = rows
+            continue
+
+        stage, _ = VERSION_GROUP_FILES[name]
+        if tables is not None and stage not in tables:
+            continue
+
+        variant_rows[name] = [
+            row for group, group_rows in sorted(rows.items())
+            if version_groups is None or int(group) in version_groups
+            for row in group_rows
+        ]
+
+    return variant_rows
+
+
+# Build stages in dependency order, with the tables built by each of them
+BUILD_STAGES = (
+    ("versions", build_versions, (models.Version, models.VersionTranslation)),
+    ("types", build_types, (
+        models.Type, models.TypeTranslation, models.TypeEfficacy
+    )),
+    ("abilities", build_abilities, (
+        models.Ability, models.AbilityTranslation
+    )),
+    ("moves", build_moves, (models.Move, models.MoveTranslation)),
+    ("pokemons", build_pokemons, (
+        models.Pokemon, models.PokemonTranslation, models.PokemonAbility
+    )),
+    ("pokemon moves", build_pokemon_moves, (models.PokemonMove,)),
+    ("learnsets", build_learnsets, (models.PokemonLearnset,)),
+    ("stats", build_pokemon_stats, (models.PokemonStat,)),
+    ("evolutions", build_evolutions, (
+        models.PokemonEvolution, models.EvolutionClosure
+    )),
+)
+
+# Csv files partitioned by version group, with the stage reading them and
+# the index of their version group column
+VERSION_GROUP_FILES = {"pokemon_moves.csv": ("pokemon moves", 1)}
+
+# Stages whose tables are read by each stage
+STAGE_REQUIREMENTS = {
+    "moves": ("types",),
+    "pokemons": ("abilities",),
+    "pokemon moves": ("moves", "pokemons"),
+    "learnsets": ("pokemon moves",),
+    "stats": ("pokemons",),
+    "evolutions": ("pokemons",),
+}
@@ -1,6 +1,5 @@
-# flake8: noqa
-import pokediadb.dbuilder.version
-import pokediadb.dbuilder.type
-import pokediadb.dbuilder.ability
-import pokediadb.dbuilder.move
-import pokediadb.dbuilder.pokemon
+"""Parsers of the pokeapi csv files.
+
+Each module is imported by the database builder needing it.
+
+"""
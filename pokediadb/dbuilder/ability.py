@@ -1,11 +1,15 @@
-import csv
+from pokediadb.dbuilder import cache
+from pokediadb.dbuilder import flavor
+from pokediadb.dbuilder import reader
 
 
-def get_abilities(csv_dir):
+@cache.cached("abilities.csv")
+def get_abilities(csv_dir, generation=None):
     """Get information to build pokediadb.models.Ability objects.
 
     Args:
         csv_dir (pathlib.Path): Path to csv directory.
+        generation (int): Skip abilities introduced after this generation.
 
     Returns:
         dict: Dict of dict containing infos to build
@@ -16,30 +20,30 @@ def get_abilities(csv_dir):
 
     """
     pkm_abilities = {}
-    with (csv_dir / "abilities.csv").open(encoding="utf8") as f_ability:
-        reader = csv.reader(f_ability)
-        next(reader)  # Skip header
-
-        for row in reader:
-            ability_id = int(row[0])
-            # Skip weird abilities
-            if ability_id > 10000:
-                break
-
-            pkm_abilities[ability_id] = {
-                "id": int(row[0]), "generation": int(row[2])
-            }
+    for row in reader.read_rows(csv_dir / "abilities.csv"):
+        ability_id = int(row[0])
+        # Skip weird abilities
+        if ability_id > 10000:
+            break
+
+        if generation is not None and int(row[2]) > generation:
+            continue
+
+        pkm_abilities[ability_id] = {
+            "id": int(row[0]), "generation": int(row[2])
+        }
 
     return pkm_abilities
 
 
+@cache.cached("ability_names.csv")
 def get_ability_names(csv_dir, pkm_abilities, languages):
     """Get the name of each pokémon ability in different languages.
 
     Args:
         csv_dir (pathlib.Path): Path to csv directory.
         pkm_abilities (dict): Dict of dict containing ability infos.
-        languages (dict): Dictionary of supported languages.
+        languages (dict): Id of the Language row by pokeapi language id.
 
     Returns:
         list: Dict containing infos to build
@@ -50,31 +54,28 @@ def get_ability_names(csv_dir, pkm_abilities, languages):
 
     """
     pkm_ability_trans = {}  # Contains all fields needing translations
-    with (csv_dir / "ability_names.csv").open(encoding="utf8") as f_ab_name:
-        reader = csv.reader(f_ab_name)
-        next(reader)  # Skip header
-
-        for row in reader:
-            ability_id = int(row[0])
-            lang_id = int(row[1])
-
-            # Skip weird types
-            if ability_id > 10000:
-                break
-
-            # Key for pkm_abilities_trans dictionary
-            data_id = "{}-{}".format(ability_id, lang_id)
-            if lang_id in languages:
-                pkm_ability_trans[data_id] = {
-                    "ability": pkm_abilities[ability_id]["id"],
-                    "lang": languages[lang_id],
-                    "name": row[2]
-                }
+    for row in reader.read_rows(csv_dir / "ability_names.csv"):
+        ability_id = int(row[0])
+        lang_id = int(row[1])
+
+        # Skip weird types
+        if ability_id > 10000:
+            break
+
+        # Key for pkm_abilities_trans dictionary
+        data_id = "{}-{}".format(ability_id, lang_id)
+        if lang_id in languages and ability_id in pkm_abilities:
+            pkm_ability_trans[data_id] = {
+                "ability": pkm_abilities[ability_id]["id"],
+                "lang": languages[lang_id],
+                "name": row[2]
+            }
 
-        return pkm_ability_trans
+    return pkm_ability_trans
 
 
-def update_ability_effects(csv_dir, pkm_ability_trans, languages):
+def update_ability_effects(csv_dir, pkm_ability_trans, languages,
+                           version_group=flavor.FLAVOR_VERSION_GROUP):
     """Update the dict of AbilityTranslation infos to add effect text.
 
     Args:
@@ -82,23 +83,20 @@ def update_ability_effects(csv_dir, pkm_ability_trans, languages):
         pkm_ability_trans (dict): Dict of dict containing
             infos about ability that need translations.
         languages (dict): Dictionary of supported languages.
+        version_group (int): Id of the version group of the effect texts.
 
     Raises:
         FileNotFoundError:: Raised if ability_flavor_text.csv does not exist.
 
     """
-    with (csv_dir / "ability_flavor_text.csv").open(
-            encoding="utf8") as f_ab_eff:
-        reader = csv.reader(f_ab_eff)
-        next(reader)  # Skip header
-
-        for row in reader:
-            # Skip older version since they are not complete
-            if int(row[1]) != 16:
-                continue
-
-            lang_id = int(row[2])
-            data_id = "{}-{}".format(row[0], lang_id)
-            effect = row[3].replace("\n", " ")
-            if lang_id in languages:
-                pkm_ability_trans[data_id]["effect"] = effect
+    effects = flavor.get_flavor_texts(
+        csv_dir / "ability_flavor_text.csv", languages, version_group
+    )
+    for (ability_id, lang_id), effect in effects.items():
+        data_id = "{}-{}".format(ability_id, lang_id)
+        if data_id in pkm_ability_trans:
+            pkm_ability_trans[data_id]["effect"] = effect
+
+    # Abilities without text in the version group
+    for ability_trans in pkm_ability_trans.values():
+        ability_trans.setdefault("effect", "")
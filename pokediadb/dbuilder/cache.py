@@ -0,0 +1,173 @@
+"""Cache of the parsed dbuilder results.
+
+The result of a decorated dbuilder function is pickled in a cache folder of
+the csv directory. It is keyed by the function, BUILDER_VERSION, the content
+hash of the csv files it reads and its other arguments, so building several
+databases from the same pokeapi csv files parses each of them once. Cached
+results only hold plain values, never model instances.
+
+Writing an entry removes the entries of the same call made from other csv
+contents or another BUILDER_VERSION, so the folder doesn't grow with each
+pokeapi update.
+
+Set the POKEDIADB_PARSE_CACHE environment variable to 0 to disable the cache.
+
+"""
+
+import os
+import pickle
+import hashlib
+import functools
+
+# Increment it when a dbuilder function changes its output
+BUILDER_VERSION = 2
+
+CACHE_DIR_NAME = ".cache"
+
+# Names of the csv files read by the decorated functions
+SOURCE_FILES = set()
+
+# Content hash by csv file path, size and modification time
+_FILE_HASHES = {}
+
+
+def is_enabled():
+    """Check if the parse cache is enabled.
+
+    Returns:
+        bool: False if POKEDIADB_PARSE_CACHE is set to 0.
+
+    """
+    return os.environ.get("POKEDIADB_PARSE_CACHE", "1") != "0"
+
+
+def get_file_hash(csv_file):
+    """Get the sha256 hash of a csv file content.
+
+    Hashes are memoized as long as the size and the modification time of the
+    file don't change.
+
+    Args:
+        csv_file (pathlib.Path): Path to the csv file.
+
+    Returns:
+        str: Hexadecimal hash, None if the file does not exist.
+
+    """
+    try:
+        stat = csv_file.stat()
+    except OSError:
+        return None
+
+    key = (str(csv_file), stat.st_size, stat.st_mtime_ns)
+    if key not in _FILE_HASHES:
+        sha = hashlib.sha256()
+        with csv_file.open("rb") as f_csv:
+            for chunk in iter(lambda: f_csv.read(1 << 20), b""):
+                sha.update(chunk)
+        _FILE_HASHES[key] = sha.hexdigest()
+
+    return _FILE_HASHES[key]
+
+
+def get_key(func, csv_dir, csv_names, args, kwargs):
+    """Get the cache key of a dbuilder function call.
+
+    Args:
+        func (callable): dbuilder function.
+        csv_dir (pathlib.Path): Path to csv directory.
+        csv_names (tuple): Names of the csv files read by the function.
+        args (tuple): Other positional arguments of the call.
+        kwargs (dict): Keyword arguments of the call.
+
+    Returns:
+        tuple: Hexadecimal keys of the call (function and arguments) and of
+            its sources (BUILDER_VERSION and csv contents).
+
+    """
+    call = hashlib.sha256("{}.{}".format(
+        func.__module__, func.__name__
+    ).encode())
+    call.update(pickle.dumps(
+        (args, sorted(kwargs.items())), pickle.HIGHEST_PROTOCOL
+    ))
+
+    sources = hashlib.sha256(str(BUILDER_VERSION).encode())
+    for csv_name in csv_names:
+        sources.update("{}={}".format(
+            csv_name, get_file_hash(csv_dir / csv_name)
+        ).encode())
+
+    return call.hexdigest(), sources.hexdigest()
+
+
+def evict_stale(cache_file, call_key):
+    """Remove the other entries of a call, made from other sources.
+
+    Args:
+        cache_file (pathlib.Path): Path to the current entry.
+        call_key (str): Key of the call.
+
+    """
+    for stale in cache_file.parent.glob("{}-*.pickle".format(call_key)):
+        if stale != cache_file:
+            try:
+                stale.unlink()
+            except OSError:
+                pass
+
+
+def cached(*csv_names):
+    """Decorate a dbuilder function to cache its result.
+
+    The decorated function takes the csv directory as first argument and
+    must not modify its other arguments.
+
+    Args:
+        *csv_names: Names of the csv files read by the function.
+
+    Returns:
+        callable: Decorator.
+
+    """
+    SOURCE_FILES.update(csv_names)
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(csv_dir, *args, **kwargs):
+            if not is_enabled():
+                return func(csv_dir, *args, **kwargs)
+
+            cache_dir = csv_dir / CACHE_DIR_NAME
+            call_key, sources_key = get_key(
+                func, csv_dir, csv_names, args, kwargs
+            )
+            cache_file = cache_dir / "{}-{}.pickle".format(
+                call_key, sources_key
+            )
+            try:
+                with cache_file.open("rb") as f_cache:
+                    return pickle.load(f_cache)
+            except (OSError, EOFError, pickle.UnpicklingError):
+                pass
+
+            result = func(csv_dir, *args, **kwargs)
+
+            # Write then rename so concurrent builds never read a partial file
+            tmp_file = cache_file.with_name(
+                "{}.{}.tmp".format(cache_file.name, os.getpid())
+            )
+            try:
+                cache_dir.mkdir(exist_ok=True)
+                with tmp_file.open("wb") as f_cache:
+                    pickle.dump(result, f_cache, pickle.HIGHEST_PROTOCOL)
+                os.replace(str(tmp_file), str(cache_file))
+                evict_stale(cache_file, call_key)
+            except OSError:
+                pass
+
+            return result
+
+        return wrapper
+
+    return decorator
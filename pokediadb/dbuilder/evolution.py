@@ -0,0 +1,86 @@
+from pokediadb.dbuilder import cache
+from pokediadb.dbuilder import reader
+
+
+@cache.cached("pokemon_species.csv", "pokemon_evolution.csv")
+def get_evolutions(csv_dir, pkm_ids):
+    """Get information to build pokediadb.models.PokemonEvolution objects.
+
+    Built pokémons are the default forms of their species, so a species id
+    is also the id of its pokémon. A species whose ancestor isn't built
+    starts its chain.
+
+    Args:
+        csv_dir (pathlib.Path): Path to csv directory.
+        pkm_ids (iterable): Ids of the built pokémons.
+
+    Returns:
+        dict: Dict of dict containing infos to build
+            pokediadb.models.PokemonEvolution object.
+
+    Raises:
+        FileNotFoundError: Raised if pokemon_species.csv or
+            pokemon_evolution.csv does not exist.
+
+    """
+    pkm_ids = set(pkm_ids)
+
+    evolutions = {}
+    for row in reader.read_rows(csv_dir / "pokemon_species.csv"):
+        pkm_id = int(row[0])
+        if pkm_id not in pkm_ids:
+            continue
+
+        evolves_from = int(row[3]) if row[3] else None
+        evolutions[pkm_id] = {
+            "pokemon": pkm_id, "chain": int(row[4]), "trigger": None,
+            "evolves_from": evolves_from if evolves_from in pkm_ids else None,
+            "min_level": None
+        }
+
+    # Keep the first way of evolving of each species
+    for row in reader.read_rows(csv_dir / "pokemon_evolution.csv"):
+        evolution = evolutions.get(int(row[1]))
+        if evolution is not None and evolution["trigger"] is None:
+            evolution["trigger"] = int(row[2])
+            evolution["min_level"] = int(row[4]) if row[4] else None
+
+    for evolution in evolutions.values():
+        depth = 0
+        ancestor = evolution["evolves_from"]
+        while ancestor is not None:
+            depth += 1
+            ancestor = evolutions[ancestor]["evolves_from"]
+        evolution["depth"] = depth
+
+    return evolutions
+
+
+def get_evolution_closure(evolutions):
+    """Get the ancestor and descendant pairs of the evolution chains.
+
+    Each pokémon is also its own ancestor at distance 0, so the pairs of one
+    pokémon give its whole line of evolution.
+
+    Args:
+        evolutions (dict): Evolution infos by pokémon id, see
+            get_evolutions.
+
+    Returns:
+        list: Dict containing infos to build
+            pokediadb.models.EvolutionClosure object.
+
+    """
+    closure = []
+    for pkm_id in sorted(evolutions):
+        distance = 0
+        ancestor = pkm_id
+        while ancestor is not None:
+            closure.append({
+                "ancestor": ancestor, "descendant": pkm_id,
+                "distance": distance
+            })
+            distance += 1
+            ancestor = evolutions[ancestor]["evolves_from"]
+
+    return closure
@@ -0,0 +1,167 @@
+"""Extraction of version-specific flavor texts.
+
+Flavor text csv files contain one row by entity, version group and language.
+The byte ranges of their records are indexed by version group on the first
+read and the index is cached next to the csv file, so later builds only read
+the records of the wanted version group.
+
+"""
+
+import io
+import csv
+import json
+import os
+
+from pokediadb.dbuilder import reader
+
+
+# Version group whose flavor texts are imported by default (Omega Ruby and
+# Alpha Sapphire). Older versions are not complete.
+FLAVOR_VERSION_GROUP = 16
+
+# Format version of the cached index files
+INDEX_VERSION = 2
+
+
+def get_index_path(csv_file):
+    """Get the path of the cached version group index of a csv file.
+
+    Args:
+        csv_file (pathlib.Path): Path to the flavor text csv file.
+
+    Returns:
+        pathlib.Path: Path to the index file.
+
+    """
+    return csv_file.with_name(csv_file.name + ".idx")
+
+
+def get_group(record):
+    """Get the version group of a raw flavor text record.
+
+    Args:
+        record (bytes): Raw csv record.
+
+    Returns:
+        str: Version group id, None if the record has no such column.
+
+    """
+    fields = record.split(b",", 2)
+    if len(fields) > 2 and b"\"" not in fields[0] and b"\"" not in fields[1]:
+        return fields[1].decode("ascii")
+
+    # Quoted id or version group: let the csv module unquote them
+    row = next(csv.reader(io.StringIO(record.decode("utf8"), newline="")), [])
+    return row[1] if len(row) > 1 else None
+
+
+def build_index(csv_file):
+    """Index the byte ranges of a flavor text csv file by version group.
+
+    Consecutive records of the same version group are merged into one range.
+
+    Args:
+        csv_file (pathlib.Path): Path to the flavor text csv file.
+
+    Returns:
+        dict: List of [start, end] byte ranges by version group id (str).
+
+    Raises:
+        FileNotFoundError: Raised if the csv file does not exist.
+
+    """
+    ranges = {}
+    with csv_file.open("rb") as f_csv:
+        records = reader.iter_records(f_csv)
+        next(records, None)  # Skip header
+
+        last_group = None
+        for start, end, record in records:
+            group = get_group(record)
+            if group is not None and group == last_group:
+                ranges[group][-1][1] = end
+            elif group is not None:
+                ranges.setdefault(group, []).append([start, end])
+            last_group = group
+
+    return ranges
+
+
+def load_index(csv_file):
+    """Load the version group index of a csv file, building it if needed.
+
+    The cached index is rebuilt when the csv file's size or modification time
+    changed. Failing to write the cache is not an error.
+
+    Args:
+        csv_file (pathlib.Path): Path to the flavor text csv file.
+
+    Returns:
+        dict: List of [start, end] byte ranges by version group id (str).
+
+    Raises:
+        FileNotFoundError: Raised if the csv file does not exist.
+
+    """
+    stat = csv_file.stat()
+    index_path = get_index_path(csv_file)
+    try:
+        with index_path.open(encoding="utf8") as f_index:
+            index = json.load(f_index)
+        if (index["version"] == INDEX_VERSION and
+                index["size"] == stat.st_size and
+                index["mtime"] == stat.st_mtime_ns):
+            return index["ranges"]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    ranges = build_index(csv_file)
+    tmp_path = index_path.with_name(index_path.name + ".tmp")
+    try:
+        with tmp_path.open("w", encoding="utf8") as f_index:
+            json.dump({
+                "version": INDEX_VERSION, "size": stat.st_size,
+                "mtime": stat.st_mtime_ns, "ranges": ranges
+            }, f_index)
+        os.replace(str(tmp_path), str(index_path))
+    except OSError:
+        pass
+
+    return ranges
+
+
+def get_flavor_texts(csv_file, languages, version_group=FLAVOR_VERSION_GROUP):
+    """Get the flavor texts of one version group in the given languages.
+
+    Only the byte ranges of the version group are read from the csv file and
+    only the records in one of the languages are parsed in full.
+
+    Args:
+        csv_file (pathlib.Path): Path to the flavor text csv file.
+        languages (iterable): Ids of the wanted languages.
+        version_group (int): Id of the version group.
+
+    Returns:
+        dict: Flavor text (newlines replaced by spaces) by tuple of
+            entity id and language id.
+
+    Raises:
+        FileNotFoundError: Raised if the csv file does not exist.
+
+    """
+    ranges = load_index(csv_file).get(str(version_group), [])
+    filters = reader.decode_filters({
+        2: {str(int(lang_id)).encode() for lang_id in languages}
+    })
+
+    texts = {}
+    with csv_file.open("rb") as f_csv:
+        for start, end in ranges:
+            f_csv.seek(start)
+            lines = io.StringIO(
+                f_csv.read(end - start).decode("utf8"), newline=""
+            )
+            for row in reader.filter_rows(lines, filters):
+                texts[int(row[0]), int(row[2])] = row[3].replace("\n", " ")
+
+    return texts
@@ -1,60 +1,57 @@
-import csv
+from pokediadb.dbuilder import cache
+from pokediadb.dbuilder import flavor
+from pokediadb.dbuilder import reader
 
 
-from pokediadb import models
-
-
-def get_moves(csv_dir):
+@cache.cached("moves.csv")
+def get_moves(csv_dir, generation=None):
     """Get information to build pokediadb.models.Move objects.
 
     Args:
         csv_dir (pathlib.Path): Path to csv directory.
+        generation (int): Skip moves introduced after this generation.
 
     Returns:
         dict: Dict of dict containing infos to build
             pokediadb.models.Move object.
 
     Raises:
-        peewee.OperationalError: Raised if type tables haven't been build.
         FileNotFoundError: Raised if moves.csv does not exist.
 
     """
     pkm_moves = {}
-    with (csv_dir / "moves.csv").open(encoding="utf8") as f_move:
-        reader = csv.reader(f_move)
-        next(reader)  # Skip header
-
-        for row in reader:
-            move_id = int(row[0])
-
-            # Skip weird moves
-            if move_id > 10000:
-                break
-
-            power = int(row[4]) if row[4] != "" else 0
-            pp = int(row[5]) if row[5] != "" else 0
-            accuracy = int(row[6]) if row[6] != "" else 0
-
-            pkm_moves[move_id] = {
-                "id": move_id, "generation": int(row[2]),
-                "type": models.Type.get(
-                    models.Type.id == int(row[3])
-                ),
-                "power": power, "pp": pp,
-                "accuracy": accuracy, "priority": int(row[7]),
-                "damage_class": models.DamageClass.get(id=int(row[9]))
-            }
+    for row in reader.read_rows(csv_dir / "moves.csv"):
+        move_id = int(row[0])
+
+        # Skip weird moves
+        if move_id > 10000:
+            break
+
+        if generation is not None and int(row[2]) > generation:
+            continue
+
+        power = int(row[4]) if row[4] != "" else 0
+        pp = int(row[5]) if row[5] != "" else 0
+        accuracy = int(row[6]) if row[6] != "" else 0
+
+        pkm_moves[move_id] = {
+            "id": move_id, "generation": int(row[2]),
+            "type": int(row[3]), "power": power, "pp": pp,
+            "accuracy": accuracy, "priority": int(row[7]),
+            "damage_class": int(row[9])
+        }
 
     return pkm_moves
 
 
+@cache.cached("move_names.csv")
 def get_move_names(csv_dir, pkm_moves, languages):
     """Get the name of each pokémon move in different languages.
 
     Args:
         csv_dir (pathlib.Path): Path to csv directory.
         pkm_moves (dict): Dict of dict containing move infos.
-        languages (dict): Dictionary of supported languages.
+        languages (dict): Id of the Language row by pokeapi language id.
 
     Returns:
         list: Dict containing infos to build
@@ -65,29 +62,26 @@ def get_move_names(csv_dir, pkm_moves, languages):
 
     """
     pkm_move_trans = {}
-    with (csv_dir / "move_names.csv").open(encoding="utf8") as f_move_name:
-        reader = csv.reader(f_move_name)
-        next(reader)  # Skip header
-
-        for row in reader:
-            move_id = int(row[0])
-            lang_id = int(row[1])
-
-            # Skip weird moves
-            if move_id > 10000:
-                break
-
-            if lang_id in languages:
-                data_id = "{}-{}".format(move_id, lang_id)
-                pkm_move_trans[data_id] = {
-                    "move": pkm_moves[move_id]["id"],
-                    "lang": languages[lang_id], "name": row[2]
-                }
+    for row in reader.read_rows(csv_dir / "move_names.csv"):
+        move_id = int(row[0])
+        lang_id = int(row[1])
+
+        # Skip weird moves
+        if move_id > 10000:
+            break
+
+        if lang_id in languages and move_id in pkm_moves:
+            data_id = "{}-{}".format(move_id, lang_id)
+            pkm_move_trans[data_id] = {
+                "move": pkm_moves[move_id]["id"],
+                "lang": languages[lang_id], "name": row[2]
+            }
 
     return pkm_move_trans
 
 
-def update_move_effects(csv_dir, pkm_move_trans, languages):
+def update_move_effects(csv_dir, pkm_move_trans, languages,
+                        version_group=flavor.FLAVOR_VERSION_GROUP):
     """Update the dict of MoveTranslation infos to add effect text.
 
     Args:
@@ -95,17 +89,20 @@ def update_move_effects(csv_dir, pkm_move_trans, languages):
         pkm_move_trans (dict): Dict of dict containing
             infos about move that need translations.
         languages (dict): Dictionary of supported languages.
+        version_group (int): Id of the version group of the effect texts.
 
     Raises:
         FileNotFoundError: Raised if move_flavor_text.csv does not exist.
 
     """
-    with (csv_dir / "move_flavor_text.csv").open(
-            encoding="utf8") as f_move_eff:
-        reader = csv.reader(f_move_eff)
-        next(reader)  # Skip header
-
-        for row in reader:
-            if row[1] == "16" and int(row[2]) in languages:
-                data_id = "{}-{}".format(row[0], row[2])
-                pkm_move_trans[data_id]["effect"] = row[3].replace("\n", " ")
+    effects = flavor.get_flavor_texts(
+        csv_dir / "move_flavor_text.csv", languages, version_group
+    )
+    for (move_id, lang_id), effect in effects.items():
+        data_id = "{}-{}".format(move_id, lang_id)
+        if data_id in pkm_move_trans:
+            pkm_move_trans[data_id]["effect"] = effect
+
+    # Moves without text in the version group
+    for move_trans in pkm_move_trans.values():
+        move_trans.setdefault("effect", "")
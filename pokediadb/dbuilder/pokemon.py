@@ -1,88 +1,116 @@
-import csv
+from pokediadb.dbuilder import cache
+from pokediadb.dbuilder import reader
 
-from pokediadb import models
 
+@cache.cached("pokemon_species.csv")
+def get_species_generations(csv_dir):
+    """Get the generation of each pokémon species.
 
-def get_pokemons(csv_dir):
+    Args:
+        csv_dir (pathlib.Path): Path to csv directory.
+
+    Returns:
+        dict: Generation by species id.
+
+    Raises:
+        FileNotFoundError: Raised if pokemon_species.csv does not exist.
+
+    """
+    return {
+        int(row[0]): int(row[2])
+        for row in reader.read_rows(csv_dir / "pokemon_species.csv")
+    }
+
+
+@cache.cached("pokemon.csv", "pokemon_species.csv")
+def get_pokemons(csv_dir, generation=None):
     """Get information to build pokediadb.models.Pokemon objects.
 
     Args:
         csv_dir (pathlib.Path): Path to csv directory.
+        generation (int): Skip pokémons whose species is introduced after
+            this generation.
 
     Returns:
         dict: Dict of dict containing infos to build
             pokediadb.models.Pokemon object.
 
     Raises:
-        FileNotFoundError: Raised if pokemon.csv does not exist.
+        FileNotFoundError: Raised if pokemon.csv or, with a generation,
+            pokemon_species.csv does not exist.
 
     """
+    if generation is not None:
+        generations = get_species_generations(csv_dir)
+
     pkms = {}
-    with (csv_dir / "pokemon.csv").open(encoding="utf8") as f_pkm:
-        reader = csv.reader(f_pkm)
-        next(reader)  # Skip header
+    for row in reader.read_rows(csv_dir / "pokemon.csv"):
+        pkm_id = int(row[0])
 
-        for row in reader:
-            pkm_id = int(row[0])
+        # Skip mega evolution and weird pokémons
+        if pkm_id > 10000:
+            break
 
-            # Skip mega evolution and weird pokémons
-            if pkm_id > 10000:
-                break
+        if generation is not None and generations[int(row[2])] > generation:
+            continue
 
-            pkms[pkm_id] = {
-                "id": pkm_id, "national_id": int(row[2]),
-                "height": float(row[3]) / 10, "weight": float(row[4]) / 10,
-                "base_xp": int(row[5])
-            }
+        pkms[pkm_id] = {
+            "id": pkm_id, "national_id": int(row[2]),
+            "height": float(row[3]) / 10, "weight": float(row[4]) / 10,
+            "base_xp": int(row[5])
+        }
 
     return pkms
 
 
-def get_pokemon_abilities(csv_dir, pkms):
+@cache.cached("pokemon_abilities.csv")
+def get_pokemon_abilities(csv_dir, pkms, ability_ids):
     """Get information to build pokediadb.models.PokemonAbility objects.
 
     Args:
         csv_dir (pathlib.Path): Path to csv directory.
+        pkms (dict): Dict of dict containing pokémons infos.
+        ability_ids (iterable): Ids of the built abilities, the others (from
+            a later generation) are skipped.
 
     Returns:
-        dict: Dict of dict containing infos to build
+        list: Dict containing infos to build
             pokediadb.models.PokemonAbility object.
 
     Raises:
-        peewee.OperationalError: Raised if ability tables haven't been build.
         FileNotFoundError: Raised if pokemon_abilities.csv does not exist.
 
     """
+    ability_ids = set(ability_ids)
+
     pkm_abilities = []
-    with (csv_dir / "pokemon_abilities.csv").open(encoding="utf8") as f_pkm_ab:
-        reader = csv.reader(f_pkm_ab)
-        next(reader)  # Skip header
-
-        for row in reader:
-            pkm_id = int(row[0])
-
-            # Skip mega evolution and weird pokémons
-            if pkm_id > 10000:
-                break
-
-            pkm_abilities.append({
-                "pokemon": pkms[pkm_id]["id"],
-                "ability": models.Ability.get(
-                    models.Ability.id == int(row[1])
-                ),
-                "hidden": int(row[2]), "slot": int(row[3])
-            })
+    for row in reader.read_rows(csv_dir / "pokemon_abilities.csv"):
+        pkm_id = int(row[0])
+
+        # Skip mega evolution and weird pokémons
+        if pkm_id > 10000:
+            break
+
+        if pkm_id not in pkms or int(row[1]) not in ability_ids:
+            continue
+
+        pkm_abilities.append({
+            "pokemon": pkms[pkm_id]["id"],
+            "ability": int(row[1]), "hidden": int(row[2]),
+            "slot": int(row[3])
+        })
 
     return pkm_abilities
 
 
+@cache.cached("pokemon_species_names.csv")
 def get_pokemon_trans(csv_dir, pkms, languages):
     """Get information to build pokediadb.models.PokemonTranslation objects.
 
     Args:
         csv_dir (pathlib.Path): Path to csv directory.
         pkms (dict): Dict of dict containing pokémons infos.
-        languages (dict): Dictionary of supported languages.
+        languages (dict): Id of the Language row by pokeapi language id.
 
     Returns:
         list: Dict containing infos to build
@@ -93,19 +121,96 @@ def get_pokemon_trans(csv_dir, pkms, languages):
 
     """
     pkm_trans = []
-    with (csv_dir / "pokemon_species_names.csv").open(
-            encoding="utf8") as f_pkm_trans:
-        reader = csv.reader(f_pkm_trans)
-        next(reader)  # Skip header
+    for row in reader.read_rows(csv_dir / "pokemon_species_names.csv"):
+        lang_id = int(row[1])
+
+        if lang_id in languages and int(row[0]) in pkms:
+            pkm_trans.append({
+                "pokemon": pkms[int(row[0])]["id"],
+                "lang": languages[lang_id],
+                "name": row[2], "genus": row[3]
+            })
 
-        for row in reader:
-            lang_id = int(row[1])
+    return pkm_trans
 
-            if lang_id in languages:
-                pkm_trans.append({
-                    "pokemon": pkms[int(row[0])]["id"],
-                    "lang": languages[lang_id],
-                    "name": row[2], "genus": row[3]
-                })
 
-    return pkm_trans
+@cache.cached("pokemon_moves.csv")
+def get_pokemon_moves(csv_dir, pkms, move_ids, version_groups=None):
+    """Get information to build pokediadb.models.PokemonMove objects.
+
+    Args:
+        csv_dir (pathlib.Path): Path to csv directory.
+        pkms (iterable): Ids of the built pokémons.
+        move_ids (iterable): Ids of the built moves.
+        version_groups (set): Ids of the kept version groups, None to keep
+            all of them.
+
+    Returns:
+        list: Dict containing infos to build
+            pokediadb.models.PokemonMove object.
+
+    Raises:
+        FileNotFoundError: Raised if pokemon_moves.csv does not exist.
+
+    """
+    pkms = set(pkms)
+    move_ids = set(move_ids)
+
+    # Rows of other version groups are dropped before being decoded
+    filters = None
+    if version_groups is not None:
+        filters = {1: {str(group).encode() for group in version_groups}}
+
+    pkm_moves = []
+    for row in reader.read_rows(
+            csv_dir / "pokemon_moves.csv", filters, parallel=True):
+        pkm_id = int(row[0])
+        move_id = int(row[2])
+
+        # Skip weird pokémons and moves
+        if pkm_id not in pkms or move_id not in move_ids:
+            continue
+
+        pkm_moves.append({
+            "pokemon": pkm_id, "move": move_id, "version_group": int(row[1]),
+            "method": int(row[3]), "level": int(row[4])
+        })
+
+    return pkm_moves
+
+
+@cache.cached("pokemon_stats.csv")
+def get_pokemon_stats(csv_dir, pkms):
+    """Get information to build pokediadb.models.PokemonStat objects.
+
+    Args:
+        csv_dir (pathlib.Path): Path to csv directory.
+        pkms (iterable): Ids of the built pokémons.
+
+    Returns:
+        list: Dict containing infos to build
+            pokediadb.models.PokemonStat object.
+
+    Raises:
+        FileNotFoundError: Raised if pokemon_stats.csv does not exist.
+
+    """
+    pkms = set(pkms)
+
+    pkm_stats = []
+    for row in reader.read_rows(csv_dir / "pokemon_stats.csv"):
+        pkm_id = int(row[0])
+
+        # Skip mega evolution and weird pokémons
+        if pkm_id > 10000:
+            break
+
+        if pkm_id not in pkms:
+            continue
+
+        pkm_stats.append({
+            "pokemon": pkm_id, "stat": int(row[1]), "base": int(row[2]),
+            "effort": int(row[3])
+        })
+
+    return pkm_stats
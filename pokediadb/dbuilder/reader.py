@@ -0,0 +1,356 @@
+"""Reader for the pokeapi csv files.
+
+Unfiltered files are parsed by the csv module. With filters on the value of
+some columns, each line is first tested on a split of its leading columns
+and only the matching lines, or the records with quoted fields, are parsed
+in full: rejected rows cost little more than reading their line.
+
+Large files read with filters can be split in byte ranges aligned on
+records and filtered by a pool of processes, one by cpu at most. Builders
+opt in with the parallel argument of read_rows and the POKEDIADB_PARSE_JOBS
+environment variable lowers the number of processes (1 disables it).
+
+"""
+
+import io
+import os
+import csv
+import mmap
+import multiprocessing
+
+# Minimum size in bytes of a csv file filtered in parallel. Spawning the
+# processes costs about 0.1s, the time to filter 5MB in one process.
+PARALLEL_THRESHOLD = 32 * 1024 * 1024
+
+# Minimum size in bytes of a range filtered by a process
+MIN_RANGE_SIZE = 8 * 1024 * 1024
+
+# Parsed rows (without header) by csv file path, see set_preloaded_rows
+_PRELOADED_ROWS = {}
+
+
+def iter_records(f_csv):
+    """Yield the records of a csv file opened in binary mode.
+
+    A newline only ends a record if it is not inside a quoted field, which is
+    known by the parity of the quotes read since the start of the record.
+
+    Args:
+        f_csv (io.BufferedReader): Csv file, at the start of a record.
+
+    Yields:
+        tuple: Start and end offsets of the record, end of line included,
+            and its raw bytes.
+
+    """
+    pos = f_csv.tell()
+    lines = iter(f_csv)
+    for line in lines:
+        record = line
+        quotes = line.count(b"\"")
+        while quotes % 2:
+            line = next(lines, None)
+            if line is None:
+                break
+            record += line
+            quotes += line.count(b"\"")
+
+        yield pos, pos + len(record), record
+        pos += len(record)
+
+
+def find_record_end(buf, pos, quotes=0):
+    """Find the end of the record containing an offset of a buffer.
+
+    Args:
+        buf (mmap.mmap): Buffer containing csv records.
+        pos (int): Offset inside a record.
+        quotes (int): Number of double quotes between the start of the record
+            and the offset.
+
+    Returns:
+        int: Offset following the newline that ends the record, buffer's
+            size for the last record.
+
+    """
+    eol = buf.find(b"\n", pos)
+    while eol != -1:
+        quotes += buf[pos:eol].count(b"\"")
+        if not quotes % 2:
+            return eol + 1
+
+        pos = eol
+        eol = buf.find(b"\n", pos + 1)
+
+    return len(buf)
+
+
+def split_ranges(buf, start, parts):
+    """Split the records of a buffer in byte ranges of similar size.
+
+    A boundary is placed after the newline that ends a record, never after a
+    newline inside a quoted field: the parity of the quotes counted since the
+    start tells them apart.
+
+    Args:
+        buf (mmap.mmap): Buffer containing csv records.
+        start (int): Offset of the first record.
+        parts (int): Maximum number of ranges.
+
+    Returns:
+        list: Tuples of start and end offsets of the ranges.
+
+    """
+    size = len(buf)
+    step = max((size - start) // parts, 1)
+
+    bounds = [start]
+    while len(bounds) < parts:
+        target = max(bounds[-1], start + step * len(bounds))
+        if target >= size:
+            break
+
+        # Quotes between the last boundary and the target
+        quotes = buf[bounds[-1]:target].count(b"\"") % 2
+        end = find_record_end(buf, target, quotes)
+        if end >= size:
+            break
+        bounds.append(end)
+
+    bounds.append(size)
+
+    return list(zip(bounds, bounds[1:]))
+
+
+def parse_range(path, start, end, filters):
+    """Parse the records of a byte range of a csv file that pass filters.
+
+    Args:
+        path (str): Path to the csv file.
+        start (int): Start offset of the range, at the start of a record.
+        end (int): End offset of the range, at the end of a record.
+        filters (dict): Accepted raw values (set of bytes) by column index.
+
+    Returns:
+        list: Parsed rows of the range passing the filters.
+
+    """
+    with open(path, "rb") as f_csv:
+        f_csv.seek(start)
+        text = f_csv.read(end - start).decode("utf8")
+
+    return list(filter_rows(
+        io.StringIO(text, newline=""), decode_filters(filters)
+    ))
+
+
+def get_parse_jobs():
+    """Get the number of processes parsing a large csv file.
+
+    Returns:
+        int: Value of POKEDIADB_PARSE_JOBS, default to the number of cpus,
+            and never more than the number of cpus. Always 1 inside
+            daemonic processes, which can't have children.
+
+    """
+    if multiprocessing.current_process().daemon:
+        return 1
+
+    cpus = os.cpu_count() or 1
+    try:
+        return min(max(int(os.environ["POKEDIADB_PARSE_JOBS"]), 1), cpus)
+    except (KeyError, ValueError):
+        return cpus
+
+
+def get_ranges(csv_file, parts):
+    """Split the records of a csv file, without its header, in byte ranges.
+
+    Args:
+        csv_file (pathlib.Path): Path to the csv file.
+        parts (int): Maximum number of ranges, each of them at least
+            MIN_RANGE_SIZE long.
+
+    Returns:
+        list: Tuples of start and end offsets of the ranges.
+
+    Raises:
+        FileNotFoundError: Raised if the csv file does not exist.
+
+    """
+    with csv_file.open("rb") as f_csv:
+        if not csv_file.stat().st_size:
+            return []
+
+        with mmap.mmap(f_csv.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            start = find_record_end(buf, 0)
+            parts = min(parts, max((len(buf) - start) // MIN_RANGE_SIZE, 1))
+            return split_ranges(buf, start, parts)
+
+
+def read_ranges(csv_file, filters, jobs=None):
+    """Parse the rows of a csv file passing filters in a pool of processes.
+
+    Each process reads and filters its own byte range of the file, only the
+    rows passing the filters are sent back. Processes are spawned, not
+    forked, so that the threads of the caller (like a running download)
+    are not copied in them.
+
+    Args:
+        csv_file (pathlib.Path): Path to the csv file.
+        filters (dict): Accepted raw values (set of bytes) by column index.
+        jobs (int): Number of processes, default to get_parse_jobs().
+
+    Returns:
+        list: Rows of each range, in the order of the file.
+
+    Raises:
+        FileNotFoundError: Raised if the csv file does not exist.
+
+    """
+    ranges = get_ranges(csv_file, jobs or get_parse_jobs())
+    args = [(str(csv_file), start, end, filters) for start, end in ranges]
+    if len(args) < 2:
+        return [parse_range(*arg) for arg in args]
+
+    with multiprocessing.get_context("spawn").Pool(len(args)) as pool:
+        return pool.starmap(parse_range, args)
+
+
+def set_preloaded_rows(csv_dir, csv_rows):
+    """Keep already parsed rows in memory for read_rows.
+
+    Args:
+        csv_dir (pathlib.Path): Absolute path to csv directory.
+        csv_rows (dict): Rows (without header) by csv file name.
+
+    """
+    for name, rows in csv_rows.items():
+        _PRELOADED_ROWS[str(csv_dir / name)] = rows
+
+
+def clear_preloaded_rows():
+    """Forget the rows kept by set_preloaded_rows."""
+    _PRELOADED_ROWS.clear()
+
+
+def decode_filters(filters):
+    """Convert raw filters to the accepted text values by column.
+
+    Args:
+        filters (dict): Accepted raw values (set of bytes) by column index.
+
+    Returns:
+        list: Tuples of column index and accepted values (set of str).
+
+    """
+    return [
+        (column, {value.decode("utf8") for value in values})
+        for column, values in sorted(filters.items())
+    ]
+
+
+def read_record(line, lines):
+    """Get the lines of a csv record starting with a line.
+
+    A newline inside a quoted field continues the record on the next line,
+    which is known by the parity of the quotes read since its start.
+
+    Args:
+        line (str): First line of the record.
+        lines (iterator): Following lines of the file.
+
+    Returns:
+        list: Lines of the record.
+
+    """
+    record = [line]
+    quotes = line.count("\"")
+    while quotes % 2:
+        line = next(lines, None)
+        if line is None:
+            break
+        record.append(line)
+        quotes += line.count("\"")
+
+    return record
+
+
+def filter_rows(lines, filters):
+    """Parse the csv lines whose columns pass the filters.
+
+    Most lines are rejected on a split of their leading columns by the
+    first filter. The others are parsed in full, by the csv module if they
+    contain quotes and by a split on commas otherwise, then checked against
+    every filter.
+
+    Args:
+        lines (iterator): Lines of csv records, ends of line included.
+        filters (list): Accepted values by column, see decode_filters.
+
+    Yields:
+        list: Parsed row passing the filters.
+
+    """
+    first, first_values = filters[0]
+    last = filters[-1][0]
+    for line in lines:
+        # The end of line can only stick to the last split column
+        fields = line.split(",", last + 1)
+        if len(fields) > last + 1 and fields[first] not in first_values and (
+                "\"" not in line):
+            continue
+
+        if "\"" in line:
+            rows = csv.reader(read_record(line, lines))
+        else:
+            rows = [line.rstrip("\r\n").split(",")]
+
+        for row in rows:
+            if len(row) > last and all(
+                    row[column] in values for column, values in filters):
+                yield row
+
+
+def read_rows(csv_file, filters=None, parallel=False):
+    """Read the rows of a csv file, skipping its header.
+
+    Only the lines that pass the filters are parsed in full. Rows of a file
+    given to set_preloaded_rows are read from memory.
+
+    Args:
+        csv_file (pathlib.Path): Path to the csv file.
+        filters (dict): Accepted raw values (set of bytes) by column index.
+        parallel (bool): Filter the file in a pool of processes when it is
+            larger than PARALLEL_THRESHOLD and there are several cpus.
+
+    Yields:
+        list: Parsed row of the csv file.
+
+    Raises:
+        FileNotFoundError: Raised if the csv file does not exist.
+
+    """
+    rows = _PRELOADED_ROWS.get(str(csv_file))
+    if rows is not None:
+        filters = decode_filters(filters) if filters else []
+        for row in rows:
+            if all(row[column] in values for column, values in filters):
+                yield row
+        return
+
+    if parallel and filters and get_parse_jobs() > 1 and (
+            csv_file.stat().st_size >= PARALLEL_THRESHOLD):
+        for rows in read_ranges(csv_file, filters):
+            yield from rows
+        return
+
+    with csv_file.open(encoding="utf8", newline="") as f_csv:
+        if not filters:
+            rows = csv.reader(f_csv)
+            next(rows, None)  # Skip header
+            yield from rows
+            return
+
+        next(f_csv, None)  # Skip header
+        yield from filter_rows(f_csv, decode_filters(filters))
@@ -1,11 +1,14 @@
-import csv
+from pokediadb.dbuilder import cache
+from pokediadb.dbuilder import reader
 
 
-def get_types(csv_dir):
+@cache.cached("types.csv")
+def get_types(csv_dir, generation=None):
     """Get information to build pokediadb.models.Type objects.
 
     Args:
         csv_dir (pathlib.Path): Path to csv directory.
+        generation (int): Skip types introduced after this generation.
 
     Returns:
         dict: Dict of dict containing infos to build
@@ -16,22 +19,22 @@ def get_types(csv_dir):
 
     """
     pkm_types = {}
-    with (csv_dir / "types.csv").open(encoding="utf8") as f_type:
-        reader = csv.reader(f_type)
-        next(reader)  # Skip header
+    for row in reader.read_rows(csv_dir / "types.csv"):
+        type_id = int(row[0])
 
-        for row in reader:
-            type_id = int(row[0])
+        # Skip shadow and unknown types
+        if type_id > 10000:
+            break
 
-            # Skip shadow and unknown types
-            if type_id > 10000:
-                break
+        if generation is not None and int(row[2]) > generation:
+            continue
 
-            pkm_types[type_id] = {"id": type_id, "generation": int(row[2])}
+        pkm_types[type_id] = {"id": type_id, "generation": int(row[2])}
 
     return pkm_types
 
 
+@cache.cached("type_efficacy.csv")
 def get_type_efficacies(csv_dir, pkm_types):
     """Get information to build pokediadb.models.TypeEfficacy objects.
 
@@ -48,27 +51,28 @@ def get_type_efficacies(csv_dir, pkm_types):
 
     """
     pkm_type_eff = []
-    with (csv_dir / "type_efficacy.csv").open(encoding="utf8") as f_type_eff:
-        reader = csv.reader(f_type_eff)
-        next(reader)  # Skip header
-
-        for row in reader:
-            pkm_type_eff.append({
-                "damage_type": pkm_types[int(row[0])]["id"],
-                "target_type": pkm_types[int(row[1])]["id"],
-                "damage_factor": int(row[2])
-            })
+    for row in reader.read_rows(csv_dir / "type_efficacy.csv"):
+        # Skip efficacies of types that are not built
+        if int(row[0]) not in pkm_types or int(row[1]) not in pkm_types:
+            continue
+
+        pkm_type_eff.append({
+            "damage_type": pkm_types[int(row[0])]["id"],
+            "target_type": pkm_types[int(row[1])]["id"],
+            "damage_factor": int(row[2])
+        })
 
     return pkm_type_eff
 
 
+@cache.cached("type_names.csv")
 def get_type_names(csv_dir, pkm_types, languages):
     """Get the name of each pokémon type in different languages.
 
     Args:
         csv_dir (pathlib.Path): Path to csv directory.
         pkm_types (dict): Dict of dict containing type infos.
-        languages (dict): Dictionary of supported languages.
+        languages (dict): Id of the Language row by pokeapi language id.
 
     Returns:
         list: Dict containing infos to build
@@ -79,23 +83,19 @@ def get_type_names(csv_dir, pkm_types, languages):
 
     """
     pkm_type_names = []
-    with (csv_dir / "type_names.csv").open(encoding="utf8") as f_type_name:
-        reader = csv.reader(f_type_name)
-        next(reader)  # Skip header
-
-        for row in reader:
-            type_id = int(row[0])
-            lang_id = int(row[1])
-
-            # Skip shadow and unknown types
-            if type_id > 10000:
-                break
-
-            if lang_id in languages:
-                pkm_type_names.append({
-                    "type": pkm_types[type_id]["id"],
-                    "lang": languages[lang_id],
-                    "name": row[2]
-                })
+    for row in reader.read_rows(csv_dir / "type_names.csv"):
+        type_id = int(row[0])
+        lang_id = int(row[1])
+
+        # Skip shadow and unknown types
+        if type_id > 10000:
+            break
+
+        if lang_id in languages and type_id in pkm_types:
+            pkm_type_names.append({
+                "type": pkm_types[type_id]["id"],
+                "lang": languages[lang_id],
+                "name": row[2]
+            })
 
     return pkm_type_names
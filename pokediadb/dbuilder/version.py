@@ -1,6 +1,9 @@
-import csv
+from pokediadb.dbuilder import cache
+from pokediadb.dbuilder import flavor
+from pokediadb.dbuilder import reader
 
 
+@cache.cached("versions.csv")
 def get_versions(csv_dir):
     """Get version of pokemon's games.
 
@@ -16,44 +19,128 @@ def get_versions(csv_dir):
 
     """
     pkm_versions = []
-    with (csv_dir / "versions.csv").open(encoding="utf8") as f_version:
-        reader = csv.reader(f_version)
-        next(reader)  # Skip header
-
-        for row in reader:
-            pkm_versions.append({"id": int(row[0]), "group": int(row[1])})
+    for row in reader.read_rows(csv_dir / "versions.csv"):
+        pkm_versions.append({"id": int(row[0]), "group": int(row[1])})
 
     return pkm_versions
 
 
-def get_version_groups(csv_dir, pkm_versions):
+@cache.cached("version_groups.csv")
+def get_version_group_infos(csv_dir):
+    """Get the generation and the release order of each version group.
+
+    Args:
+        csv_dir (pathlib.Path): Path to csv directory.
+
+    Returns:
+        dict: Dict with generation and order by version group id.
+
+    Raises:
+        FileNotFoundError: Raised if version_groups.csv does not exist.
+
+    """
+    return {
+        int(row[0]): {"generation": int(row[2]), "order": int(row[3])}
+        for row in reader.read_rows(csv_dir / "version_groups.csv")
+    }
+
+
+def get_subset(csv_dir, generation=None, version_group=None):
+    """Resolve the filters of a partial build.
+
+    A version group implies its generation. Entities (types, abilities,
+    moves and pokémons) are kept up to the generation, versions and learned
+    moves are kept for the selected version groups.
+
+    Args:
+        csv_dir (pathlib.Path): Path to csv directory.
+        generation (int): Last built generation, None for all of them.
+        version_group (int): Only built version group, None for all of them.
+
+    Returns:
+        dict: Last built generation (None for all), set of built version
+            group ids (None for all) and version group of the flavor texts.
+
+    Raises:
+        ValueError: Raised if the version group does not exist or does not
+            belong to the selected generations.
+        FileNotFoundError: Raised if version_groups.csv does not exist.
+
+    """
+    subset = {
+        "generation": generation, "version_groups": None,
+        "flavor_version_group": flavor.FLAVOR_VERSION_GROUP
+    }
+    if generation is None and version_group is None:
+        return subset
+
+    infos = get_version_group_infos(csv_dir)
+    if version_group is not None:
+        if version_group not in infos:
+            raise ValueError(
+                "Unknown version group {}.".format(version_group)
+            )
+        group_generation = infos[version_group]["generation"]
+        if generation is not None and group_generation > generation:
+            raise ValueError(
+                "Version group {} does not belong to generation {}.".format(
+                    version_group, generation
+                )
+            )
+        subset["generation"] = group_generation
+        subset["version_groups"] = {version_group}
+        subset["flavor_version_group"] = version_group
+        return subset
+
+    subset["version_groups"] = {
+        group for group, info in infos.items()
+        if info["generation"] <= generation
+    }
+
+    # Texts of the last released version group, at most the default one
+    max_order = infos[flavor.FLAVOR_VERSION_GROUP]["order"]
+    candidates = [
+        group for group in subset["version_groups"]
+        if infos[group]["order"] <= max_order
+    ]
+    if candidates:
+        subset["flavor_version_group"] = max(
+            candidates, key=lambda group: infos[group]["order"]
+        )
+
+    return subset
+
+
+def get_version_groups(csv_dir, pkm_versions, version_groups=None):
     """Get the groups that classify games versions.
 
     Args:
         csv_dir (pathlib.Path): Path to csv directory.
         pkm_versions (list): List of dict containing infos to build
             pokediadb.models.Versionobject.
+        version_groups (set): Ids of the kept version groups, None to keep
+            every version.
 
     Returns
-        list: Returns the list of versions with generation information.
+        list: Returns the list of kept versions with generation information.
 
     Raises:
         FileNotFoundError: Raised if version_groups.csv does not exist.
 
     """
-    with (csv_dir / "version_groups.csv").open(encoding="utf8") as f_v_group:
-        reader = csv.reader(f_v_group)
-        next(reader)  # Skip header
+    infos = get_version_group_infos(csv_dir)
 
-        for row in reader:
-            for version in pkm_versions:
-                if version.get("group", None) == int(row[0]):
-                    version["generation"] = int(row[2])
-                    del version["group"]
+    kept_versions = []
+    for version in pkm_versions:
+        group = version.pop("group")
+        if version_groups is None or group in version_groups:
+            version["generation"] = infos[group]["generation"]
+            kept_versions.append(version)
 
-    return pkm_versions
+    return kept_versions
 
 
+@cache.cached("version_names.csv")
 def get_version_names(csv_dir, pkm_versions, languages):
     """Get the name of each game versions in different languages.
 
@@ -61,7 +148,7 @@ def get_version_names(csv_dir, pkm_versions, languages):
         csv_dir (pathlib.Path): Path to csv directory.
         pkm_versions (list): List of dict containing infos to build
             pokediadb.models.Version object.
-        languages (dict): Dictionary of supported languages.
+        languages (dict): Id of the Language row by pokeapi language id.
 
     Returns:
         list: List of dict containing infos to build
@@ -71,20 +158,17 @@ def get_version_names(csv_dir, pkm_versions, languages):
         FileNotFoundError: Raised if version_names.csv does not exist.
 
     """
-    with (csv_dir / "version_names.csv").open(encoding="utf8") as f_v_name:
-        reader = csv.reader(f_v_name)
-        next(reader)  # Skip header
-
-        pkm_version_names = []
-        for row in reader:
-            version_id = int(row[0])
-            lang_id = int(row[1])
-
-            if lang_id in languages:
-                version = [v for v in pkm_versions if v["id"] == version_id][0]
-                pkm_version_names.append({
-                    "version": version["id"], "lang": languages[lang_id],
-                    "name": row[2]
-                })
-
-        return pkm_version_names
+    version_ids = {version["id"] for version in pkm_versions}
+
+    pkm_version_names = []
+    for row in reader.read_rows(csv_dir / "version_names.csv"):
+        version_id = int(row[0])
+        lang_id = int(row[1])
+
+        if lang_id in languages and version_id in version_ids:
+            pkm_version_names.append({
+                "version": version_id, "lang": languages[lang_id],
+                "name": row[2]
+            })
+
+    return pkm_version_names
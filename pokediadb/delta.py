@@ -0,0 +1,486 @@
+"""Row-level change sets between two generated databases.
+
+diff_databases compares every table of two databases by primary key and
+write_patch saves the inserted, updated and deleted rows in a small
+compressed file. apply_patch replays them on a copy of the old database in
+one transaction, so clients download the changes instead of the new file.
+
+A patch records a digest of the content of both databases, indexes
+included: it is only applied on its base database and the result is checked
+against the new one.
+
+"""
+
+import os
+import json
+import zlib
+import base64
+import hashlib
+import sqlite3
+
+from pokediadb.access import get_uri
+
+MAGIC = b"PKDP"
+FORMAT_VERSION = 2
+
+
+def get_tables(conn):
+    """Get the tables of a database with their CREATE statement.
+
+    Internal sqlite tables and the shadow tables of virtual tables (FTS5
+    search tables) are skipped, virtual tables are diffed directly.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the database.
+
+    Returns:
+        dict: CREATE statement by table name.
+
+    """
+    tables = dict(conn.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'table' AND "
+        "name NOT LIKE 'sqlite_%' ORDER BY name"
+    ))
+    virtuals = [
+        name for name, sql in tables.items()
+        if sql.upper().startswith("CREATE VIRTUAL TABLE")
+    ]
+
+    return {
+        name: sql for name, sql in tables.items()
+        if not any(name.startswith(vtable + "_") for vtable in virtuals)
+    }
+
+
+def get_indexes(conn, table):
+    """Get the indexes of a table with their CREATE statement.
+
+    Indexes created by sqlite for the constraints of the table are part of
+    its CREATE TABLE statement and are skipped.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the database.
+        table (str): Name of the table.
+
+    Returns:
+        dict: CREATE statement by index name.
+
+    """
+    return dict(conn.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND "
+        "tbl_name = ? AND sql IS NOT NULL ORDER BY name", (table,)
+    ))
+
+
+def get_layout(conn, table, sql):
+    """Get the columns of a table and the position of its key columns.
+
+    Tables without primary key and virtual tables are keyed by rowid.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the database.
+        table (str): Name of the table.
+        sql (str): CREATE statement of the table.
+
+    Returns:
+        list: Names of the columns.
+        list: Indexes of the key columns in the columns.
+
+    """
+    infos = conn.execute("PRAGMA table_info(\"{}\")".format(table)).fetchall()
+    columns = [info[1] for info in infos]
+    keys = sorted((info[5], info[1]) for info in infos if info[5])
+    if not keys or sql.upper().startswith("CREATE VIRTUAL TABLE"):
+        return ["rowid"] + columns, [0]
+
+    return columns, [columns.index(name) for _, name in keys]
+
+
+def iter_rows(conn, table, columns, key):
+    """Iterate over the rows of a table sorted by key.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the database.
+        table (str): Name of the table.
+        columns (list): Names of the read columns.
+        key (list): Indexes of the key columns.
+
+    Returns:
+        iterator: Rows (tuple) of the table.
+
+    """
+    return conn.execute("SELECT {} FROM \"{}\" ORDER BY {}".format(
+        ", ".join("\"{}\"".format(col) for col in columns), table,
+        ", ".join("\"{}\"".format(columns[i]) for i in key)
+    ))
+
+
+def get_key(row, key):
+    """Get the key values of a row."""
+    return tuple(row[i] for i in key)
+
+
+def encode_value(value):
+    """Convert a column value to JSON, blobs becoming [base64]."""
+    if isinstance(value, bytes):
+        return [base64.b64encode(value).decode("ascii")]
+
+    return value
+
+
+def decode_value(value):
+    """Convert a JSON value written by encode_value to a column value."""
+    if isinstance(value, list):
+        return base64.b64decode(value[0])
+
+    return value
+
+
+def get_digest(conn):
+    """Get the digest of the schema, indexes and rows of a database.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the database.
+
+    Returns:
+        str: Hexadecimal sha256 digest.
+
+    """
+    sha = hashlib.sha256()
+    for table, sql in sorted(get_tables(conn).items()):
+        columns, key = get_layout(conn, table, sql)
+        sha.update(json.dumps([
+            table, sql, columns, sorted(get_indexes(conn, table).items())
+        ]).encode("utf8"))
+        for row in iter_rows(conn, table, columns, key):
+            sha.update(json.dumps(
+                [encode_value(value) for value in row]
+            ).encode("utf8"))
+
+    return sha.hexdigest()
+
+
+def diff_rows(old_rows, new_rows, key):
+    """Compare two row iterators sorted by key.
+
+    Args:
+        old_rows (iterator): Rows of the old table.
+        new_rows (iterator): Rows of the new table.
+        key (list): Indexes of the key columns.
+
+    Returns:
+        dict: Inserted and updated rows (insert and update) and deleted keys
+            (delete).
+
+    """
+    changes = {"insert": [], "update": [], "delete": []}
+    old, new = next(old_rows, None), next(new_rows, None)
+    while old is not None or new is not None:
+        if new is None or (old is not None and
+                           get_key(old, key) < get_key(new, key)):
+            changes["delete"].append(list(get_key(old, key)))
+            old = next(old_rows, None)
+        elif old is None or get_key(new, key) < get_key(old, key):
+            changes["insert"].append(list(new))
+            new = next(new_rows, None)
+        else:
+            if old != new:
+                changes["update"].append(list(new))
+            old, new = next(old_rows, None), next(new_rows, None)
+
+    return changes
+
+
+def diff_indexes(old_indexes, new_indexes):
+    """Compare the indexes of a table in two databases.
+
+    Args:
+        old_indexes (dict): CREATE statement by index name in the old
+            database.
+        new_indexes (dict): CREATE statement by index name in the new
+            database.
+
+    Returns:
+        list: Names of the removed or changed indexes, to drop.
+        list: CREATE statements of the new or changed indexes.
+
+    """
+    drop = sorted(
+        name for name, sql in old_indexes.items()
+        if new_indexes.get(name) != sql
+    )
+    create = [
+        sql for name, sql in sorted(new_indexes.items())
+        if old_indexes.get(name) != sql
+    ]
+
+    return drop, create
+
+
+def diff_table(old_conn, new_conn, table, old_sql, new_sql):
+    """Get the changes of one table.
+
+    Tables created, or whose schema changed, are recreated with all their
+    rows and indexes. Otherwise, indexes removed or changed are dropped and
+    new or changed ones created.
+
+    Args:
+        old_conn (sqlite3.Connection): Connection to the old database.
+        new_conn (sqlite3.Connection): Connection to the new database.
+        table (str): Name of the table.
+        old_sql (str): CREATE statement in the old database, None if the
+            table is new.
+        new_sql (str): CREATE statement in the new database.
+
+    Returns:
+        dict: Changes of the table, None if it did not change.
+
+    """
+    columns, key = get_layout(new_conn, table, new_sql)
+    changes = {"sql": None, "columns": columns, "key": key}
+    new_indexes = get_indexes(new_conn, table)
+    if old_sql != new_sql:
+        changes["sql"] = new_sql
+        changes["drop_indexes"], changes["indexes"] = diff_indexes(
+            {}, new_indexes
+        )
+        old_rows = iter(())
+    else:
+        changes["drop_indexes"], changes["indexes"] = diff_indexes(
+            get_indexes(old_conn, table), new_indexes
+        )
+        old_rows = iter_rows(old_conn, table, columns, key)
+
+    changes.update(diff_rows(
+        old_rows, iter_rows(new_conn, table, columns, key), key
+    ))
+    if changes["sql"] is None and not any(changes[kind] for kind in (
+            "insert", "update", "delete", "drop_indexes", "indexes")):
+        return None
+
+    for kind in ("insert", "update", "delete"):
+        changes[kind] = [
+            [encode_value(value) for value in row] for row in changes[kind]
+        ]
+
+    return changes
+
+
+def diff_databases(old_path, new_path):
+    """Get the row-level changes from one database to another.
+
+    Args:
+        old_path (str): Path to the old database.
+        new_path (str): Path to the new database.
+
+    Returns:
+        dict: Change set, see write_patch.
+
+    Raises:
+        FileNotFoundError: Raised if a database does not exist.
+
+    """
+    for path in (old_path, new_path):
+        if not os.path.isfile(path):
+            raise FileNotFoundError(
+                "The database '{}' does not exist.".format(path)
+            )
+
+    old_conn = sqlite3.connect(get_uri(old_path), uri=True)
+    new_conn = sqlite3.connect(get_uri(new_path), uri=True)
+    try:
+        old_tables = get_tables(old_conn)
+        new_tables = get_tables(new_conn)
+
+        patch = {
+            "format": FORMAT_VERSION, "base": get_digest(old_conn),
+            "target": get_digest(new_conn), "tables": {},
+            "drop": sorted(set(old_tables) - set(new_tables))
+        }
+        for table, sql in sorted(new_tables.items()):
+            changes = diff_table(
+                old_conn, new_conn, table, old_tables.get(table), sql
+            )
+            if changes is not None:
+                patch["tables"][table] = changes
+    finally:
+        old_conn.close()
+        new_conn.close()
+
+    return patch
+
+
+def get_stats(patch):
+    """Count the rows changed by a patch.
+
+    Args:
+        patch (dict): Change set.
+
+    Returns:
+        dict: Number of inserted, updated and deleted rows.
+
+    """
+    return {
+        kind: sum(len(changes[kind]) for changes in patch["tables"].values())
+        for kind in ("insert", "update", "delete")
+    }
+
+
+def write_patch(patch, path):
+    """Write a change set to a compressed patch file.
+
+    Args:
+        patch (dict): Change set returned by diff_databases.
+        path (str): Path of the patch file.
+
+    Returns:
+        int: Size of the patch file in bytes.
+
+    """
+    data = MAGIC + zlib.compress(
+        json.dumps(patch, sort_keys=True, separators=(",", ":")).encode(),
+        9
+    )
+    with open(path, "wb") as f_patch:
+        f_patch.write(data)
+
+    return len(data)
+
+
+def read_patch(path):
+    """Read a patch file written by write_patch.
+
+    Args:
+        path (str): Path of the patch file.
+
+    Returns:
+        dict: Change set.
+
+    Raises:
+        ValueError: Raised if the file is not a pokédia patch.
+
+    """
+    with open(path, "rb") as f_patch:
+        data = f_patch.read()
+
+    try:
+        if data[:4] != MAGIC:
+            raise ValueError()
+        patch = json.loads(zlib.decompress(data[4:]).decode("utf8"))
+    except (ValueError, zlib.error):
+        raise ValueError("'{}' is not a pokediadb patch.".format(path))
+
+    if patch.get("format") != FORMAT_VERSION:
+        raise ValueError("Unsupported patch format {}.".format(
+            patch.get("format")
+        ))
+
+    return patch
+
+
+def apply_table(conn, table, changes):
+    """Apply the changes of one table.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the database, inside a
+            transaction.
+        table (str): Name of the table.
+        changes (dict): Changes of the table.
+
+    """
+    if changes["sql"] is not None:
+        conn.execute("DROP TABLE IF EXISTS \"{}\"".format(table))
+        conn.execute(changes["sql"])
+
+    columns = changes["columns"]
+    where = " AND ".join(
+        "\"{}\" = ?".format(columns[i]) for i in changes["key"]
+    )
+
+    def decode(row):
+        return [decode_value(value) for value in row]
+
+    conn.executemany("DELETE FROM \"{}\" WHERE {}".format(table, where), [
+        decode(row) for row in changes["delete"]
+    ])
+    conn.executemany("UPDATE \"{}\" SET {} WHERE {}".format(
+        table, ", ".join("\"{}\" = ?".format(col) for col in columns), where
+    ), [
+        decode(row) + [decode_value(row[i]) for i in changes["key"]]
+        for row in changes["update"]
+    ])
+    conn.executemany("INSERT INTO \"{}\" ({}) VALUES ({})".format(
+        table, ", ".join("\"{}\"".format(col) for col in columns),
+        ", ".join("?" for _ in columns)
+    ), [decode(row) for row in changes["insert"]])
+
+    # Created once the rows are written
+    for index in changes["indexes"]:
+        conn.execute(index)
+
+
+def apply_changes(conn, patch):
+    """Drop the removed tables and indexes then apply the table changes.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the database, inside a
+            transaction.
+        patch (dict): Change set.
+
+    """
+    for table in patch["drop"]:
+        conn.execute("DROP TABLE IF EXISTS \"{}\"".format(table))
+
+    # Before any creation, an index may move to another table
+    for changes in patch["tables"].values():
+        for index in changes["drop_indexes"]:
+            conn.execute("DROP INDEX IF EXISTS \"{}\"".format(index))
+
+    for table, changes in sorted(patch["tables"].items()):
+        apply_table(conn, table, changes)
+
+
+def apply_patch(path, patch):
+    """Apply a change set to a database in one transaction.
+
+    Args:
+        path (str): Path to the database to update.
+        patch (dict): Change set returned by diff_databases or read_patch.
+
+    Returns:
+        dict: Number of inserted, updated and deleted rows.
+
+    Raises:
+        FileNotFoundError: Raised if the database does not exist.
+        ValueError: Raised if the database is not the base of the patch or
+            if the patched database does not match its target. The database
+            is then left unchanged.
+
+    """
+    if not os.path.isfile(path):
+        raise FileNotFoundError("The database '{}' does not exist.".format(
+            path
+        ))
+
+    conn = sqlite3.connect(path, isolation_level=None)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if get_digest(conn) != patch["base"]:
+                raise ValueError(
+                    "'{}' is not the base database of the patch.".format(path)
+                )
+
+            apply_changes(conn, patch)
+
+            if get_digest(conn) != patch["target"]:
+                raise ValueError("The patched database does not match the "
+                                 "target of the patch.")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
+
+    return get_stats(patch)
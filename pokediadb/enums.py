@@ -14,6 +14,20 @@ class Lang(IntEnum):
     en = 9
 
 
+class Stat(IntEnum):
+    """Enumeration of the stats of a pokémon.
+
+    Each number corresponds to the stat id in the pokeapi database.
+
+    """
+    hp = 1
+    attack = 2
+    defense = 3
+    special_attack = 4
+    special_defense = 5
+    speed = 6
+
+
 class Log(Enum):
     """Enumeration of the different kind of log message."""
     INFO = "[INFO]: "
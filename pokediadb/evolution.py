@@ -0,0 +1,75 @@
+"""Evolution lookups over the precomputed chains.
+
+PokemonEvolution gives each pokémon its chain and depth, EvolutionClosure
+holds every ancestor and descendant pair (a pokémon included, at distance
+0). Family, ancestor and descendant lookups are then one indexed query
+instead of a recursive walk.
+
+"""
+
+from pokediadb import models
+
+
+def get_family(pokemon_id):
+    """Get the pokémons of the evolution chain of a pokémon.
+
+    Args:
+        pokemon_id (int): Id of the pokémon.
+
+    Returns:
+        list: Tuples of pokémon id and depth in the chain, sorted by depth
+            then id. Empty if the pokémon has no evolution data.
+
+    """
+    chain = models.PokemonEvolution.select(models.PokemonEvolution.chain).where(
+        models.PokemonEvolution.pokemon == pokemon_id
+    )
+    query = models.PokemonEvolution.select(
+        models.PokemonEvolution.pokemon, models.PokemonEvolution.depth
+    ).where(models.PokemonEvolution.chain == chain).order_by(
+        models.PokemonEvolution.depth, models.PokemonEvolution.pokemon
+    )
+
+    return list(query.tuples())
+
+
+def get_ancestors(pokemon_id):
+    """Get the pokémons a pokémon evolves from.
+
+    Args:
+        pokemon_id (int): Id of the pokémon.
+
+    Returns:
+        list: Ids of the ancestors, nearest first.
+
+    """
+    query = models.EvolutionClosure.select(
+        models.EvolutionClosure.ancestor
+    ).where(
+        (models.EvolutionClosure.descendant == pokemon_id) &
+        (models.EvolutionClosure.distance > 0)
+    ).order_by(models.EvolutionClosure.distance)
+
+    return [pkm_id for pkm_id, in query.tuples()]
+
+
+def get_descendants(pokemon_id):
+    """Get the pokémons a pokémon can evolve into, directly or not.
+
+    Args:
+        pokemon_id (int): Id of the pokémon.
+
+    Returns:
+        list: Ids of the descendants, nearest first then by id.
+
+    """
+    query = models.EvolutionClosure.select(
+        models.EvolutionClosure.descendant
+    ).where(
+        (models.EvolutionClosure.ancestor == pokemon_id) &
+        (models.EvolutionClosure.distance > 0)
+    ).order_by(
+        models.EvolutionClosure.distance, models.EvolutionClosure.descendant
+    )
+
+    return [pkm_id for pkm_id, in query.tuples()]
@@ -0,0 +1,444 @@
+"""Export of the pokédia database to a memory-mappable columnar file.
+
+The file starts with a small header followed by one section by column:
+
+    magic (4 bytes) | version (uint32) | header size (uint64) | JSON header
+
+Numeric columns are stored as little-endian int64 or float64 arrays that can
+be used in place by numpy. Text columns are arrays of int64 offsets (one more
+than the number of rows) into a string table blob holding utf8 encoded texts.
+Every section is aligned on 8 bytes.
+
+A column holding NULL values has a second section, its null bitmap: bit i
+(least significant bit first) of byte i // 8 is set if row i is NULL. The
+stored value of a NULL is 0, NaN or an empty text, readers must check the
+bitmap to tell them apart from real values.
+
+"""
+
+import json
+import mmap
+import struct
+
+from pokediadb import texts
+from pokediadb import models
+
+
+MAGIC = b"PKDC"
+FORMAT_VERSION = 2
+ALIGNMENT = 8
+
+# Exported models, in dependency order
+EXPORTED_MODELS = (
+    models.Language, models.DamageClass,
+    models.Version, models.VersionTranslation,
+    models.Type, models.TypeEfficacy, models.TypeTranslation,
+    models.Ability, models.AbilityTranslation,
+    models.Move, models.MoveTranslation,
+    models.Pokemon, models.PokemonAbility, models.PokemonTranslation,
+    models.PokemonMove, models.PokemonStat, models.PokemonEvolution,
+    models.EvolutionClosure,
+)
+
+# Storage type by peewee field type
+DTYPES = {
+    "primary_key": "<i8", "int": "<i8", "bool": "<i8", "float": "<f8",
+    "double": "<f8", "string": "str", "text": "str", "fixed_char": "str",
+}
+
+# Typecode of memoryview.cast by storage type
+TYPECODES = {"<i8": "q", "<f8": "d"}
+
+
+def get_table_columns(model):
+    """Get the exported columns of a model's table.
+
+    Args:
+        model (pokediadb.models.BaseModel): Model of the table.
+
+    Returns:
+        list: Tuples of column name and storage type.
+
+    """
+    # pylint: disable=W0212
+    return [
+        (field.db_column, DTYPES[field.get_db_field()])
+        for field in model._meta.sorted_fields
+    ]
+
+
+def get_order_by(model):
+    """Get the primary key columns used to sort the exported rows.
+
+    Args:
+        model (pokediadb.models.BaseModel): Model of the table.
+
+    Returns:
+        str: ORDER BY expression.
+
+    """
+    # pylint: disable=W0212
+    meta = model._meta
+    if meta.composite_key:
+        fields = [meta.fields[name] for name in meta.primary_key.field_names]
+    else:
+        fields = [meta.primary_key]
+
+    return ", ".join("\"{}\"".format(field.db_column) for field in fields)
+
+
+def pad(size):
+    """Get the padding needed to align a size on ALIGNMENT bytes."""
+    return -size % ALIGNMENT
+
+
+def inline_effects(columns, rows):
+    """Put the effects shared by pokediadb.texts back in translation rows.
+
+    Args:
+        columns (list): Tuples of column name and storage type.
+        rows (list): Rows of an AbilityTranslation or MoveTranslation table.
+
+    Returns:
+        list: Rows whose effect column holds the text.
+
+    """
+    names = [name for name, _ in columns]
+    effect, text_id = names.index("effect"), names.index("effect_text_id")
+    return [
+        row[:effect] + (texts.read_effect(row[effect], row[text_id]),) +
+        row[effect + 1:]
+        for row in rows
+    ]
+
+
+def pack_values(dtype, values, strings):
+    """Pack the values of a column, NULL values being 0, NaN or empty.
+
+    Args:
+        dtype (str): Storage type of the column.
+        values (list): Values of the column.
+        strings (bytearray): String table, extended with the texts.
+
+    Returns:
+        bytes: Section of the column.
+
+    """
+    if dtype == "str":
+        string_offsets = [len(strings)]
+        for value in values:
+            if value is not None:
+                strings += value.encode("utf8")
+            string_offsets.append(len(strings))
+        return struct.pack("<{}q".format(len(string_offsets)), *string_offsets)
+    elif dtype == "<i8":
+        return struct.pack("<{}q".format(len(values)), *(
+            0 if v is None else int(v) for v in values
+        ))
+
+    return struct.pack("<{}d".format(len(values)), *(
+        float("nan") if v is None else float(v) for v in values
+    ))
+
+
+def pack_nulls(values):
+    """Pack the null bitmap of a column.
+
+    Args:
+        values (list): Values of the column.
+
+    Returns:
+        bytes: Bitmap with the bit of each NULL value set, None if the column
+            has no NULL value.
+
+    """
+    if all(value is not None for value in values):
+        return None
+
+    bitmap = bytearray((len(values) + 7) // 8)
+    for i, value in enumerate(values):
+        if value is None:
+            bitmap[i >> 3] |= 1 << (i & 7)
+
+    return bytes(bitmap)
+
+
+def append_section(sections, data):
+    """Append a section padded to ALIGNMENT bytes.
+
+    Args:
+        sections (list): Sections written after the header.
+        data (bytes): Content of the new section.
+
+    Returns:
+        int: Offset of the new section after the header.
+
+    """
+    offset = sum(len(section) for section in sections)
+    sections.append(data + b"\0" * pad(len(data)))
+    return offset
+
+
+def is_null(nulls, index):
+    """Check the bit of a row in a null bitmap, None meaning no NULL."""
+    return nulls is not None and bool(nulls[index >> 3] >> (index & 7) & 1)
+
+
+def export_columnar(pkm_db, path):
+    """Export the tables of the database to a columnar file.
+
+    Args:
+        pkm_db (pokedia.models.db): Pokediadb database.
+        path (str): Path of the columnar file to write.
+
+    Returns:
+        dict: Number of exported rows by table name.
+
+    """
+    # pylint: disable=W0212
+    sections = []
+    header = {"tables": {}}
+    strings = bytearray()
+
+    for model in EXPORTED_MODELS:
+        if not model.table_exists():
+            continue
+
+        table = model._meta.db_table
+        columns = get_table_columns(model)
+        rows = pkm_db.execute_sql("SELECT {} FROM \"{}\" ORDER BY {}".format(
+            ", ".join("\"{}\"".format(name) for name, _ in columns), table,
+            get_order_by(model)
+        )).fetchall()
+        if model in texts.TEXT_MODELS:
+            rows = inline_effects(columns, rows)
+
+        table_header = header["tables"][table] = {
+            "rows": len(rows), "columns": []
+        }
+        for i, (name, dtype) in enumerate(columns):
+            values = [row[i] for row in rows]
+            data = pack_values(dtype, values, strings)
+            column = {
+                "name": name, "dtype": dtype,
+                "offset": append_section(sections, data), "length": len(data)
+            }
+
+            nulls = pack_nulls(values)
+            if nulls is not None:
+                column["nulls"] = {
+                    "offset": append_section(sections, nulls),
+                    "length": len(nulls)
+                }
+            table_header["columns"].append(column)
+
+    header["strings"] = {
+        "offset": append_section(sections, bytes(strings)),
+        "length": len(strings)
+    }
+
+    raw_header = json.dumps(header, sort_keys=True).encode("utf8")
+    raw_header += b" " * pad(16 + len(raw_header))
+    with open(path, "wb") as f_columnar:
+        f_columnar.write(MAGIC)
+        f_columnar.write(struct.pack("<IQ", FORMAT_VERSION, len(raw_header)))
+        f_columnar.write(raw_header)
+        for section in sections:
+            f_columnar.write(section)
+
+    return {
+        table: infos["rows"] for table, infos in header["tables"].items()
+    }
+
+
+class StringColumn(object):
+    """Text column of a columnar file, decoded on access.
+
+    Args:
+        offsets (memoryview): int64 offsets of each text in the string table.
+        strings (memoryview): String table blob.
+        nulls (memoryview): Null bitmap of the column, None if it has no
+            NULL value.
+
+    """
+
+    def __init__(self, offsets, strings, nulls=None):
+        self.offsets = offsets
+        self.strings = strings
+        self.nulls = nulls
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("string column index out of range")
+
+        if is_null(self.nulls, index):
+            return None
+
+        start, end = self.offsets[index], self.offsets[index + 1]
+        return bytes(self.strings[start:end]).decode("utf8")
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+
+class NullableColumn(object):
+    """Numeric column of a columnar file holding NULL values.
+
+    Values are read from the mapped file, NULL ones as None. The raw values
+    (0 or NaN for NULL) and the null bitmap stay available for numpy.
+
+    Args:
+        values (memoryview): int64 or float64 values of the column.
+        nulls (memoryview): Null bitmap of the column.
+
+    """
+
+    def __init__(self, values, nulls):
+        self.values = values
+        self.nulls = nulls
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("column index out of range")
+
+        return None if is_null(self.nulls, index) else self.values[index]
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+
+class ColumnarDataset(object):
+    """Read-only view over a memory-mapped columnar file.
+
+    Numeric columns are memoryviews of the mapped file, usable in place with
+    ``numpy.frombuffer``, or NullableColumn objects when they hold NULL
+    values. Text columns are StringColumn objects. NULL values are read as
+    None.
+
+    Args:
+        path (str): Path of the columnar file.
+
+    Raises:
+        ValueError: Raised if the file is not a columnar pokédia file.
+
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f_columnar:
+            self._mmap = mmap.mmap(
+                f_columnar.fileno(), 0, access=mmap.ACCESS_READ
+            )
+
+        if self._mmap[:4] != MAGIC:
+            self.close()
+            raise ValueError("'{}' is not a columnar pokediadb file.".format(
+                path
+            ))
+
+        version, header_size = struct.unpack_from("<IQ", self._mmap, 4)
+        if version != FORMAT_VERSION:
+            self.close()
+            raise ValueError("Unsupported columnar format version {}.".format(
+                version
+            ))
+
+        self._header = json.loads(
+            self._mmap[16:16 + header_size].decode("utf8")
+        )
+        self._data = memoryview(self._mmap)[16 + header_size:]
+        self._strings = self._section(self._header["strings"])
+
+    @property
+    def tables(self):
+        """list: Names of the exported tables."""
+        return sorted(self._header["tables"])
+
+    def rows(self, table):
+        """Get the number of rows of a table.
+
+        Args:
+            table (str): Name of the table.
+
+        Returns:
+            int: Number of rows.
+
+        """
+        return self._header["tables"][table]["rows"]
+
+    def columns(self, table):
+        """Get the columns of a table.
+
+        Args:
+            table (str): Name of the table.
+
+        Returns:
+            dict: Column (memoryview, NullableColumn or StringColumn) by
+                column name.
+
+        """
+        columns = {}
+        for column in self._header["tables"][table]["columns"]:
+            data = self._section(column)
+            nulls = None
+            if "nulls" in column:
+                nulls = self._section(column["nulls"])
+            if column["dtype"] == "str":
+                columns[column["name"]] = StringColumn(
+                    data.cast("q"), self._strings, nulls
+                )
+            elif nulls is not None:
+                columns[column["name"]] = NullableColumn(
+                    data.cast(TYPECODES[column["dtype"]]), nulls
+                )
+            else:
+                columns[column["name"]] = data.cast(TYPECODES[column["dtype"]])
+
+        return columns
+
+    def _section(self, infos):
+        return self._data[infos["offset"]:infos["offset"] + infos["length"]]
+
+    def close(self):
+        """Release the memory-mapped file.
+
+        Columns previously returned must not be used anymore.
+
+        """
+        self._data = self._strings = None
+        try:
+            self._mmap.close()
+        except BufferError:  # pragma: no cover
+            # Columns are still referenced, the mapping is released with them
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+
+def load_columnar(path):
+    """Memory-map a columnar file written by export_columnar.
+
+    Args:
+        path (str): Path of the columnar file.
+
+    Returns:
+        ColumnarDataset: Read-only view over the file.
+
+    Raises:
+        ValueError: Raised if the file is not a columnar pokédia file.
+
+    """
+    return ColumnarDataset(path)
@@ -0,0 +1,191 @@
+"""Move learnsets of pokémons stored as bitsets.
+
+For every pokémon and version group, the PokemonLearnset table holds a bitset
+over move ids: bit n is set when the pokémon can learn the move n. Loaded as
+python integers, questions like "which pokémons can learn these three moves"
+become a mask test by pokémon instead of joins over PokemonMove.
+
+"""
+
+from pokediadb import models
+
+
+def to_bitset(move_ids):
+    """Get the bitset of some moves.
+
+    Args:
+        move_ids (iterable): Ids of the moves.
+
+    Returns:
+        int: Bitset with the bit of each move set.
+
+    """
+    bitset = 0
+    for move_id in move_ids:
+        bitset |= 1 << move_id
+
+    return bitset
+
+
+def to_move_ids(bitset):
+    """Get the moves of a bitset.
+
+    Args:
+        bitset (int): Bitset over move ids.
+
+    Returns:
+        list: Sorted ids of the moves whose bit is set.
+
+    """
+    move_ids = []
+    while bitset:
+        lowest = bitset & -bitset
+        move_ids.append(lowest.bit_length() - 1)
+        bitset ^= lowest
+
+    return move_ids
+
+
+def to_blob(bitset):
+    """Serialize a bitset to little-endian bytes."""
+    return bitset.to_bytes((bitset.bit_length() + 7) // 8, "little")
+
+
+def from_blob(blob):
+    """Deserialize a bitset written by to_blob."""
+    return int.from_bytes(bytes(blob), "little")
+
+
+def build_learnsets(pkm_db):
+    """Build the learnset bitsets of every pokémon from PokemonMove.
+
+    Args:
+        pkm_db (pokedia.models.db): Pokediadb database.
+
+    Raises:
+        peewee.OperationalError: Raised if the pokémon move table hasn't been
+            build.
+
+    """
+    bitsets = {}
+    query = models.PokemonMove.select(
+        models.PokemonMove.pokemon, models.PokemonMove.version_group,
+        models.PokemonMove.move
+    ).tuples()
+    for pkm_id, version_group, move_id in query:
+        key = (pkm_id, version_group)
+        bitsets[key] = bitsets.get(key, 0) | 1 << move_id
+
+    pkm_db.drop_tables([models.PokemonLearnset], safe=True)
+    pkm_db.create_tables([models.PokemonLearnset])
+    with pkm_db.atomic():
+        pkm_db.get_cursor().executemany(
+            "INSERT INTO \"{}\" VALUES (?, ?, ?)".format(
+                models.PokemonLearnset._meta.db_table  # pylint: disable=W0212
+            ), [
+                (pkm_id, version_group, to_blob(bitset))
+                for (pkm_id, version_group), bitset in sorted(bitsets.items())
+            ]
+        )
+
+
+def load_learnsets(version_group=None):
+    """Load the learnset bitsets of the pokémons.
+
+    Args:
+        version_group (int): Id of the version group of the learnsets. If
+            None, the learnsets of every version group are merged.
+
+    Returns:
+        dict: Bitset by pokémon id.
+
+    Raises:
+        peewee.OperationalError: Raised if the learnset table hasn't been
+            build.
+
+    """
+    query = models.PokemonLearnset.select(
+        models.PokemonLearnset.pokemon, models.PokemonLearnset.moves
+    )
+    if version_group is not None:
+        query = query.where(
+            models.PokemonLearnset.version_group == version_group
+        )
+
+    learnsets = {}
+    for pkm_id, blob in query.tuples():
+        learnsets[pkm_id] = learnsets.get(pkm_id, 0) | from_blob(blob)
+
+    return learnsets
+
+
+def learning_all(learnsets, move_ids):
+    """Get the pokémons able to learn every given move.
+
+    Args:
+        learnsets (dict): Bitset by pokémon id, see load_learnsets.
+        move_ids (iterable): Ids of the moves.
+
+    Returns:
+        list: Sorted ids of the pokémons.
+
+    """
+    mask = to_bitset(move_ids)
+    return sorted(
+        pkm_id for pkm_id, bitset in learnsets.items()
+        if bitset & mask == mask
+    )
+
+
+def learning_any(learnsets, move_ids):
+    """Get the pokémons able to learn at least one of the given moves.
+
+    Args:
+        learnsets (dict): Bitset by pokémon id, see load_learnsets.
+        move_ids (iterable): Ids of the moves.
+
+    Returns:
+        list: Sorted ids of the pokémons.
+
+    """
+    mask = to_bitset(move_ids)
+    return sorted(
+        pkm_id for pkm_id, bitset in learnsets.items() if bitset & mask
+    )
+
+
+def common_moves(learnsets, pkm_ids):
+    """Get the moves learned by every given pokémon.
+
+    Args:
+        learnsets (dict): Bitset by pokémon id, see load_learnsets.
+        pkm_ids (iterable): Ids of the pokémons.
+
+    Returns:
+        list: Sorted ids of the moves.
+
+    """
+    bitset = None
+    for pkm_id in pkm_ids:
+        learnset = learnsets.get(pkm_id, 0)
+        bitset = learnset if bitset is None else bitset & learnset
+
+    return to_move_ids(bitset or 0)
+
+
+def all_moves(learnsets, pkm_ids):
+    """Get the moves learned by at least one of the given pokémons.
+
+    Args:
+        learnsets (dict): Bitset by pokémon id, see load_learnsets.
+        pkm_ids (iterable): Ids of the pokémons.
+
+    Returns:
+        list: Sorted ids of the moves.
+
+    """
+    bitset = 0
+    for pkm_id in pkm_ids:
+        bitset |= learnsets.get(pkm_id, 0)
+
+    return to_move_ids(bitset)
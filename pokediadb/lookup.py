@@ -0,0 +1,160 @@
+"""Batch lookups of pokémons, moves, abilities and types.
+
+Instead of one Model.get call by entity, these functions resolve any number
+of ids or translated names with one IN (...) query by table. The queries are
+chunked against the sqlite variable limit.
+
+"""
+
+import operator
+import functools
+
+from pokediadb import models
+from pokediadb.database import get_variable_limit
+
+
+def iter_chunks(values, size):
+    """Split a list of values in chunks.
+
+    Args:
+        values (list): Values to split.
+        size (int): Maximum size of a chunk.
+
+    Yields:
+        list: Chunk of values.
+
+    """
+    for i in range(0, len(values), size):
+        yield values[i:i+size]
+
+
+def get_by_ids(model, ids):
+    """Get the instances of a model from their primary key.
+
+    Args:
+        model (pokediadb.models.BaseModel): Model to get.
+        ids (iterable): Primary keys of the instances.
+
+    Returns:
+        dict: Instance by primary key. Missing keys have no instance.
+
+    """
+    # pylint: disable=W0212
+    pk_field = model._meta.primary_key
+    ids = sorted(set(ids))
+
+    instances = {}
+    for chunk in iter_chunks(ids, get_variable_limit()):
+        for instance in model.select().where(pk_field << chunk):
+            instances[instance._get_pk_value()] = instance
+
+    return instances
+
+
+def get_many(model, trans_model, keys, lang):
+    """Get entities with their translation from their ids or names.
+
+    Args:
+        model (pokediadb.models.BaseModel): Model of the entities.
+        trans_model (pokediadb.models.BaseModel): Translation model of the
+            entities, whose name field is searched.
+        keys (iterable): Ids (int) or translated names (str) of entities.
+        lang (pokediadb.models.Language): Language of the translations
+            and of the names.
+
+    Returns:
+        dict: Tuple of entity and translation by given key. Unknown keys
+            are missing.
+
+    """
+    # pylint: disable=W0212
+    keys = list(dict.fromkeys(keys))
+    fk_field = trans_model._meta.fields[model._meta.name]
+    lang_id = trans_model.lang.db_value(lang)
+
+    # Translations of entities given by id or by name
+    translations = {}
+    names = {}
+    for chunk in iter_chunks(keys, get_variable_limit() - 1):
+        ids = [key for key in chunk if not isinstance(key, str)]
+        chunk_names = [key for key in chunk if isinstance(key, str)]
+        conditions = []
+        if ids:
+            conditions.append(fk_field << ids)
+        if chunk_names:
+            conditions.append(trans_model.name << chunk_names)
+
+        query = trans_model.select().where(
+            (trans_model.lang == lang_id) &
+            functools.reduce(operator.or_, conditions)
+        )
+        for translation in query:
+            entity_id = translation._data[fk_field.name]
+            translations[entity_id] = translation
+            names[translation.name] = entity_id
+
+    entities = get_by_ids(model, translations)
+
+    results = {}
+    for key in keys:
+        entity_id = names.get(key) if isinstance(key, str) else key
+        if entity_id in entities and entity_id in translations:
+            results[key] = (entities[entity_id], translations[entity_id])
+
+    return results
+
+
+def get_pokemons(keys, lang):
+    """Get pokémons with their translation from their ids or names.
+
+    Args:
+        keys (iterable): Ids (int) or translated names (str) of pokémons.
+        lang (pokediadb.models.Language): Language of the translations.
+
+    Returns:
+        dict: Tuple of Pokemon and PokemonTranslation by given key.
+
+    """
+    return get_many(models.Pokemon, models.PokemonTranslation, keys, lang)
+
+
+def get_moves(keys, lang):
+    """Get moves with their translation from their ids or names.
+
+    Args:
+        keys (iterable): Ids (int) or translated names (str) of moves.
+        lang (pokediadb.models.Language): Language of the translations.
+
+    Returns:
+        dict: Tuple of Move and MoveTranslation by given key.
+
+    """
+    return get_many(models.Move, models.MoveTranslation, keys, lang)
+
+
+def get_abilities(keys, lang):
+    """Get abilities with their translation from their ids or names.
+
+    Args:
+        keys (iterable): Ids (int) or translated names (str) of abilities.
+        lang (pokediadb.models.Language): Language of the translations.
+
+    Returns:
+        dict: Tuple of Ability and AbilityTranslation by given key.
+
+    """
+    return get_many(models.Ability, models.AbilityTranslation, keys, lang)
+
+
+def get_types(keys, lang):
+    """Get types with their translation from their ids or names.
+
+    Args:
+        keys (iterable): Ids (int) or translated names (str) of types.
+        lang (pokediadb.models.Language): Language of the translations.
+
+    Returns:
+        dict: Tuple of Type and TypeTranslation by given key.
+
+    """
+    return get_many(models.Type, models.TypeTranslation, keys, lang)
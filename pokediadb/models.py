@@ -1,4 +1,5 @@
 from peewee import Model
+from peewee import BlobField
 from peewee import TextField
 from peewee import CharField
 from peewee import FloatField
@@ -45,6 +46,26 @@ class DamageClass(BaseModel):
     image = CharField(max_length=20)
 
 
+class BuildState(BaseModel):
+    stage = CharField(max_length=30, primary_key=True)
+    options = TextField()
+
+
+# =========================================================================== #
+#                                 Text models                                 #
+# =========================================================================== #
+class Text(BaseModel):
+    id = IntegerField(primary_key=True)
+    hash = FixedCharField(max_length=40, unique=True)
+    codec = IntegerField()
+    data = BlobField()
+
+
+class TextDictionary(BaseModel):
+    id = IntegerField(primary_key=True)
+    data = BlobField()
+
+
 # =========================================================================== #
 #                                Version models                               #
 # =========================================================================== #
@@ -75,6 +96,9 @@ class TypeEfficacy(BaseModel):
     target_type = ForeignKeyField(Type, related_name="defender")
     damage_factor = IntegerField()
 
+    class Meta:
+        primary_key = CompositeKey("damage_type", "target_type")
+
 
 class TypeSlot(BaseModel):
     first = ForeignKeyField(Type, related_name="primary")
@@ -102,7 +126,8 @@ class AbilityTranslation(BaseModel):
     ability = ForeignKeyField(Ability)
     lang = ForeignKeyField(Language)
     name = CharField(max_length=20)
-    effect = TextField()
+    effect = TextField(null=True)
+    effect_text = ForeignKeyField(Text, null=True)
 
     class Meta:
         primary_key = CompositeKey("ability", "lang")
@@ -126,7 +151,8 @@ class MoveTranslation(BaseModel):
     move = ForeignKeyField(Move)
     lang = ForeignKeyField(Language)
     name = CharField(max_length=20)
-    effect = TextField()
+    effect = TextField(null=True)
+    effect_text = ForeignKeyField(Text, null=True)
 
     class Meta:
         primary_key = CompositeKey("move", "lang")
@@ -150,6 +176,9 @@ class PokemonAbility(BaseModel):
     hidden = BooleanField()
     slot = IntegerField()
 
+    class Meta:
+        primary_key = CompositeKey("pokemon", "slot")
+
 
 class PokemonTranslation(BaseModel):
     pokemon = ForeignKeyField(Pokemon)
@@ -164,3 +193,62 @@ class PokemonTranslation(BaseModel):
 class PokemonMove(BaseModel):
     pokemon = ForeignKeyField(Pokemon)
     move = ForeignKeyField(Move)
+    version_group = IntegerField()
+    method = IntegerField()
+    level = IntegerField()
+
+    class Meta:
+        primary_key = CompositeKey(
+            "pokemon", "version_group", "move", "method", "level"
+        )
+
+
+class PokemonLearnset(BaseModel):
+    pokemon = ForeignKeyField(Pokemon)
+    version_group = IntegerField()
+    moves = BlobField()
+
+    class Meta:
+        primary_key = CompositeKey("pokemon", "version_group")
+
+
+class PokemonStat(BaseModel):
+    pokemon = ForeignKeyField(Pokemon, related_name="stats")
+    stat = IntegerField()
+    base = IntegerField()
+    effort = IntegerField()
+
+    class Meta:
+        primary_key = CompositeKey("pokemon", "stat")
+
+
+# =========================================================================== #
+#                               Evolution models                              #
+# =========================================================================== #
+class PokemonEvolution(BaseModel):
+    pokemon = ForeignKeyField(Pokemon, primary_key=True)
+    evolves_from = ForeignKeyField(
+        Pokemon, null=True, related_name="evolutions"
+    )
+    chain = IntegerField(index=True)
+    depth = IntegerField()
+    trigger = IntegerField(null=True)
+    min_level = IntegerField(null=True)
+
+
+class EvolutionClosure(BaseModel):
+    ancestor = ForeignKeyField(Pokemon, related_name="descendants")
+    descendant = ForeignKeyField(Pokemon, related_name="ancestors")
+    distance = IntegerField()
+
+    class Meta:
+        primary_key = CompositeKey("ancestor", "descendant")
+
+
+# Tables only read by their natural key, rebuilt WITHOUT ROWID by
+# pokediadb.compact
+WITHOUT_ROWID_MODELS = (
+    VersionTranslation, TypeEfficacy, TypeTranslation, AbilityTranslation,
+    MoveTranslation, PokemonAbility, PokemonTranslation, PokemonMove,
+    PokemonLearnset, PokemonStat, EvolutionClosure,
+)
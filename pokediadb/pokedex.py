@@ -0,0 +1,142 @@
+"""Denormalized pokédex tables for one-query pokémon lookups.
+
+Each supported language gets a pokedex_<code> table holding, for every
+pokémon, a JSON document with its translated name and genus, its physical
+data and its abilities. Reading a pokémon is then a single lookup by id or by
+name instead of joins over five tables.
+
+"""
+
+import json
+
+from pokediadb import texts
+from pokediadb import models
+
+
+def get_table_name(lang_code):
+    """Get the name of the pokédex table of a language.
+
+    Args:
+        lang_code (str): Code of the language (Language.code).
+
+    Returns:
+        str: Name of the pokédex table.
+
+    """
+    return "pokedex_{}".format(lang_code)
+
+
+def get_documents(pkm_db, language):
+    """Build the pokédex documents of every pokémon in a language.
+
+    Args:
+        pkm_db (pokedia.models.db): Pokediadb database.
+        language (pokediadb.models.Language): Language of the documents.
+
+    Returns:
+        list: Dict describing each pokémon, sorted by pokémon id. Shared
+            ability effects are read from the Text table.
+
+    """
+    # pylint: disable=W0212
+    documents = {}
+    cursor = pkm_db.execute_sql((
+        "SELECT p.id, p.national_id, p.height, p.weight, p.base_xp, t.name, "
+        "t.genus FROM \"{}\" AS p JOIN \"{}\" AS t ON t.pokemon_id = p.id "
+        "WHERE t.lang_id = ? ORDER BY p.id"
+    ).format(
+        models.Pokemon._meta.db_table,
+        models.PokemonTranslation._meta.db_table
+    ), (language.id,))
+    for row in cursor:
+        documents[row[0]] = {
+            "id": row[0], "national_id": row[1], "height": row[2],
+            "weight": row[3], "base_xp": row[4], "name": row[5],
+            "genus": row[6], "abilities": []
+        }
+
+    cursor = pkm_db.execute_sql((
+        "SELECT pa.pokemon_id, pa.ability_id, pa.hidden, pa.slot, t.name, "
+        "t.effect, t.effect_text_id FROM \"{}\" AS pa JOIN \"{}\" AS t "
+        "ON t.ability_id = pa.ability_id AND t.lang_id = ? "
+        "ORDER BY pa.pokemon_id, pa.slot"
+    ).format(
+        models.PokemonAbility._meta.db_table,
+        models.AbilityTranslation._meta.db_table
+    ), (language.id,))
+    for row in cursor:
+        if row[0] in documents:
+            documents[row[0]]["abilities"].append({
+                "id": row[1], "hidden": bool(row[2]), "slot": row[3],
+                "name": row[4], "effect": texts.read_effect(row[5], row[6])
+            })
+
+    return list(documents.values())
+
+
+def build_pokedex_views(pkm_db, languages):
+    """Build the denormalized pokédex table of each supported language.
+
+    Args:
+        pkm_db (pokedia.models.db): Pokediadb database.
+        languages (dict): Dictionary of supported languages.
+
+    Raises:
+        peewee.OperationalError: Raised if pokémon or ability tables haven't
+            been build.
+
+    """
+    for language in languages.values():
+        table = get_table_name(language.code)
+        documents = get_documents(pkm_db, language)
+
+        with pkm_db.atomic():
+            pkm_db.execute_sql("DROP TABLE IF EXISTS \"{}\"".format(table))
+            pkm_db.execute_sql((
+                "CREATE TABLE \"{}\" (pokemon_id INTEGER NOT NULL PRIMARY KEY,"
+                " name TEXT NOT NULL, document TEXT NOT NULL)"
+            ).format(table))
+            pkm_db.execute_sql(
+                "CREATE INDEX \"{0}_name\" ON \"{0}\" (name COLLATE NOCASE)"
+                .format(table)
+            )
+            pkm_db.get_cursor().executemany(
+                "INSERT INTO \"{}\" VALUES (?, ?, ?)".format(table), [
+                    (doc["id"], doc["name"], json.dumps(
+                        doc, ensure_ascii=False, sort_keys=True
+                    ))
+                    for doc in documents
+                ]
+            )
+
+
+def get_pokemon(pkm_db, lang_code, pokemon_id=None, name=None):
+    """Get the pokédex document of a pokémon by its id or its name.
+
+    Args:
+        pkm_db (pokedia.models.db): Pokediadb database.
+        lang_code (str): Code of the language of the document.
+        pokemon_id (int): Id of the pokémon.
+        name (str): Translated name of the pokémon, case insensitive.
+
+    Returns:
+        dict: Pokédex document or None if there is no such pokémon.
+
+    Raises:
+        ValueError: Raised if neither pokemon_id nor name is given.
+        peewee.OperationalError: Raised if the pokédex table hasn't been build
+            for the language.
+
+    """
+    table = get_table_name(lang_code)
+    if pokemon_id is not None:
+        query = "SELECT document FROM \"{}\" WHERE pokemon_id = ?"
+        params = (pokemon_id,)
+    elif name is not None:
+        query = "SELECT document FROM \"{}\" WHERE name = ? COLLATE NOCASE"
+        params = (name,)
+    else:
+        raise ValueError("A pokemon id or name is needed.")
+
+    row = pkm_db.execute_sql(query.format(table), params).fetchone()
+    return json.loads(row[0]) if row is not None else None
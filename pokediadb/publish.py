@@ -0,0 +1,216 @@
+"""Publication of generated databases for long-running readers.
+
+A publish directory holds numbered generations of a database, like
+pokediadb.1.sql and pokediadb.2.sql, and a pointer file, pokediadb.current,
+naming the current one. publish_database moves a new build in place under
+the next generation then replaces the pointer with an atomic rename, so a
+reader either sees the previous generation or the complete new one.
+
+Generations are never modified after publication: readers can open them as
+immutable files, see pokediadb.access.HotSwapPool.
+
+"""
+
+import os
+import re
+import json
+import shutil
+from pathlib import Path
+
+# Number of generations kept by publish_database
+KEEP_GENERATIONS = 2
+
+
+def get_pointer_path(directory, name):
+    """Get the path of the pointer file of a database.
+
+    Args:
+        directory (str): Path to the publish directory.
+        name (str): Name of the database file, like pokediadb.sql.
+
+    Returns:
+        pathlib.Path: Path to the pointer file.
+
+    """
+    return Path(directory) / "{}.current".format(Path(name).stem)
+
+
+def get_generation_path(directory, name, generation):
+    """Get the path of a generation of a database.
+
+    Args:
+        directory (str): Path to the publish directory.
+        name (str): Name of the database file, like pokediadb.sql.
+        generation (int): Number of the generation.
+
+    Returns:
+        pathlib.Path: Path to the generation file.
+
+    """
+    name = Path(name)
+    return Path(directory) / "{}.{}{}".format(
+        name.stem, generation, name.suffix
+    )
+
+
+def get_generations(directory, name):
+    """Get the published generations of a database.
+
+    Args:
+        directory (str): Path to the publish directory.
+        name (str): Name of the database file, like pokediadb.sql.
+
+    Returns:
+        list: Sorted numbers of the generations found in the directory.
+
+    """
+    name = Path(name)
+    pattern = re.compile(r"^{}\.(\d+){}$".format(
+        re.escape(name.stem), re.escape(name.suffix)
+    ))
+
+    generations = []
+    for entry in os.listdir(str(directory)):
+        match = pattern.match(entry)
+        if match:
+            generations.append(int(match.group(1)))
+
+    return sorted(generations)
+
+
+def get_current(directory, name):
+    """Get the current generation of a database.
+
+    Args:
+        directory (str): Path to the publish directory.
+        name (str): Name of the database file, like pokediadb.sql.
+
+    Returns:
+        int: Number of the current generation, None if nothing is published.
+        pathlib.Path: Path to the current generation file, None if nothing
+            is published.
+
+    """
+    try:
+        with get_pointer_path(directory, name).open(encoding="utf8") as f_ptr:
+            pointer = json.load(f_ptr)
+        return pointer["generation"], Path(directory) / pointer["file"]
+    except (OSError, ValueError, KeyError):
+        return None, None
+
+
+def sync_directory(directory):
+    """Flush the entries of a directory to disk, where it is supported."""
+    try:
+        fd = os.open(str(directory), os.O_RDONLY)
+    except OSError:
+        return
+
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def write_pointer(directory, name, generation):
+    """Atomically point the pointer file of a database to a generation.
+
+    Args:
+        directory (str): Path to the publish directory.
+        name (str): Name of the database file, like pokediadb.sql.
+        generation (int): Number of the new current generation.
+
+    """
+    pointer_path = get_pointer_path(directory, name)
+    tmp_path = pointer_path.with_name(pointer_path.name + ".tmp")
+    with tmp_path.open("w", encoding="utf8") as f_ptr:
+        json.dump({
+            "generation": generation,
+            "file": get_generation_path(directory, name, generation).name
+        }, f_ptr)
+        f_ptr.flush()
+        os.fsync(f_ptr.fileno())
+
+    os.replace(str(tmp_path), str(pointer_path))
+    sync_directory(directory)
+
+
+def prune_generations(directory, name, keep=KEEP_GENERATIONS):
+    """Remove the oldest generations of a database.
+
+    Files still opened by a reader may not be removable on some platforms,
+    they are then left for the next publication.
+
+    Args:
+        directory (str): Path to the publish directory.
+        name (str): Name of the database file, like pokediadb.sql.
+        keep (int): Number of most recent generations to keep.
+
+    Returns:
+        list: Numbers of the removed generations.
+
+    """
+    current, _ = get_current(directory, name)
+    removed = []
+    for generation in get_generations(directory, name)[:-keep or None]:
+        if generation == current:
+            continue
+
+        try:
+            os.remove(str(get_generation_path(directory, name, generation)))
+        except OSError:
+            continue
+        removed.append(generation)
+
+    return removed
+
+
+def publish_database(path, directory, keep=KEEP_GENERATIONS):
+    """Publish a built database as the next generation of a directory.
+
+    The database is moved, or copied when the directory is on another file
+    system, next to the other generations under a temporary name, flushed to
+    disk and renamed. The pointer file is then replaced.
+
+    Args:
+        path (str): Path to the built database.
+        directory (str): Path to the publish directory.
+        keep (int): Number of most recent generations to keep.
+
+    Returns:
+        int: Number of the published generation.
+        pathlib.Path: Path to the published file.
+
+    Raises:
+        FileNotFoundError: Raised if the database or the directory does not
+            exist.
+
+    """
+    if not os.path.isfile(path):
+        raise FileNotFoundError("The database '{}' does not exist.".format(
+            path
+        ))
+    if not os.path.isdir(directory):
+        raise FileNotFoundError("The directory '{}' does not exist.".format(
+            directory
+        ))
+
+    name = Path(path).name
+    current, _ = get_current(directory, name)
+    generation = max(
+        [current or 0] + get_generations(directory, name)
+    ) + 1
+    target = get_generation_path(directory, name, generation)
+
+    tmp_path = target.with_name(target.name + ".tmp")
+    shutil.move(path, str(tmp_path))
+    with tmp_path.open("rb+") as f_db:
+        os.fsync(f_db.fileno())
+    os.replace(str(tmp_path), str(target))
+
+    write_pointer(directory, name, generation)
+    prune_generations(directory, name, keep)
+
+    return generation, target
@@ -0,0 +1,176 @@
+"""Full-text search over the translated names and effects.
+
+Each supported language gets its own FTS5 table, named search_<code>, holding
+the names and effects of pokémons, moves and abilities. Queries match word
+prefixes and results are ranked with bm25, names weighing more than effects.
+
+"""
+
+import re
+
+from pokediadb import texts
+from pokediadb import models
+
+
+# FTS5 tokenizer by language code. Diacritics are removed from French texts
+# and queries so that accents are optional.
+TOKENIZERS = {
+    "fr": "unicode61 remove_diacritics 2",
+    "en": "unicode61",
+}
+
+# bm25 weights of the kind, entity_id, name and text columns
+RANK_WEIGHTS = (0.0, 0.0, 10.0, 1.0)
+
+# Searched entities with their translation model, id column and text column
+SEARCHED_MODELS = (
+    ("pokemon", models.PokemonTranslation, "pokemon_id", "genus"),
+    ("move", models.MoveTranslation, "move_id", "effect"),
+    ("ability", models.AbilityTranslation, "ability_id", "effect"),
+)
+
+
+def get_table_name(lang_code):
+    """Get the name of the search table of a language.
+
+    Args:
+        lang_code (str): Code of the language (Language.code).
+
+    Returns:
+        str: Name of the FTS5 table.
+
+    """
+    return "search_{}".format(lang_code)
+
+
+def get_entries(pkm_db, kind, model, id_column, text_column, lang_id):
+    """Get the search entries of the translations of a language.
+
+    Effects moved to the Text table by pokediadb.texts are read from there.
+
+    Args:
+        pkm_db (pokedia.models.db): Pokediadb database.
+        kind (str): Kind of the searched entity.
+        model (pokediadb.models.BaseModel): Translation model.
+        id_column (str): Column of the entity id.
+        text_column (str): Column of the searched text.
+        lang_id (int): Id of the language.
+
+    Returns:
+        list: Tuples of kind, entity id, name and text, ordered by entity id.
+
+    """
+    # pylint: disable=W0212
+    rows = pkm_db.execute_sql((
+        "SELECT \"{0}\", name, \"{1}\", {2} FROM \"{3}\" WHERE lang_id = ? "
+        "ORDER BY \"{0}\""
+    ).format(
+        id_column, text_column,
+        "effect_text_id" if model in texts.TEXT_MODELS else "NULL",
+        model._meta.db_table
+    ), (lang_id,)).fetchall()
+
+    return [
+        (kind, entity_id, name, texts.read_effect(text, text_id))
+        for entity_id, name, text, text_id in rows
+    ]
+
+
+def build_search_index(pkm_db, languages):
+    """Build the FTS5 search table of each supported language.
+
+    Args:
+        pkm_db (pokedia.models.db): Pokediadb database.
+        languages (dict): Dictionary of supported languages.
+
+    Raises:
+        peewee.OperationalError: Raised if sqlite has no FTS5 support.
+
+    """
+    for language in languages.values():
+        table = get_table_name(language.code)
+        tokenizer = TOKENIZERS.get(language.code, "unicode61")
+
+        with pkm_db.atomic():
+            pkm_db.execute_sql("DROP TABLE IF EXISTS \"{}\"".format(table))
+            pkm_db.execute_sql((
+                "CREATE VIRTUAL TABLE \"{}\" USING fts5(kind UNINDEXED, "
+                "entity_id UNINDEXED, name, text, tokenize='{}', "
+                "prefix='2 3')"
+            ).format(table, tokenizer))
+
+            for kind, model, id_column, text_column in SEARCHED_MODELS:
+                # Partial builds may skip some tables
+                if not model.table_exists():
+                    continue
+
+                # Ordered inserts give the same rowids on every build
+                pkm_db.get_cursor().executemany((
+                    "INSERT INTO \"{}\" (kind, entity_id, name, text) "
+                    "VALUES (?, ?, ?, ?)"
+                ).format(table), get_entries(
+                    pkm_db, kind, model, id_column, text_column, language.id
+                ))
+
+            pkm_db.execute_sql((
+                "INSERT INTO \"{0}\" (\"{0}\") VALUES ('optimize')"
+            ).format(table))
+
+
+def get_match_expression(text):
+    """Convert a user's search text into a FTS5 query.
+
+    Each word of the text becomes a prefix query and all of them must match.
+
+    Args:
+        text (str): Searched text.
+
+    Returns:
+        str: FTS5 query, empty if the text contains no word.
+
+    """
+    return " ".join(
+        "\"{}\"*".format(word) for word in re.findall(r"\w+", text)
+    )
+
+
+def search(pkm_db, lang_code, text, kind=None, limit=20):
+    """Search pokémons, moves and abilities by name or effect.
+
+    Args:
+        pkm_db (pokedia.models.db): Pokediadb database.
+        lang_code (str): Code of the language to search in.
+        text (str): Searched text.
+        kind (str): Only search this kind of entity (pokemon, move or
+            ability).
+        limit (int): Maximum number of results.
+
+    Returns:
+        list: Tuples of kind and entity id, best match first.
+
+    Raises:
+        peewee.OperationalError: Raised if the search index hasn't been
+            build for the language.
+
+    """
+    expression = get_match_expression(text)
+    if not expression:
+        return []
+
+    table = get_table_name(lang_code)
+    query = (
+        "SELECT kind, entity_id FROM \"{0}\" WHERE \"{0}\" MATCH ?"
+    ).format(table)
+    params = [expression]
+    if kind is not None:
+        query += " AND kind = ?"
+        params.append(kind)
+
+    query += " ORDER BY bm25(\"{}\", {}) LIMIT ?".format(
+        table, ", ".join(str(weight) for weight in RANK_WEIGHTS)
+    )
+    params.append(limit)
+
+    return [
+        (row[0], row[1]) for row in pkm_db.execute_sql(query, params)
+    ]
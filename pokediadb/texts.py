@@ -0,0 +1,278 @@
+"""Deduplicated and compressed storage of the effect texts.
+
+The effects of AbilityTranslation and MoveTranslation can be moved to the
+shared Text table: every distinct text is stored once, keyed by its sha1
+hash, and translation rows reference it with their effect_text field. Texts
+are stored as is, compressed with zlib or with zstd and a dictionary trained
+on all of them (zstd needs the zstandard package).
+
+get_effect reads the effect of a translation wherever it is stored, and
+read_effect does the same from the effect and effect_text_id columns of a
+raw row. The last decompressed texts are kept in a LRU cache.
+
+"""
+
+import zlib
+import hashlib
+import functools
+
+from pokediadb import models
+from pokediadb.compact import get_key_columns
+
+# Codec of a stored text by name
+PLAIN = 0
+ZLIB = 1
+ZSTD = 2
+CODECS = {"plain": PLAIN, "zlib": ZLIB, "zstd": ZSTD}
+
+# Translation models whose effect can be shared
+TEXT_MODELS = (models.AbilityTranslation, models.MoveTranslation)
+
+# Maximum size in bytes of the trained zstd dictionary
+ZSTD_DICT_SIZE = 16 * 1024
+
+# Number of decompressed texts kept in memory by load_text
+TEXT_CACHE_SIZE = 512
+
+
+def get_zstd():
+    """Import the zstandard package.
+
+    Returns:
+        module: zstandard module.
+
+    Raises:
+        ImportError: Raised if zstandard is not installed.
+
+    """
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError("zstd compression needs the zstandard package.")
+
+    return zstandard
+
+
+def get_hash(text):
+    """Get the hexadecimal sha1 hash of a text."""
+    return hashlib.sha1(text.encode("utf8")).hexdigest()
+
+
+def get_compressor(pkm_db, codec, texts):
+    """Get the function compressing the texts with a codec.
+
+    The zstd dictionary is trained on the texts and saved in the
+    TextDictionary table. Too few texts to train one are compressed without
+    dictionary.
+
+    Args:
+        pkm_db (pokedia.models.db): Pokediadb database.
+        codec (int): Codec of the stored texts.
+        texts (list): Texts to store.
+
+    Returns:
+        callable: Function converting an encoded text to the stored bytes.
+
+    Raises:
+        ImportError: Raised if zstd is asked without the zstandard package.
+
+    """
+    if codec == PLAIN:
+        return bytes
+    elif codec == ZLIB:
+        return lambda raw: zlib.compress(raw, 9)
+
+    zstd = get_zstd()
+    pkm_db.drop_tables([models.TextDictionary], safe=True)
+    pkm_db.create_tables([models.TextDictionary])
+    try:
+        dictionary = zstd.train_dictionary(
+            ZSTD_DICT_SIZE, [text.encode("utf8") for text in texts]
+        )
+    except zstd.ZstdError:
+        return zstd.ZstdCompressor(level=19).compress
+
+    models.TextDictionary.create(id=1, data=dictionary.as_bytes())
+    return zstd.ZstdCompressor(level=19, dict_data=dictionary).compress
+
+
+def share_texts(pkm_db, codec="zlib"):
+    """Move the effects of the translation tables to the Text table.
+
+    Built translation tables get the id of their effect in effect_text and
+    a NULL effect. Previous Text rows are replaced, sharing the texts again
+    only changes their codec.
+
+    Args:
+        pkm_db (pokedia.models.db): Pokediadb database.
+        codec (str): Name of the codec in CODECS.
+
+    Returns:
+        dict: Number of moved effects (effects) and of stored texts (texts),
+            size in bytes of the texts before (raw_size) and after
+            (stored_size) the compression.
+
+    Raises:
+        ImportError: Raised if zstd is asked without the zstandard package.
+        ValueError: Raised if the codec is unknown.
+
+    """
+    # pylint: disable=W0212
+    if codec not in CODECS:
+        raise ValueError("Unknown text codec '{}'.".format(codec))
+
+    # Key and effect of each translation by table, shared effects included
+    # so that sharing again keeps them
+    effects = {}
+    for model in TEXT_MODELS:
+        if not model.table_exists():
+            continue
+
+        columns = get_key_columns(model)
+        effects[model._meta.db_table] = (columns, [
+            row[:-2] + (row[-2] if row[-1] is None else load_text(row[-1]),)
+            for row in pkm_db.execute_sql((
+                "SELECT {}, effect, effect_text_id FROM \"{}\" "
+                "WHERE effect IS NOT NULL OR effect_text_id IS NOT NULL"
+            ).format(
+                ", ".join("\"{}\"".format(col) for col in columns),
+                model._meta.db_table
+            ))
+        ])
+
+    texts = sorted({
+        row[-1] for _, rows in effects.values() for row in rows
+    })
+    text_ids = {text: text_id for text_id, text in enumerate(texts, 1)}
+    stats = {
+        "effects": sum(len(rows) for _, rows in effects.values()),
+        "texts": len(texts), "raw_size": 0, "stored_size": 0
+    }
+    with pkm_db.atomic():
+        pkm_db.drop_tables([models.Text], safe=True)
+        pkm_db.create_tables([models.Text])
+        compress = get_compressor(pkm_db, CODECS[codec], texts)
+
+        rows = []
+        for text, text_id in sorted(text_ids.items(), key=lambda x: x[1]):
+            raw = text.encode("utf8")
+            data = compress(raw)
+            stats["raw_size"] += len(raw)
+            stats["stored_size"] += len(data)
+            rows.append((text_id, get_hash(text), CODECS[codec], data))
+
+        cursor = pkm_db.get_cursor()
+        cursor.executemany(
+            "INSERT INTO \"{}\" VALUES (?, ?, ?, ?)".format(
+                models.Text._meta.db_table
+            ), rows
+        )
+        for table, (columns, table_rows) in effects.items():
+            cursor.executemany((
+                "UPDATE \"{}\" SET effect_text_id = ?, effect = NULL "
+                "WHERE {}"
+            ).format(table, " AND ".join(
+                "\"{}\" = ?".format(col) for col in columns
+            )), [
+                (text_ids[row[-1]],) + tuple(row[:-1]) for row in table_rows
+            ])
+
+    clear_text_cache()
+
+    return stats
+
+
+@functools.lru_cache(maxsize=None)
+def get_decompressor(database, codec):
+    """Get the function decompressing the texts of a database.
+
+    Args:
+        database (str): Path to the database, only used as cache key.
+        codec (int): Codec of the stored texts.
+
+    Returns:
+        callable: Function converting the stored bytes to the encoded text.
+
+    Raises:
+        ImportError: Raised if zstd is asked without the zstandard package.
+
+    """
+    # pylint: disable=W0613
+    if codec == PLAIN:
+        return bytes
+    elif codec == ZLIB:
+        return zlib.decompress
+
+    zstd = get_zstd()
+    dictionary = models.TextDictionary.select().where(
+        models.TextDictionary.id == 1
+    ).first() if models.TextDictionary.table_exists() else None
+    if dictionary is None:
+        return zstd.ZstdDecompressor().decompress
+
+    return zstd.ZstdDecompressor(
+        dict_data=zstd.ZstdCompressionDict(bytes(dictionary.data))
+    ).decompress
+
+
+@functools.lru_cache(maxsize=TEXT_CACHE_SIZE)
+def _load_text(database, text_id):
+    text = models.Text.get(models.Text.id == text_id)
+    decompress = get_decompressor(database, text.codec)
+    return decompress(bytes(text.data)).decode("utf8")
+
+
+def load_text(text_id):
+    """Load a text of the Text table.
+
+    Args:
+        text_id (int): Id of the text.
+
+    Returns:
+        str: Decompressed text.
+
+    Raises:
+        pokediadb.models.Text.DoesNotExist: Raised if the text is missing.
+
+    """
+    return _load_text(models.db.database, text_id)
+
+
+def get_effect(translation):
+    """Get the effect of a translation, inline or shared.
+
+    Args:
+        translation (pokediadb.models.BaseModel): AbilityTranslation or
+            MoveTranslation instance.
+
+    Returns:
+        str: Effect text, None if the translation has none.
+
+    """
+    # pylint: disable=W0212
+    return read_effect(
+        translation.effect, translation._data.get("effect_text")
+    )
+
+
+def read_effect(effect, text_id):
+    """Get an effect from the columns of a translation row.
+
+    Args:
+        effect (str): Value of the effect column.
+        text_id (int): Value of the effect_text_id column.
+
+    Returns:
+        str: Effect text, None if the translation has none.
+
+    """
+    if effect is not None or text_id is None:
+        return effect
+
+    return load_text(text_id)
+
+
+def clear_text_cache():
+    """Forget the decompressed texts and decompressors."""
+    _load_text.cache_clear()
+    get_decompressor.cache_clear()
@@ -2,8 +2,6 @@ import os
 import stat
 import sqlite3
 
-import click
-
 
 def max_sql_variables():  # pragma: no cover
     """Get the maximum number of arguments allowed in a query by the current
@@ -41,6 +39,24 @@ def max_sql_variables():  # pragma: no cover
     return low
 
 
+def fts5_available():
+    """Check if the current sqlite3 implementation supports FTS5 tables.
+
+    Returns:
+        bool: True if FTS5 virtual tables can be created.
+
+    """
+    db = sqlite3.connect(':memory:')
+    try:
+        db.execute('CREATE VIRTUAL TABLE t USING fts5(test)')
+    except sqlite3.OperationalError:
+        return False
+    finally:
+        db.close()
+
+    return True
+
+
 def on_rmtree_error(func, path, _):  # pragma: no cover
     """
     Error handler for ``shutil.rmtree``.
@@ -52,6 +68,8 @@ def on_rmtree_error(func, path, _):  # pragma: no cover
 
     Usage : ``shutil.rmtree(path, onerror=onerror)``
     """
+    import click
+
     if not os.access(path, os.W_OK):
         os.chmod(path, stat.S_IWUSR)
         func(path)
@@ -0,0 +1,173 @@
+"""Configuration of the database variants built by ``generate --variants``.
+
+A variants file is a TOML file with one ``[[variant]]`` table by database::
+
+    [[variant]]
+    name = "pokediadb-gen3-en.sql"
+    languages = ["en"]
+    generation = 3
+    tables = ["versions", "types", "abilities", "moves", "pokemons"]
+    pokedex_view = true
+
+Only ``name`` is required. Every variant is built from one parse of the csv
+files.
+
+"""
+
+from pokediadb.enums import Lang
+from pokediadb.texts import CODECS
+from pokediadb.database import BUILD_STAGES
+from pokediadb.database import STAGE_REQUIREMENTS
+
+
+# Default value by variant option
+DEFAULT_OPTIONS = {
+    "languages": None, "generation": None, "version_group": None,
+    "tables": None, "pokedex_view": False, "columnar": False,
+    "shared_texts": None, "compact": False, "wal": False,
+}
+
+# Expected types by variant option
+OPTION_TYPES = {
+    "name": (str,), "languages": (list,), "generation": (int,),
+    "version_group": (int,), "tables": (list,), "pokedex_view": (bool,),
+    "columnar": (bool,), "shared_texts": (str,), "compact": (bool,),
+    "wal": (bool,),
+}
+
+
+def load_toml(path):
+    """Load a TOML file with tomllib (python 3.11+) or the toml package.
+
+    Args:
+        path (str): Path to the TOML file.
+
+    Returns:
+        dict: Content of the file.
+
+    Raises:
+        ImportError: Raised if no TOML parser is available.
+        ValueError: Raised if the file is not valid TOML.
+
+    """
+    try:
+        import tomllib
+    except ImportError:
+        tomllib = None
+
+    if tomllib is not None:
+        with open(path, "rb") as f_toml:
+            return tomllib.load(f_toml)
+
+    try:
+        import toml
+    except ImportError:
+        raise ImportError(
+            "Reading variants needs python 3.11 or the toml package."
+        )
+
+    with open(path, encoding="utf8") as f_toml:
+        try:
+            return toml.load(f_toml)
+        except toml.TomlDecodeError as err:
+            raise ValueError(str(err))
+
+
+def check_tables(tables, pokedex_view):
+    """Check the tables selected by a variant.
+
+    Args:
+        tables (list): Names of the built stages.
+        pokedex_view (bool): If the pokédex tables are built.
+
+    Raises:
+        ValueError: Raised if a table is unknown or misses the tables it
+            reads.
+
+    """
+    stages = [name for name, _, _ in BUILD_STAGES]
+    for table in tables:
+        if table not in stages:
+            raise ValueError("Unknown tables '{}'.".format(table))
+
+        for required in STAGE_REQUIREMENTS.get(table, ()):
+            if required not in tables:
+                raise ValueError("The {} tables need the {} tables.".format(
+                    table, required
+                ))
+
+    if pokedex_view and "pokemons" not in tables:
+        raise ValueError("The pokedex tables need the pokemons tables.")
+
+
+def check_variant(variant):
+    """Check the options of a variant.
+
+    Args:
+        variant (dict): Options of the variant.
+
+    Raises:
+        ValueError: Raised if an option is unknown, has a wrong type or
+            value, or if a selected table misses the tables it reads.
+
+    """
+    for option, value in variant.items():
+        if option not in OPTION_TYPES:
+            raise ValueError("Unknown variant option '{}'.".format(option))
+
+        # Booleans are integers for isinstance
+        expected = OPTION_TYPES[option]
+        if value is not None and (not isinstance(value, expected) or (
+                isinstance(value, bool) and bool not in expected)):
+            raise ValueError("Invalid value for variant option '{}'.".format(
+                option
+            ))
+
+    for code in variant["languages"] or []:
+        if code not in Lang.__members__:
+            raise ValueError("Unknown language '{}'.".format(code))
+
+    if variant["shared_texts"] not in (None,) + tuple(CODECS):
+        raise ValueError("Unknown text codec '{}'.".format(
+            variant["shared_texts"]
+        ))
+
+    if variant["tables"] is not None:
+        check_tables(variant["tables"], variant["pokedex_view"])
+
+
+def load_variants(path):
+    """Load and check the variants of a variants file.
+
+    Args:
+        path (str): Path to the TOML variants file.
+
+    Returns:
+        list: Options (dict) of each variant, completed with the default
+            values.
+
+    Raises:
+        ImportError: Raised if no TOML parser is available.
+        ValueError: Raised if the file or a variant is invalid, or if two
+            variants have the same name.
+
+    """
+    config = load_toml(path)
+    if not config.get("variant"):
+        raise ValueError("'{}' contains no [[variant]] table.".format(path))
+
+    variants = []
+    for options in config["variant"]:
+        if "name" not in options:
+            raise ValueError("Each variant needs a name.")
+
+        variant = dict(DEFAULT_OPTIONS)
+        variant.update(options)
+        check_variant(variant)
+        variants.append(variant)
+
+    names = [variant["name"] for variant in variants]
+    if len(set(names)) != len(names):
+        raise ValueError("Variant names must be unique.")
+
+    return variants
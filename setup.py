@@ -72,6 +72,11 @@ setup(
     zip_safe=False,
     platforms='any',
     install_requires=DEPENDENCIES,
+    extras_require={
+        'variants': ['toml; python_version < "3.11"'],
+        'zstd': ['zstandard'],
+        'calc': ['numpy'],
+    },
     entry_points={
         'console_scripts': [
             'pokediadb = pokediadb.cli:pokediadb',
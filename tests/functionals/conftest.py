@@ -1,3 +1,5 @@
+import subprocess
+
 import pytest
 from click.testing import CliRunner
 
@@ -6,3 +8,20 @@ from click.testing import CliRunner
 def runner():
     """Allow invoking command as command line scripts in isolation."""
     return CliRunner()
+
+
+@pytest.fixture
+def pokeapi_repo(tmp_context):
+    """Local git repository standing in for the pokeapi repository."""
+    repo = tmp_context.mkdir("pokeapi_repo")
+    tmp_context.join("data/csv").copy(repo.join("data/v2/csv"))
+    repo.join("data/v2/sprites/pokemon/1.png").ensure()
+
+    git = ["git", "-c", "user.name=test", "-c", "user.email=test@test"]
+    subprocess.run(git + ["init", "-q", repo.strpath], check=True)
+    subprocess.run(git + ["-C", repo.strpath, "add", "."], check=True)
+    subprocess.run(
+        git + ["-C", repo.strpath, "commit", "-q", "-m", "data"], check=True
+    )
+
+    return repo
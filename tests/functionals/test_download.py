@@ -25,6 +25,18 @@ def test_dl_pokedia_repo_with_correct_folder_path(runner, tmp_context):
     assert len(sprites.listdir()) > 0
 
 
+def test_dl_pokedia_repo_from_local_repository(
+        runner, tmp_context, pokeapi_repo):
+    result = runner.invoke(
+        pokediadb, ["download", "--repository", pokeapi_repo.strpath]
+    )
+    assert result.exit_code == 0
+
+    assert not tmp_context.join("pokeapi").check()
+    assert tmp_context.join("csv/types.csv").check(file=1)
+    assert tmp_context.join("sprites/pokemon/1.png").check(file=1)
+
+
 def test_dl_pokedia_repo_with_incorrect_folder_path(runner):
     nonexistent_dir = local("/incorrect_path/684546")
     result = runner.invoke(pokediadb, ["download", nonexistent_dir.strpath])
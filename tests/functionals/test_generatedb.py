@@ -1,9 +1,14 @@
+import json
+import sqlite3
+
+import pytest
 from peewee import SqliteDatabase
 from py.path import local
 
 from pokediadb.cli import pokediadb
 from pokediadb.tests import check_output
 from pokediadb.models import Type, TypeEfficacy, TypeTranslation
+from pokediadb.models import Move, Version
 
 
 def test_database_generation_without_args(runner, tmp_context):
@@ -24,6 +29,183 @@ def test_database_generation_without_args(runner, tmp_context):
     assert len(TypeTranslation.select()) == 36
 
 
+def test_database_generation_from_local_repository(
+        runner, tmp_context, pokeapi_repo):
+    result = runner.invoke(
+        pokediadb, ["generate", "-v", "--repository", pokeapi_repo.strpath]
+    )
+    assert result.exit_code == 0
+    assert check_output(result.output, "Extracting sprites folder.")
+
+    assert not tmp_context.join("pokeapi").check()
+    assert tmp_context.join("csv/moves.csv").check(file=1)
+    assert tmp_context.join("sprites/pokemon/1.png").check(file=1)
+
+    db = SqliteDatabase(tmp_context.join("pokediadb.sql").strpath)
+    db.connect()
+    assert len(Type.select()) == 4
+    assert len(TypeTranslation.select()) == 8
+
+
+def test_partial_database_generation_from_local_repository(
+        runner, tmp_context, pokeapi_repo):
+    result = runner.invoke(pokediadb, [
+        "generate", "--repository", pokeapi_repo.strpath, "--version-group",
+        "99"
+    ])
+    assert result.exit_code == 1
+    assert check_output(result.output, "Unknown version group 99.")
+
+    result = runner.invoke(pokediadb, [
+        "generate", "-n", "gen3.sql", "--generation", "3"
+    ])
+    assert result.exit_code == 0
+
+    db = SqliteDatabase(tmp_context.join("gen3.sql").strpath)
+    db.connect()
+    assert len(Move.select()) == 4
+    assert len(Version.select()) == 3
+
+
+def test_resumed_database_generation_from_local_repository(
+        runner, tmp_context, pokeapi_repo):
+    args = ["generate", "-v", "--repository", pokeapi_repo.strpath]
+    result = runner.invoke(pokediadb, args + ["--version-group", "99"])
+    assert result.exit_code == 1
+
+    result = runner.invoke(pokediadb, args + ["--resume"])
+    assert result.exit_code == 0
+    assert check_output(result.output, "Building pokemons tables...")
+
+    result = runner.invoke(pokediadb, args + ["--resume"])
+    assert result.exit_code == 0
+    assert check_output(result.output, "Skipped types tables, already built.")
+
+    db = SqliteDatabase(tmp_context.join("pokediadb.sql").strpath)
+    db.connect()
+    assert len(Type.select()) == 4
+
+
+def test_resumed_generation_with_shared_texts_from_local_repository(
+        runner, tmp_context, pokeapi_repo):
+    args = [
+        "generate", "--repository", pokeapi_repo.strpath, "--shared-texts",
+        "zlib", "--pokedex-view"
+    ]
+    result = runner.invoke(pokediadb, args)
+    assert result.exit_code == 0
+
+    # Effects are already shared when the outputs are built again
+    result = runner.invoke(pokediadb, args + ["--resume"])
+    assert result.exit_code == 0
+
+    with sqlite3.connect(tmp_context.join("pokediadb.sql").strpath) as conn:
+        assert not conn.execute(
+            "SELECT COUNT(*) FROM movetranslation WHERE effect IS NOT NULL"
+        ).fetchone()[0]
+        assert not conn.execute(
+            "SELECT COUNT(*) FROM search_en WHERE kind = 'move' AND "
+            "(text IS NULL OR text = '')"
+        ).fetchone()[0]
+        assert conn.execute(
+            "SELECT COUNT(*) FROM search_en WHERE search_en MATCH 'target'"
+        ).fetchone()[0] == 3
+        document = json.loads(conn.execute(
+            "SELECT document FROM pokedex_en WHERE pokemon_id = 1"
+        ).fetchone()[0])
+        assert all(ability["effect"] for ability in document["abilities"])
+
+
+def test_variants_generation_from_local_repository(
+        runner, tmp_context, pokeapi_repo):
+    tmp_context.join("variants.toml").write_text(
+        "[[variant]]\n"
+        "name = \"full.sql\"\n"
+        "shared_texts = \"zlib\"\n\n"
+        "[[variant]]\n"
+        "name = \"gen3-en.sql\"\n"
+        "languages = [\"en\"]\n"
+        "generation = 3\n"
+        "compact = true\n"
+        "tables = [\"versions\", \"types\", \"moves\"]\n", encoding="utf8"
+    )
+    result = runner.invoke(pokediadb, [
+        "generate", "--repository", pokeapi_repo.strpath, "--variants",
+        "variants.toml", "--jobs", "2"
+    ])
+    assert result.exit_code == 0
+
+    # Variants are built by worker processes, read them with plain sqlite
+    with sqlite3.connect(tmp_context.join("full.sql").strpath) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM type").fetchone() == (4,)
+        assert conn.execute(
+            "SELECT COUNT(*) FROM typetranslation"
+        ).fetchone() == (8,)
+        assert conn.execute(
+            "SELECT COUNT(*) FROM movetranslation WHERE effect IS NULL AND "
+            "effect_text_id IN (SELECT id FROM text)"
+        ).fetchone() == (14,)
+
+    with sqlite3.connect(tmp_context.join("gen3-en.sql").strpath) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM move").fetchone() == (4,)
+        assert conn.execute(
+            "SELECT COUNT(*) FROM typetranslation"
+        ).fetchone() == (4,)
+        assert not conn.execute(
+            "SELECT name FROM sqlite_master WHERE name = 'pokemon'"
+        ).fetchall()
+        assert conn.execute(
+            "SELECT sql FROM sqlite_master WHERE name = 'typetranslation'"
+        ).fetchone()[0].endswith("WITHOUT ROWID")
+
+
+def test_database_diff_and_patch_from_local_repository(
+        runner, tmp_context, pokeapi_repo):
+    for name in ("old.sql", "new.sql"):
+        result = runner.invoke(pokediadb, [
+            "generate", "-n", name, "--repository", pokeapi_repo.strpath,
+            "--pokedex-view"
+        ])
+        assert result.exit_code == 0
+
+    # Generation is deterministic
+    result = runner.invoke(pokediadb, ["diff", "-v", "old.sql", "new.sql"])
+    assert result.exit_code == 0
+    assert check_output(result.output, "0 inserts, 0 updates, 0 deletes")
+
+    with sqlite3.connect(tmp_context.join("new.sql").strpath) as conn:
+        conn.execute("DELETE FROM move WHERE id = 1")
+    result = runner.invoke(pokediadb, ["diff", "old.sql", "new.sql"])
+    assert result.exit_code == 0
+
+    result = runner.invoke(pokediadb, [
+        "patch", "-v", "old.sql", "new.patch"
+    ])
+    assert result.exit_code == 0
+    assert check_output(result.output, "0 inserts, 0 updates, 1 deletes")
+
+    result = runner.invoke(pokediadb, ["patch", "old.sql", "new.patch"])
+    assert result.exit_code == 1
+    assert check_output(result.output, "not the base database")
+
+
+def test_database_publication_from_local_repository(
+        runner, tmp_context, pokeapi_repo):
+    result = runner.invoke(pokediadb, [
+        "generate", "--repository", pokeapi_repo.strpath
+    ])
+    assert result.exit_code == 0
+
+    tmp_context.mkdir("published")
+    result = runner.invoke(pokediadb, [
+        "publish", "-v", "pokediadb.sql", "published"
+    ])
+    assert result.exit_code == 0
+    assert check_output(result.output, "as generation 1.")
+    assert not tmp_context.join("pokediadb.sql").check()
+    assert tmp_context.join("published/pokediadb.1.sql").check(file=1)
+
+
 def test_database_generation_with_csv_and_sprites(runner):
     result = runner.invoke(pokediadb, ["download", "-v"])
     result = runner.invoke(pokediadb, ["generate", "-v"])
@@ -77,3 +259,18 @@ def test_database_generation_with_invalid_names(runner):
     # Invalid extension
     result = runner.invoke(pokediadb, ["generate", "-v", "-n", "test.aze"])
     assert result.exit_code == 2
+
+
+def test_damage_benchmark_from_local_repository(
+        runner, tmp_context, pokeapi_repo):
+    pytest.importorskip("numpy")
+    result = runner.invoke(pokediadb, [
+        "generate", "--repository", pokeapi_repo.strpath
+    ])
+    assert result.exit_code == 0
+
+    result = runner.invoke(pokediadb, [
+        "benchmark", "pokediadb.sql", "--size", "10", "--repeat", "1"
+    ])
+    assert result.exit_code == 0
+    assert check_output(result.output, "matchups/s.")
@@ -0,0 +1,104 @@
+import time
+import sqlite3
+import threading
+
+import pytest
+
+from pokediadb import models
+from pokediadb.access import ReadOnlyPool
+from pokediadb.database import db_init
+from pokediadb.database import build_types
+
+
+@pytest.fixture
+def db_file(tmp_context):
+    db_file = tmp_context.join("pokediadb.sql")
+    pkm_db, languages = db_init(db_file.strpath)
+    build_types(pkm_db, languages, tmp_context.join("data/csv").strpath)
+    pkm_db.close()
+    return db_file
+
+
+def test_pool_reads_from_several_threads(db_file):
+    results = []
+    with ReadOnlyPool(db_file.strpath, max_connections=2) as pool:
+        pool.prepare("type", models.Type.select(models.Type.generation).where(
+            models.Type.id == 0
+        ))
+
+        def read():
+            results.append(pool.execute("type", (10,)))
+
+        threads = [threading.Thread(target=read) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == [[(1,)]] * 8
+        assert pool._created <= 2
+
+        with pytest.raises(sqlite3.OperationalError):
+            pool.execute("DELETE FROM type")
+
+
+def test_pool_connection_limit(db_file):
+    pool = ReadOnlyPool(db_file.strpath, max_connections=1, timeout=0.05)
+    errors = []
+
+    def read():
+        try:
+            pool.execute("SELECT 1")
+        except TimeoutError as err:
+            errors.append(err)
+
+    with pool.connection() as conn:
+        with pool.connection() as nested:
+            assert nested is conn
+
+        thread = threading.Thread(target=read)
+        thread.start()
+        thread.join()
+
+    assert len(errors) == 1
+    assert pool.execute("SELECT 1") == [(1,)]
+
+    pool.close()
+    with pytest.raises(sqlite3.ProgrammingError):
+        pool.execute("SELECT 1")
+
+
+def test_pool_close_wakes_waiting_threads(db_file):
+    pool = ReadOnlyPool(db_file.strpath, max_connections=1, timeout=30)
+    errors = []
+    waiting = threading.Event()
+
+    def read():
+        waiting.set()
+        try:
+            pool.execute("SELECT 1")
+        except sqlite3.ProgrammingError as err:
+            errors.append(err)
+
+    with pool.connection() as conn:
+        thread = threading.Thread(target=read)
+        thread.start()
+        waiting.wait()
+        time.sleep(0.05)
+
+        start = time.monotonic()
+        pool.close()
+        thread.join()
+        assert time.monotonic() - start < 5
+        assert len(errors) == 1
+
+    # Released after the close, the connection is closed too
+    with pytest.raises(sqlite3.ProgrammingError):
+        conn.execute("SELECT 1")
+    with pytest.raises(sqlite3.ProgrammingError):
+        pool.execute("SELECT 1")
+
+
+def test_pool_with_missing_database(tmp_context):
+    with pytest.raises(FileNotFoundError):
+        ReadOnlyPool(tmp_context.join("missing.sql").strpath)
@@ -0,0 +1,91 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from pokediadb import models
+from pokediadb.aio import AsyncReader
+from pokediadb.database import db_init
+from pokediadb.database import build_moves
+from pokediadb.database import build_types
+
+
+@pytest.fixture
+def reader(tmp_context):
+    db_file = tmp_context.join("pokediadb.sql")
+    pkm_db, languages = db_init(db_file.strpath)
+    build_types(pkm_db, languages, tmp_context.join("data/csv").strpath)
+    build_moves(pkm_db, languages, tmp_context.join("data/csv").strpath)
+    pkm_db.close()
+
+    reader = AsyncReader(db_file.strpath, workers=2)
+    yield reader
+    reader.close()
+
+
+def run(coroutine):
+    # Before python 3.5.3, get_event_loop only returns the current loop
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        asyncio.set_event_loop(None)
+        loop.close()
+
+
+def test_get_many_in_one_round_trip(reader):
+    moves = run(reader.get_many(models.Move, [1, 370, 14, 1, 9999]))
+    assert sorted(moves) == [1, 14, 370]
+    assert moves[370]["power"] == 120
+    assert moves[370]["type"] == 2
+
+    names = run(reader.get_many(
+        models.MoveTranslation, [1, 14], field="move", lang=1
+    ))
+    assert names[1]["name"] == "Écras'Face"
+    assert names[14]["lang"] == 1
+
+
+def test_concurrent_identical_requests_are_coalesced(reader, monkeypatch):
+    calls = []
+    execute = reader.pool.execute
+
+    def counted_execute(query, params=()):
+        calls.append(query)
+        return execute(query, params)
+
+    monkeypatch.setattr(reader.pool, "execute", counted_execute)
+
+    async def main():
+        return await asyncio.gather(*(
+            [reader.execute("SELECT id FROM type ORDER BY id")] * 5 +
+            [reader.execute("SELECT count(*) FROM move")]
+        ))
+
+    results = run(main())
+    assert results[:5] == [[(1,), (2,), (7,), (10,)]] * 5
+    assert results[5] == [(7,)]
+    assert len(calls) == 2
+
+
+def test_coalesced_callers_get_their_own_rows(reader):
+    async def main():
+        return await asyncio.gather(
+            reader.get_many(models.Move, [1]),
+            reader.get_many(models.Move, [1])
+        )
+
+    first, second = run(main())
+    first[1]["power"] = None
+    assert second[1]["power"] == 40
+
+
+def test_async_context_closes_the_reader(reader):
+    async def main():
+        async with reader:
+            return await reader.execute("SELECT count(*) FROM type")
+
+    assert run(main()) == [(4,)]
+    with pytest.raises(sqlite3.ProgrammingError):
+        reader.pool.execute("SELECT count(*) FROM type")
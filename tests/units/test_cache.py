@@ -0,0 +1,52 @@
+from pathlib import Path
+from unittest import mock
+
+from pokediadb.dbuilder import type as type_builder
+from pokediadb.dbuilder import cache
+from pokediadb.dbuilder import reader
+from pokediadb.database import build_moves
+from pokediadb.database import build_types
+
+
+def test_parse_results_are_cached(tmp_context):
+    csv_dir = Path(tmp_context.join("data/csv").strpath)
+    pkm_types = type_builder.get_types(csv_dir)
+    assert len(list(csv_dir.joinpath(cache.CACHE_DIR_NAME).iterdir())) == 1
+
+    # The second call doesn't parse the csv file
+    with mock.patch.object(reader, "read_rows", side_effect=AssertionError):
+        assert type_builder.get_types(csv_dir) == pkm_types
+
+    # Other arguments are another entry
+    assert list(type_builder.get_types(csv_dir, generation=0)) == []
+
+
+def test_parse_cache_follows_csv_content(tmp_context):
+    csv_dir = Path(tmp_context.join("data/csv").strpath)
+    assert 10 in type_builder.get_types(csv_dir)
+
+    csv_file = csv_dir / "types.csv"
+    csv_file.write_text(csv_file.read_text().replace("10,fire", "11,fire"))
+    pkm_types = type_builder.get_types(csv_dir)
+    assert 10 not in pkm_types and 11 in pkm_types
+
+    # The entry of the previous content is removed
+    assert len(list(csv_dir.joinpath(cache.CACHE_DIR_NAME).iterdir())) == 1
+
+
+def test_parse_cache_holds_plain_values(tmp_context, db):
+    csv = tmp_context.join("data/csv")
+    build_types(*db, csv.strpath)
+    build_moves(*db, csv.strpath)
+
+    entries = csv.join(cache.CACHE_DIR_NAME).listdir()
+    assert entries
+    for entry in entries:
+        assert b"pokediadb.models" not in entry.read_binary()
+
+
+def test_parse_cache_can_be_disabled(tmp_context, monkeypatch):
+    monkeypatch.setenv("POKEDIADB_PARSE_CACHE", "0")
+    csv_dir = Path(tmp_context.join("data/csv").strpath)
+    type_builder.get_types(csv_dir)
+    assert not csv_dir.joinpath(cache.CACHE_DIR_NAME).exists()
@@ -0,0 +1,147 @@
+import pytest
+
+from pokediadb import calc
+from pokediadb import models
+from pokediadb.database import build_moves
+from pokediadb.database import build_types
+from pokediadb.database import build_abilities
+from pokediadb.database import build_pokemons
+from pokediadb.database import build_pokemon_stats
+
+np = pytest.importorskip("numpy")
+
+# Natures raising special attack and lowering attack, and neutral
+MODEST = 15
+HARDY = 0
+
+
+def build_all(tmp_context, db):
+    csv = tmp_context.join("data/csv").strpath
+    build_types(*db, csv)
+    build_moves(*db, csv)
+    build_abilities(*db, csv)
+    build_pokemons(*db, csv)
+    build_pokemon_stats(*db, csv)
+
+
+def test_stat_data_collection(tmp_context, db):
+    build_all(tmp_context, db)
+
+    # Stats of pokémons above 10000 are skipped
+    assert models.PokemonStat.select().count() == 36
+    charizard = models.PokemonStat.get(
+        (models.PokemonStat.pokemon == 6) & (models.PokemonStat.stat == 4)
+    )
+    assert (charizard.base, charizard.effort) == (109, 3)
+
+
+def test_load_stat_table(tmp_context, db):
+    build_all(tmp_context, db)
+
+    pkm_ids, base = calc.load_stat_table()
+    assert pkm_ids.tolist() == [1, 2, 3, 4, 5, 6]
+    assert base.flags["C_CONTIGUOUS"]
+    assert base[0].tolist() == [45, 49, 49, 65, 65, 45]
+    assert base[5].tolist() == [78, 84, 78, 109, 85, 100]
+
+
+def test_nature_multipliers():
+    multipliers = calc.get_nature_multipliers()
+
+    assert multipliers.shape == (25, 6)
+    assert multipliers[HARDY].tolist() == [10] * 6
+    assert multipliers[MODEST].tolist() == [10, 9, 10, 11, 10, 10]
+    assert (multipliers == 11).sum() == 20
+
+
+def test_compute_stats():
+    bulbasaur = [45, 49, 49, 65, 65, 45]
+    charizard = [78, 84, 78, 109, 85, 100]
+
+    stats = calc.compute_stats([bulbasaur, charizard], [50, 100], [
+        HARDY, MODEST
+    ], evs=[[0] * 6, [0, 0, 0, 252, 0, 0]])
+    assert stats.tolist() == [
+        [120, 69, 69, 85, 85, 65],
+        [297, 183, 192, 348, 206, 236]
+    ]
+
+    # One pokémon at every level
+    stats = calc.compute_stats(bulbasaur, np.arange(1, 101))
+    assert stats.shape == (100, 6)
+    assert stats[49].tolist() == [120, 69, 69, 85, 85, 65]
+
+    shedinja = [1, 90, 45, 30, 30, 40]
+    assert calc.compute_stats(shedinja, 100)[0, 0] == 1
+
+    with pytest.raises(ValueError):
+        calc.compute_stats(bulbasaur, 101)
+    with pytest.raises(ValueError):
+        calc.compute_stats(bulbasaur, 50, ivs=32)
+
+
+def test_compute_pokemon_stats(tmp_context, db):
+    build_all(tmp_context, db)
+    stat_table = calc.load_stat_table()
+
+    stats = calc.compute_pokemon_stats(stat_table, [6, 1, 6], 50)
+    assert stats[1].tolist() == [120, 69, 69, 85, 85, 65]
+    assert stats[0].tolist() == stats[2].tolist()
+
+    with pytest.raises(KeyError):
+        calc.compute_pokemon_stats(stat_table, [1, 150], 50)
+
+
+def test_damage_calculator_tables(tmp_context, db):
+    build_all(tmp_context, db)
+    calculator = calc.DamageCalculator()
+
+    assert calculator.move_ids.tolist() == sorted(
+        move_id for move_id, in models.Move.select(models.Move.id).tuples()
+    )
+    fire, bug = (calculator.type_ids.tolist().index(i) for i in (10, 7))
+    assert calculator.efficacy[fire, bug] == 200
+    assert calculator.efficacy[0].tolist() == [100] * 5
+    assert set(calculator.get_damaging_moves().tolist()) == {1, 370, 488}
+
+
+def test_damage_ranges(tmp_context, db):
+    build_all(tmp_context, db)
+    calculator = calc.DamageCalculator()
+
+    # Charizard against a bulbasaur typed bug, then fighting
+    charizard, bulbasaur = calc.compute_pokemon_stats(
+        calc.load_stat_table(), [6, 1], 50
+    )
+    lowest, highest = calculator.damage_ranges(
+        [charizard], [488, 1, 370, 287], [bulbasaur, bulbasaur], 50,
+        [[10, 0]], [[7, 0], [2, 0]]
+    )
+    assert lowest.shape == highest.shape == (1, 4, 2)
+
+    # Fire move of a fire pokémon: same type bonus and super effective
+    assert (lowest[0, 0, 0], highest[0, 0, 0]) == (86, 104)
+    assert (lowest[0, 0, 1], highest[0, 0, 1]) == (43, 52)
+    # Normal move without bonus, fighting move not very effective on bug
+    assert (lowest[0, 1, 1], highest[0, 1, 1]) == (23, 28)
+    assert highest[0, 2, 0] < highest[0, 2, 1]
+    # Status move
+    assert highest[0, 3].tolist() == [0, 0]
+
+    # Without types, no bonus and neutral efficacy
+    lowest, highest = calculator.damage_ranges(charizard, [488], bulbasaur)
+    assert (lowest[0, 0, 0], highest[0, 0, 0]) == (29, 35)
+
+    with pytest.raises(KeyError):
+        calculator.damage_ranges(charizard, [9999], bulbasaur)
+
+
+def test_benchmark_damage(tmp_context, db):
+    build_all(tmp_context, db)
+    calculator = calc.DamageCalculator()
+
+    stats = calc.benchmark_damage(
+        calculator, calc.load_stat_table(), size=20, repeat=2
+    )
+    assert stats["matchups"] == 20 * 3 * 20
+    assert stats["per_second"] > 0
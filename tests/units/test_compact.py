@@ -0,0 +1,80 @@
+import sqlite3
+
+import pytest
+
+from pokediadb import models
+from pokediadb.compact import compact_database
+from pokediadb.database import db_init
+from pokediadb.database import build_moves
+from pokediadb.database import build_types
+from pokediadb.database import build_pokemons
+from pokediadb.database import build_abilities
+from pokediadb.database import build_pokemon_moves
+
+
+def get_counts(path):
+    with sqlite3.connect(path) as conn:
+        tables = [name for name, in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table'"
+        )]
+        return {
+            model._meta.db_table: conn.execute(
+                "SELECT COUNT(*) FROM \"{}\"".format(model._meta.db_table)
+            ).fetchone()[0]
+            for model in models.WITHOUT_ROWID_MODELS
+            if model._meta.db_table in tables
+        }
+
+
+def test_compact_database(tmp_context):
+    csv = tmp_context.join("data/csv").strpath
+    db_file = tmp_context.join("pokemon.sql").strpath
+    db, languages = db_init(db_file)
+    for build in (build_types, build_moves, build_abilities, build_pokemons,
+                  build_pokemon_moves):
+        build(db, languages, csv)
+    db.close()
+    counts = get_counts(db_file)
+
+    report = compact_database(db_file)
+    assert set(report) == {
+        "size_before", "size_after", "lookup_before", "lookup_after"
+    }
+    assert report["size_after"] < report["size_before"]
+    assert report["lookup_after"] > 0
+    assert get_counts(db_file) == counts
+    assert not tmp_context.join("pokemon.sql.compact").check()
+
+    # Built tables are clustered by their natural key, missing ones skipped
+    with sqlite3.connect(db_file) as conn:
+        tables = dict(conn.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'table'"
+        ))
+        indexes = [name for name, in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index'"
+        )]
+    assert "versiontranslation" not in tables
+    assert tables["typeefficacy"].endswith("WITHOUT ROWID")
+    assert tables["pokemonmove"].endswith("WITHOUT ROWID")
+    assert not tables["pokemon"].endswith("WITHOUT ROWID")
+
+    # Indexes on a prefix of the key are dropped, the other ones kept
+    assert "pokemonability_pokemon_id" not in indexes
+    assert "typeefficacy_damage_type_id" not in indexes
+    assert "pokemonability_ability_id" in indexes
+    assert "typeefficacy_target_type_id" in indexes
+
+    # Compacting again keeps the database readable by the models
+    compact_database(db_file)
+    models.db.init(db_file)
+    models.db.connect()
+    charizard = models.PokemonAbility.select().where(
+        models.PokemonAbility.pokemon == 6
+    ).order_by(models.PokemonAbility.slot)
+    assert [pkm_ability.ability.id for pkm_ability in charizard] == [66, 94]
+    models.db.close()
+
+
+def test_compact_missing_database(tmp_context):
+    with pytest.raises(FileNotFoundError):
+        compact_database(tmp_context.join("missing.sql").strpath)
@@ -4,11 +4,17 @@ import peewee
 from pokediadb import models
 from pokediadb.enums import Lang
 from pokediadb.database import db_init
+from pokediadb.database import run_stage
+from pokediadb.database import bulk_insert
+from pokediadb.database import BUILD_METRICS
 from pokediadb.database import build_moves
 from pokediadb.database import build_types
 from pokediadb.database import build_pokemons
 from pokediadb.database import build_versions
 from pokediadb.database import build_abilities
+from pokediadb.database import load_csv_rows
+from pokediadb.database import get_variant_rows
+from pokediadb.database import get_completed_stages
 
 
 def test_database_initialization_with_correct_path(tmp_context):
@@ -40,6 +46,115 @@ def test_database_initialization_with_already_existing_file(tmp_context):
     )
 
 
+def test_database_initialization_with_resume(tmp_context):
+    db_file = tmp_context.join("pokemon.sql")
+    db, languages = db_init(db_file.strpath)
+    db.close()
+
+    db, resumed_languages = db_init(db_file.strpath, resume=True)
+    assert resumed_languages == languages
+    assert models.Language.select().count() == 2
+    db.close()
+
+
+def test_database_initialization_with_languages(tmp_context):
+    db_file = tmp_context.join("pokemon.sql")
+    db, languages = db_init(db_file.strpath, lang_codes=["en"])
+    assert list(languages) == [Lang.en]
+    assert models.Language.select().count() == 1
+    db.close()
+
+
+def test_csv_rows_are_routed_to_variants(tmp_context):
+    csv = tmp_context.join("data/csv").strpath
+    csv_rows = load_csv_rows(csv)
+
+    assert sorted(csv_rows["pokemon_moves.csv"]) == ["15", "16"]
+    assert len(csv_rows["pokemon.csv"]) > 0
+
+    rows = get_variant_rows(csv, csv_rows)
+    assert len(rows["pokemon_moves.csv"]) == 24
+    assert rows["pokemon.csv"] is csv_rows["pokemon.csv"]
+
+    rows = get_variant_rows(csv, csv_rows, version_group=16)
+    assert len(rows["pokemon_moves.csv"]) == 21
+    assert all(row[1] == "16" for row in rows["pokemon_moves.csv"])
+
+    # Generation 5 stops before both version groups
+    assert get_variant_rows(csv, csv_rows, generation=5)[
+        "pokemon_moves.csv"
+    ] == []
+    assert "pokemon_moves.csv" not in get_variant_rows(
+        csv, csv_rows, tables=["versions", "types"]
+    )
+
+    with pytest.raises(ValueError):
+        get_variant_rows(csv, csv_rows, version_group=99)
+
+
+def test_run_stage_checkpoints(tmp_context, db):
+    csv = tmp_context.join("data/csv").strpath
+    pkm_db, languages = db
+    pkm_db.create_tables([models.BuildState])
+    tables = (models.Type, models.TypeTranslation, models.TypeEfficacy)
+
+    def failing_build(*args):
+        build_types(*args)
+        raise RuntimeError("Interrupted")
+
+    # A failed stage is rolled back and not recorded
+    with pytest.raises(RuntimeError):
+        run_stage(pkm_db, "types", tables, failing_build, pkm_db, languages,
+                  csv)
+    assert not models.Type.table_exists()
+    assert get_completed_stages(pkm_db) == {}
+
+    assert run_stage(pkm_db, "types", tables, build_types, pkm_db, languages,
+                     csv, generation=None)
+    assert not run_stage(pkm_db, "types", tables, build_types, pkm_db,
+                         languages, csv, generation=None)
+    assert models.Type.select().count() == 4
+
+    with pytest.raises(ValueError):
+        run_stage(pkm_db, "types", tables, build_types, pkm_db, languages,
+                  csv, generation=1)
+
+
+def test_bulk_insert_converts_values_with_model_fields(db):
+    pkm_db, languages = db
+    pkm_db.create_tables([models.Type, models.TypeTranslation])
+
+    with pkm_db.atomic():
+        assert bulk_insert(pkm_db, models.Type, [
+            {"id": 1, "generation": 1}, {"id": 10, "generation": 1}
+        ]) == 2
+        assert bulk_insert(pkm_db, models.TypeTranslation, [
+            {"type": 1, "lang": languages[Lang.fr], "name": "Normal"},
+            {"type": 10, "lang": languages[Lang.en], "name": "Fire"},
+        ]) == 2
+
+    fire = models.TypeTranslation.get(models.TypeTranslation.type == 10)
+    assert fire.lang == languages[Lang.en]
+    assert fire.name == "Fire"
+    assert models.Type.select().count() == 2
+
+
+def test_bulk_insert_records_metrics(db):
+    pkm_db, _ = db
+    pkm_db.create_tables([models.Ability])
+    data = [{"id": i, "generation": 1} for i in range(1000, 0, -1)]
+    BUILD_METRICS.clear()
+
+    with pkm_db.atomic():
+        assert bulk_insert(pkm_db, models.Ability, data[:600]) == 600
+        assert bulk_insert(pkm_db, models.Ability, data[600:]) == 400
+
+    assert models.Ability.select().count() == 1000
+    metrics = BUILD_METRICS["ability"]
+    assert metrics["rows"] == 1000
+    assert metrics["seconds"] > 0
+
+
 def test_pokemon_versions_data_collection(tmp_context, db, version_test_data):
     csv = tmp_context.join("data/csv")
     build_versions(*db, csv.strpath)
@@ -103,3 +218,44 @@ def test_pokemon_data_collection(tmp_context, db, pkm_test_data):
         ),
         list(models.PokemonAbility.select())
     )
+
+
+def test_generation_subset_build(tmp_context, db):
+    csv = tmp_context.join("data/csv").strpath
+    subset = {"generation": 3}
+    build_versions(*db, csv, **subset)
+    build_types(*db, csv, **subset)
+    build_abilities(*db, csv, **subset)
+    build_moves(*db, csv, **subset)
+    build_pokemons(*db, csv, **subset)
+
+    assert [v.id for v in models.Version.select()] == [1, 2, 3]
+    assert sorted(m.id for m in models.Move.select()) == [1, 14, 218, 287]
+    assert sorted(a.id for a in models.Ability.select()) == [1, 34, 65, 66]
+    assert models.Pokemon.select().count() == 6
+
+    # Charizard's hidden ability comes from the fourth generation
+    charizard = models.PokemonAbility.select().where(
+        models.PokemonAbility.pokemon == 6
+    )
+    assert [pkm_ability.ability.id for pkm_ability in charizard] == [66]
+
+
+def test_version_group_subset_build(tmp_context, db):
+    csv = tmp_context.join("data/csv").strpath
+    build_versions(*db, csv, version_group=15)
+    build_types(*db, csv, version_group=15)
+    build_moves(*db, csv, version_group=15)
+
+    assert [v.id for v in models.Version.select()] == [23, 24]
+    assert models.Move.select().count() == 7
+    assert models.MoveTranslation.select().count() == 14
+
+
+@pytest.mark.parametrize("subset", [
+    {"version_group": 99}, {"generation": 2, "version_group": 15}
+])
+def test_invalid_subset_build(tmp_context, db, subset):
+    csv = tmp_context.join("data/csv").strpath
+    with pytest.raises(ValueError):
+        build_versions(*db, csv, **subset)
@@ -0,0 +1,126 @@
+import shutil
+import sqlite3
+
+import pytest
+
+from pokediadb import delta
+from pokediadb.database import db_init
+from pokediadb.database import build_types
+from pokediadb.database import build_versions
+
+
+def get_digest(path):
+    with sqlite3.connect(path) as conn:
+        return delta.get_digest(conn)
+
+
+@pytest.fixture
+def databases(tmp_context):
+    csv = tmp_context.join("data/csv").strpath
+    old_file = tmp_context.join("old.sql").strpath
+    new_file = tmp_context.join("new.sql").strpath
+    db, languages = db_init(old_file)
+    build_types(db, languages, csv)
+    build_versions(db, languages, csv)
+    db.close()
+    shutil.copy(old_file, new_file)
+
+    with sqlite3.connect(new_file) as conn:
+        conn.execute("UPDATE typetranslation SET name = 'Normal!' WHERE "
+                     "type_id = 1 AND lang_id = 2")
+        conn.execute("DELETE FROM typeefficacy WHERE damage_type_id = 2")
+        conn.execute("INSERT INTO type VALUES (99, 7)")
+        conn.execute("DROP TABLE versiontranslation")
+        conn.execute("CREATE TABLE blob (id INTEGER PRIMARY KEY, data BLOB)")
+        conn.execute("INSERT INTO blob VALUES (1, ?)", (b"\0\xff",))
+
+    return old_file, new_file
+
+
+def test_diff_and_patch_databases(tmp_context, databases):
+    old_file, new_file = databases
+    patch_file = tmp_context.join("new.patch").strpath
+
+    changes = delta.diff_databases(old_file, new_file)
+    assert changes["drop"] == ["versiontranslation"]
+    assert sorted(changes["tables"]) == [
+        "blob", "type", "typeefficacy", "typetranslation"
+    ]
+    assert delta.get_stats(changes) == {
+        "insert": 2, "update": 1, "delete": 4
+    }
+    assert delta.write_patch(changes, patch_file) < 2048
+
+    stats = delta.apply_patch(old_file, delta.read_patch(patch_file))
+    assert stats == delta.get_stats(changes)
+    assert get_digest(old_file) == get_digest(new_file)
+
+    with sqlite3.connect(old_file) as conn:
+        assert conn.execute("SELECT data FROM blob").fetchone() == (
+            b"\0\xff",
+        )
+
+
+def test_diff_and_patch_index_changes(tmp_context, databases):
+    old_file, new_file = databases
+    with sqlite3.connect(new_file) as conn:
+        conn.execute("DROP INDEX typetranslation_lang_id")
+        conn.execute("CREATE INDEX type_generation ON type (generation)")
+        conn.execute("DROP INDEX typeefficacy_target_type_id")
+        conn.execute("CREATE INDEX typeefficacy_target_type_id ON "
+                     "typeefficacy (target_type_id, damage_factor)")
+
+    changes = delta.diff_databases(old_file, new_file)
+    assert changes["tables"]["type"]["indexes"] == [
+        "CREATE INDEX type_generation ON type (generation)"
+    ]
+    assert changes["tables"]["typetranslation"]["drop_indexes"] == [
+        "typetranslation_lang_id"
+    ]
+    assert changes["tables"]["typeefficacy"]["drop_indexes"] == [
+        "typeefficacy_target_type_id"
+    ]
+
+    delta.apply_patch(old_file, changes)
+    assert get_digest(old_file) == get_digest(new_file)
+    with sqlite3.connect(old_file) as conn:
+        indexes = dict(conn.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'index'"
+        ))
+    assert "typetranslation_lang_id" not in indexes
+    assert indexes["typeefficacy_target_type_id"].endswith(
+        "(target_type_id, damage_factor)"
+    )
+
+
+def test_index_only_changes_are_patched(tmp_context, databases):
+    old_file, _ = databases
+    new_file = tmp_context.join("indexed.sql").strpath
+    shutil.copy(old_file, new_file)
+    with sqlite3.connect(new_file) as conn:
+        conn.execute("CREATE INDEX type_generation ON type (generation)")
+
+    # Same tables and rows, the digest still tells the databases apart
+    assert get_digest(old_file) != get_digest(new_file)
+    changes = delta.diff_databases(old_file, new_file)
+    assert sorted(changes["tables"]) == ["type"]
+    assert delta.get_stats(changes) == {"insert": 0, "update": 0, "delete": 0}
+
+    delta.apply_patch(old_file, changes)
+    assert get_digest(old_file) == get_digest(new_file)
+
+
+def test_patch_other_database(tmp_context, databases):
+    old_file, new_file = databases
+    changes = delta.diff_databases(old_file, new_file)
+    digest = get_digest(new_file)
+
+    # Applying twice is refused and leaves the database unchanged
+    with pytest.raises(ValueError) as err_info:
+        delta.apply_patch(new_file, changes)
+    err_info.match("not the base database")
+    assert get_digest(new_file) == digest
+
+    tmp_context.join("wrong.patch").write_binary(b"PKDPnot zlib")
+    with pytest.raises(ValueError):
+        delta.read_patch(tmp_context.join("wrong.patch").strpath)
@@ -0,0 +1,37 @@
+from pokediadb import models
+from pokediadb import evolution
+from pokediadb.database import build_pokemons
+from pokediadb.database import build_abilities
+from pokediadb.database import build_evolutions
+
+
+def build_all(tmp_context, db):
+    csv = tmp_context.join("data/csv").strpath
+    build_abilities(*db, csv)
+    build_pokemons(*db, csv)
+    build_evolutions(*db, csv)
+
+
+def test_evolution_data_collection(tmp_context, db):
+    build_all(tmp_context, db)
+
+    assert models.PokemonEvolution.select().count() == 6
+    ivysaur = models.PokemonEvolution.get(
+        models.PokemonEvolution.pokemon == 2
+    )
+    assert ivysaur.evolves_from.id == 1
+    assert (ivysaur.chain, ivysaur.depth) == (1, 1)
+    assert (ivysaur.trigger, ivysaur.min_level) == (1, 16)
+
+    # Each pokémon is paired with itself and each of its ancestors
+    assert models.EvolutionClosure.select().count() == 12
+
+
+def test_evolution_lookups(tmp_context, db):
+    build_all(tmp_context, db)
+
+    assert evolution.get_family(5) == [(4, 0), (5, 1), (6, 2)]
+    assert evolution.get_ancestors(3) == [2, 1]
+    assert evolution.get_ancestors(1) == []
+    assert evolution.get_descendants(4) == [5, 6]
+    assert evolution.get_family(150) == []
@@ -0,0 +1,90 @@
+import pytest
+
+from pokediadb import models
+from pokediadb import texts
+from pokediadb import export
+from pokediadb.database import build_abilities
+from pokediadb.database import build_evolutions
+from pokediadb.database import build_moves
+from pokediadb.database import build_pokemons
+from pokediadb.database import build_types
+
+
+def test_columnar_export_and_load(tmp_context, db):
+    csv = tmp_context.join("data/csv").strpath
+    build_types(*db, csv)
+    build_moves(*db, csv)
+    pkm_db, _ = db
+
+    path = tmp_context.join("pokediadb.pkdc").strpath
+    counts = export.export_columnar(pkm_db, path)
+    assert counts["move"] == models.Move.select().count()
+    assert "pokemon" not in counts
+
+    with export.load_columnar(path) as dataset:
+        assert "movetranslation" in dataset.tables
+        moves = dataset.columns("move")
+        assert list(moves["id"]) == sorted(m.id for m in models.Move.select())
+        assert moves["power"].format == "q"
+
+        trans = dataset.columns("movetranslation")
+        expected = sorted(
+            models.MoveTranslation.select(),
+            key=lambda t: (t.move.id, t.lang.id)
+        )
+        assert list(trans["name"]) == [t.name for t in expected]
+        assert trans["effect"][-1] == expected[-1].effect
+
+
+def test_columnar_export_of_null_values(tmp_context, db):
+    csv = tmp_context.join("data/csv").strpath
+    build_abilities(*db, csv)
+    build_pokemons(*db, csv)
+    build_evolutions(*db, csv)
+    pkm_db, _ = db
+
+    path = tmp_context.join("pokediadb.pkdc").strpath
+    export.export_columnar(pkm_db, path)
+    with export.load_columnar(path) as dataset:
+        evolutions = dataset.columns("pokemonevolution")
+        expected = list(models.PokemonEvolution.select().order_by(
+            models.PokemonEvolution.pokemon
+        ))
+        assert expected[0].evolves_from is None
+        assert list(evolutions["evolves_from_id"]) == [
+            e.evolves_from.id if e.evolves_from else None for e in expected
+        ]
+        assert list(evolutions["trigger"]) == [e.trigger for e in expected]
+        assert list(evolutions["min_level"]) == [
+            e.min_level for e in expected
+        ]
+        assert evolutions["min_level"][0] is None
+        assert evolutions["pokemon_id"].format == "q"
+
+
+def test_columnar_export_of_shared_effects(tmp_context, db):
+    csv = tmp_context.join("data/csv").strpath
+    build_types(*db, csv)
+    build_moves(*db, csv)
+    pkm_db, _ = db
+    texts.share_texts(pkm_db, "zlib")
+
+    path = tmp_context.join("pokediadb.pkdc").strpath
+    export.export_columnar(pkm_db, path)
+    with export.load_columnar(path) as dataset:
+        trans = dataset.columns("movetranslation")
+        expected = sorted(
+            models.MoveTranslation.select(),
+            key=lambda t: (t.move.id, t.lang.id)
+        )
+        assert list(trans["effect"]) == [
+            texts.get_effect(t) for t in expected
+        ]
+        assert None not in trans["effect"]
+
+
+def test_load_invalid_columnar_file(tmp_context):
+    path = tmp_context.join("invalid.pkdc")
+    path.write("not a columnar file")
+    with pytest.raises(ValueError):
+        export.load_columnar(path.strpath)
@@ -0,0 +1,56 @@
+import csv
+from pathlib import Path
+
+from pokediadb.enums import Lang
+from pokediadb.dbuilder import flavor
+
+
+def test_flavor_texts_of_one_version_group(tmp_context):
+    csv_file = Path(tmp_context.join("data/csv/move_flavor_text.csv").strpath)
+    with csv_file.open(encoding="utf8") as f_csv:
+        expected = {
+            (int(row[0]), int(row[2])): row[3].replace("\n", " ")
+            for row in list(csv.reader(f_csv))[1:]
+            if row[1] == "15" and int(row[2]) in (Lang.fr, Lang.en)
+        }
+
+    texts = flavor.get_flavor_texts(csv_file, [Lang.fr, Lang.en], 15)
+    assert texts and texts == expected
+    assert flavor.get_index_path(csv_file).exists()
+
+
+def test_flavor_index_is_reused_until_csv_changes(tmp_context, monkeypatch):
+    csv_dir = tmp_context.join("data/csv")
+    csv_file = Path(csv_dir.join("ability_flavor_text.csv").strpath)
+    texts = flavor.get_flavor_texts(csv_file, [Lang.en])
+
+    def fail(_):
+        raise AssertionError("index rebuilt")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(flavor, "build_index", fail)
+        assert flavor.get_flavor_texts(csv_file, [Lang.en]) == texts
+
+    with csv_file.open("a", encoding="utf8") as f_csv:
+        f_csv.write("999,16,9,New ability\n")
+
+    texts = flavor.get_flavor_texts(csv_file, [Lang.en])
+    assert texts[999, Lang.en] == "New ability"
+
+
+def test_flavor_index_with_quoted_version_groups(tmp_context):
+    csv_file = tmp_context.join("flavor.csv")
+    csv_file.write_binary((
+        "move_id,version_group_id,language_id,flavor_text\r\n"
+        "1,15,9,Skipped\r\n"
+        "1,\"16\",9,\"Quoted group, with\nnewline\"\r\n"
+        "\"2\",16,9,Quoted id\r\n"
+        "3,16,5,Autre langue\r\n"
+    ).encode("utf8"))
+    csv_file = Path(csv_file.strpath)
+
+    assert list(flavor.build_index(csv_file)) == ["15", "16"]
+    assert flavor.get_flavor_texts(csv_file, [Lang.en], 16) == {
+        (1, Lang.en): "Quoted group, with newline",
+        (2, Lang.en): "Quoted id",
+    }
@@ -0,0 +1,85 @@
+import os
+import sys
+import subprocess
+
+import pytest
+
+import pokediadb
+
+
+# Cumulative import time budget of pokediadb.models, in microseconds, about
+# 2.5 times the measured import time (90ms)
+MODELS_IMPORT_BUDGET = 250000
+
+CLI_ONLY_MODULES = ("click", "pokediadb.cli", "pokediadb.log")
+
+# Modules only imported by the cli commands using them
+COMMAND_MODULES = (
+    "pokediadb.calc", "pokediadb.delta", "pokediadb.search",
+    "pokediadb.pokedex", "pokediadb.export", "pokediadb.texts",
+    "pokediadb.publish", "pokediadb.access", "pokediadb.variants",
+    "pokediadb.compact",
+)
+
+
+def get_env():
+    """Environment of a fresh interpreter able to import pokediadb."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(
+        pokediadb.__file__
+    )))
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        [root] + [p for p in [env.get("PYTHONPATH")] if p]
+    )
+    return env
+
+
+def imported_modules(module):
+    """Get the modules loaded by importing a module in a fresh interpreter."""
+    output = subprocess.check_output([
+        sys.executable, "-c",
+        "import sys, {}; print(' '.join(sys.modules))".format(module)
+    ], env=get_env(), universal_newlines=True)
+    return set(output.split())
+
+
+def test_models_import_is_minimal():
+    modules = imported_modules("pokediadb.models")
+    assert "peewee" in modules
+    for module in CLI_ONLY_MODULES + ("pokediadb.database",):
+        assert module not in modules
+    assert not any(m.startswith("pokediadb.dbuilder") for m in modules)
+
+
+def test_database_import_loads_builders_lazily():
+    modules = imported_modules("pokediadb.database")
+    for module in CLI_ONLY_MODULES:
+        assert module not in modules
+    assert not any(m.startswith("pokediadb.dbuilder.") for m in modules)
+
+
+def test_cli_import_loads_commands_lazily():
+    modules = imported_modules("pokediadb.cli")
+    for module in COMMAND_MODULES:
+        assert module not in modules
+
+
+def test_cli_shared_text_codecs():
+    from pokediadb import cli
+    from pokediadb import texts
+    assert cli.SHARED_TEXT_CODECS == tuple(sorted(texts.CODECS))
+
+
+@pytest.mark.skipif(sys.version_info < (3, 7), reason="needs -X importtime")
+def test_models_import_time_budget():
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import pokediadb.models"],
+        stderr=subprocess.PIPE, env=get_env(), universal_newlines=True,
+        check=True
+    )
+    cumulative = {
+        line.split("|")[2].strip(): int(line.split("|")[1])
+        for line in result.stderr.splitlines()[1:]
+        if line.startswith("import time:")
+    }
+    assert cumulative["pokediadb.models"] < MODELS_IMPORT_BUDGET
@@ -0,0 +1,53 @@
+from pokediadb import models
+from pokediadb import learnset
+from pokediadb.database import build_moves
+from pokediadb.database import build_types
+from pokediadb.database import build_pokemons
+from pokediadb.database import build_abilities
+from pokediadb.database import build_pokemon_moves
+
+
+def build_all(tmp_context, db):
+    csv = tmp_context.join("data/csv").strpath
+    build_types(*db, csv)
+    build_moves(*db, csv)
+    build_abilities(*db, csv)
+    build_pokemons(*db, csv)
+    build_pokemon_moves(*db, csv)
+
+
+def test_pokemon_moves_data_collection(tmp_context, db):
+    build_all(tmp_context, db)
+
+    # Unknown pokémons and moves are skipped
+    assert models.PokemonMove.select().count() == 22
+    charizard = models.PokemonMove.select().where(
+        models.PokemonMove.pokemon == 6
+    )
+    assert sorted(pkm_move.move.id for pkm_move in charizard) == [
+        1, 14, 218, 370, 488
+    ]
+
+
+def test_bitset_conversions():
+    bitset = learnset.to_bitset([1, 14, 564])
+    assert learnset.to_move_ids(bitset) == [1, 14, 564]
+    assert learnset.from_blob(learnset.to_blob(bitset)) == bitset
+    assert learnset.to_move_ids(0) == []
+
+
+def test_learnset_queries(tmp_context, db):
+    build_all(tmp_context, db)
+    learnset.build_learnsets(db[0])
+
+    learnsets = learnset.load_learnsets(16)
+    assert learnset.learning_all(learnsets, [1, 14]) == [4, 5, 6]
+    assert learnset.learning_all(learnsets, [564]) == [1]
+    assert learnset.learning_any(learnsets, [287, 370]) == [3, 6]
+    assert learnset.common_moves(learnsets, [1, 3]) == [14, 218]
+    assert learnset.all_moves(learnsets, [3, 6]) == [1, 14, 218, 287, 370, 488]
+    assert learnset.common_moves(learnsets, []) == []
+
+    # Merged version groups
+    assert learnset.learning_all(learnset.load_learnsets(15), [1]) == [4]
+    assert learnset.load_learnsets()[1] == learnsets[1]
@@ -0,0 +1,43 @@
+from unittest import mock
+
+from pokediadb import lookup
+from pokediadb import models
+from pokediadb.enums import Lang
+from pokediadb.database import build_types
+from pokediadb.database import build_moves
+from pokediadb.database import build_pokemons
+from pokediadb.database import build_abilities
+
+
+def test_get_pokemons_by_ids_and_names(tmp_context, db):
+    csv = tmp_context.join("data/csv").strpath
+    build_abilities(*db, csv)
+    build_pokemons(*db, csv)
+    _, languages = db
+
+    pkms = lookup.get_pokemons([1, "Salamèche", 999, "Unknown", 1],
+                               languages[Lang.fr])
+    assert sorted(pkms, key=str) == [1, "Salamèche"]
+    pkm, pkm_trans = pkms["Salamèche"]
+    assert pkm.id == 4 and pkm_trans.name == "Salamèche"
+    assert pkms[1][1].name == "Bulbizarre"
+
+    assert lookup.get_pokemons([], languages[Lang.en]) == {}
+
+
+def test_lookups_are_chunked(tmp_context, db):
+    csv = tmp_context.join("data/csv").strpath
+    build_types(*db, csv)
+    build_moves(*db, csv)
+    _, languages = db
+
+    with mock.patch.object(lookup, "get_variable_limit", return_value=2):
+        types = lookup.get_types([1, 2, "Feu", "Insecte"], languages[Lang.fr])
+        moves = lookup.get_moves(["Pound", 218], languages[Lang.en])
+
+    assert sorted(trans.name for _, trans in types.values()) == [
+        "Combat", "Feu", "Insecte", "Normal"
+    ]
+    assert types["Feu"][0].id == 10
+    assert moves["Pound"][0].id == 1
+    assert moves[218][0].type == models.Type.get(models.Type.id == 1)
@@ -0,0 +1,28 @@
+import pytest
+
+from pokediadb import pokedex
+from pokediadb.database import build_pokemons
+from pokediadb.database import build_abilities
+
+
+def test_pokedex_lookup_by_id_and_name(tmp_context, db):
+    csv = tmp_context.join("data/csv").strpath
+    build_abilities(*db, csv)
+    build_pokemons(*db, csv)
+    pokedex.build_pokedex_views(*db)
+    pkm_db, _ = db
+
+    charmander = pokedex.get_pokemon(pkm_db, "fr", pokemon_id=4)
+    assert charmander["name"] == "Salamèche"
+    assert charmander["genus"] == "Lézard"
+    assert charmander["weight"] == 8.5
+    assert [(a["id"], a["slot"], a["hidden"]) for a in
+            charmander["abilities"]] == [(66, 1, False), (94, 3, True)]
+    assert charmander["abilities"][0]["name"] == "Brasier"
+
+    assert pokedex.get_pokemon(pkm_db, "fr", name="salamèche") == charmander
+    assert pokedex.get_pokemon(pkm_db, "en", name="Charmander")["id"] == 4
+    assert pokedex.get_pokemon(pkm_db, "en", pokemon_id=999) is None
+
+    with pytest.raises(ValueError):
+        pokedex.get_pokemon(pkm_db, "en")
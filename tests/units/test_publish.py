@@ -0,0 +1,73 @@
+import shutil
+import sqlite3
+
+import pytest
+
+from pokediadb import publish
+from pokediadb.access import HotSwapPool
+from pokediadb.database import db_init
+from pokediadb.database import build_types
+
+
+@pytest.fixture
+def db_file(tmp_context):
+    db_file = tmp_context.join("pokediadb.sql")
+    pkm_db, languages = db_init(db_file.strpath)
+    build_types(pkm_db, languages, tmp_context.join("data/csv").strpath)
+    pkm_db.close()
+    return db_file
+
+
+def publish_copy(db_file, directory, generation):
+    build = db_file.dirpath().join("build.sql")
+    shutil.copy(db_file.strpath, build.strpath)
+    with sqlite3.connect(build.strpath) as conn:
+        conn.execute("UPDATE type SET generation = ?", (generation,))
+
+    target = directory.join("pokediadb.sql")
+    build.move(target)
+    return publish.publish_database(target.strpath, directory.strpath, 2)
+
+
+def test_publish_database(tmp_context, db_file):
+    directory = tmp_context.mkdir("published")
+    assert publish.get_current(directory.strpath, "pokediadb.sql") == (
+        None, None
+    )
+
+    for generation in (1, 2, 3):
+        assert publish_copy(db_file, directory, generation) == (
+            generation, directory.join(
+                "pokediadb.{}.sql".format(generation)
+            )
+        )
+
+    generation, path = publish.get_current(directory.strpath, "pokediadb.sql")
+    assert generation == 3 and path.name == "pokediadb.3.sql"
+    assert sorted(f.basename for f in directory.listdir()) == [
+        "pokediadb.2.sql", "pokediadb.3.sql", "pokediadb.current"
+    ]
+
+    with pytest.raises(FileNotFoundError):
+        publish.publish_database("missing.sql", directory.strpath)
+
+
+def test_hot_swap_pool(tmp_context, db_file):
+    directory = tmp_context.mkdir("published")
+    with pytest.raises(FileNotFoundError):
+        HotSwapPool(directory.strpath)
+
+    publish_copy(db_file, directory, 1)
+    query = "SELECT DISTINCT generation FROM type"
+    with HotSwapPool(directory.strpath, check_interval=0) as pool:
+        pool.prepare("generation", query)
+        assert pool.execute("generation") == [(1,)]
+
+        # A request in flight keeps its generation until it ends
+        with pool.connection() as conn:
+            publish_copy(db_file, directory, 2)
+            assert pool.execute("generation") == [(1,)]
+            assert conn.execute(query).fetchall() == [(1,)]
+
+        assert pool.execute("generation") == [(2,)]
+        assert pool.generation == 2
@@ -0,0 +1,107 @@
+import csv
+from pathlib import Path
+
+from pokediadb.dbuilder import reader
+
+
+def test_read_rows_matches_csv_module(tmp_context):
+    for csv_file in tmp_context.join("data/csv").listdir():
+        with open(csv_file.strpath, encoding="utf8") as f_csv:
+            expected = list(csv.reader(f_csv))[1:]
+
+        assert list(reader.read_rows(Path(csv_file.strpath))) == expected
+
+
+def test_read_rows_with_quoted_newlines_and_filters(tmp_context):
+    csv_file = tmp_context.join("flavor.csv")
+    csv_file.write_binary((
+        "move_id,version_group_id,language_id,flavor_text\r\n"
+        "1,15,9,\"Skipped\r\nrow\"\r\n"
+        "1,16,9,\"Kept, with\nnewline\"\r\n"
+        "2,16,5,Autre langue\r\n"
+        "\"3\",16,9,Quoted id\r\n"
+    ).encode("utf8"))
+
+    rows = list(reader.read_rows(
+        Path(csv_file.strpath), {1: {b"16"}, 2: {b"9"}}
+    ))
+    assert rows == [
+        ["1", "16", "9", "Kept, with\nnewline"],
+        ["3", "16", "9", "Quoted id"],
+    ]
+
+
+def test_read_rows_filtered_on_last_column(tmp_context):
+    csv_file = tmp_context.join("moves.csv")
+    csv_file.write_binary(
+        b"pokemon_id,version_group_id\r\n1,15\r\n1,16\r\n2,16\r\n3,\r\n"
+    )
+
+    rows = list(reader.read_rows(Path(csv_file.strpath), {1: {b"16"}}))
+    assert rows == [["1", "16"], ["2", "16"]]
+    assert list(reader.read_rows(Path(csv_file.strpath), {1: {b""}})) == [
+        ["3", ""]
+    ]
+
+
+def test_read_rows_of_empty_file(tmp_context):
+    csv_file = tmp_context.join("empty.csv")
+    csv_file.write("")
+    assert list(reader.read_rows(Path(csv_file.strpath))) == []
+
+
+def test_preloaded_rows_are_read_from_memory(tmp_context):
+    csv_file = Path(tmp_context.join("data/csv/pokemon_moves.csv").strpath)
+    expected = list(reader.read_rows(csv_file, {1: {b"15"}}))
+
+    reader.set_preloaded_rows(csv_file.parent, {
+        csv_file.name: list(reader.read_rows(csv_file))
+    })
+    try:
+        csv_file.unlink()
+        assert list(reader.read_rows(csv_file, {1: {b"15"}})) == expected
+        assert len(list(reader.read_rows(csv_file))) == 24
+    finally:
+        reader.clear_preloaded_rows()
+
+
+def test_split_ranges_around_quoted_newlines(tmp_context):
+    csv_file = tmp_context.join("flavor.csv")
+    csv_file.write_binary((
+        "id,flavor_text\n" +
+        "".join("{},\"Line\nwith, \"\"quotes\"\"\n\"\n".format(i)
+                for i in range(50))
+    ).encode("utf8"))
+
+    with open(csv_file.strpath, "rb") as f_csv:
+        buf = f_csv.read()
+    ranges = reader.split_ranges(buf, reader.find_record_end(buf, 0), 7)
+
+    assert len(ranges) == 7
+    assert ranges[0][0] == 15 and ranges[-1][1] == len(buf)
+    for start, end in ranges:
+        assert buf[start:end].count(b"\"") % 2 == 0
+        assert buf[start:end].endswith(b"\"\n")
+
+
+def test_parse_jobs_are_capped_by_cpus(monkeypatch):
+    monkeypatch.setattr(reader.os, "cpu_count", lambda: 2)
+    monkeypatch.setenv("POKEDIADB_PARSE_JOBS", "8")
+    assert reader.get_parse_jobs() == 2
+
+    monkeypatch.setattr(reader.os, "cpu_count", lambda: 1)
+    assert reader.get_parse_jobs() == 1
+
+
+def test_read_rows_in_parallel(tmp_context, monkeypatch):
+    monkeypatch.setattr(reader, "PARALLEL_THRESHOLD", 0)
+    monkeypatch.setattr(reader, "MIN_RANGE_SIZE", 1)
+    monkeypatch.setattr(reader.os, "cpu_count", lambda: 3)
+
+    for name in ("move_flavor_text.csv", "pokemon_moves.csv"):
+        csv_file = Path(tmp_context.join("data/csv", name).strpath)
+        filters = {1: {b"15", b"16"}}
+        assert len(reader.get_ranges(csv_file, 3)) == 3
+        assert list(reader.read_rows(csv_file, filters, parallel=True)) == (
+            list(reader.read_rows(csv_file, filters))
+        )
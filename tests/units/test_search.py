@@ -0,0 +1,35 @@
+from pokediadb import search
+from pokediadb.database import build_moves
+from pokediadb.database import build_types
+from pokediadb.database import build_pokemons
+from pokediadb.database import build_abilities
+
+
+def build_index(tmp_context, db):
+    csv = tmp_context.join("data/csv").strpath
+    build_types(*db, csv)
+    build_abilities(*db, csv)
+    build_moves(*db, csv)
+    build_pokemons(*db, csv)
+    search.build_search_index(*db)
+
+
+def test_search_ignores_accents_in_french(tmp_context, db):
+    build_index(tmp_context, db)
+    pkm_db, _ = db
+
+    assert search.search(pkm_db, "fr", "salameche") == [("pokemon", 4)]
+    assert search.search(pkm_db, "fr", "ÉCRAS") == [("move", 1)]
+    assert search.search(pkm_db, "fr", "regene", kind="ability") == []
+
+
+def test_search_ranks_names_before_effects(tmp_context, db):
+    build_index(tmp_context, db)
+    pkm_db, _ = db
+
+    results = search.search(pkm_db, "en", "chloro")
+    assert results[0] == ("ability", 34)
+    assert sorted(search.search(pkm_db, "en", "flame", kind="pokemon")) == [
+        ("pokemon", 5), ("pokemon", 6)
+    ]
+    assert search.search(pkm_db, "en", "  ") == []
@@ -0,0 +1,52 @@
+import pytest
+
+from pokediadb import models
+from pokediadb import texts
+from pokediadb.database import build_moves
+from pokediadb.database import build_types
+from pokediadb.database import build_abilities
+
+
+def get_effects():
+    return {
+        (model.__name__, translation.name, translation._data["lang"]):
+            texts.get_effect(translation)
+        for model in texts.TEXT_MODELS for translation in model.select()
+    }
+
+
+@pytest.mark.parametrize("codec", ["plain", "zlib", "zstd"])
+def test_share_texts(tmp_context, db, codec):
+    if codec == "zstd":
+        pytest.importorskip("zstandard")
+
+    csv = tmp_context.join("data/csv").strpath
+    pkm_db, languages = db
+    build_types(pkm_db, languages, csv)
+    build_moves(pkm_db, languages, csv)
+    build_abilities(pkm_db, languages, csv)
+    effects = get_effects()
+
+    stats = texts.share_texts(pkm_db, codec)
+    assert stats["effects"] == len(effects)
+    assert stats["texts"] == len(set(effects.values()))
+    assert models.Text.select().count() == stats["texts"]
+    assert not models.MoveTranslation.select().where(
+        models.MoveTranslation.effect.is_null(False)
+    ).exists()
+
+    # Texts are decompressed once then read from the LRU cache
+    assert get_effects() == effects
+    assert get_effects() == effects
+    info = texts._load_text.cache_info()
+    assert info.misses == info.currsize == stats["texts"]
+    assert info.hits == len(effects)
+
+    # Sharing again only replaces the stored texts
+    texts.share_texts(pkm_db, "plain")
+    assert get_effects() == effects
+
+
+def test_share_texts_with_unknown_codec(db):
+    with pytest.raises(ValueError):
+        texts.share_texts(db[0], "lzma")
@@ -0,0 +1,49 @@
+import pytest
+
+from pokediadb import variants
+
+
+@pytest.fixture
+def variants_file(tmp_context):
+    try:
+        import tomllib  # noqa: F401
+    except ImportError:
+        pytest.importorskip("toml")
+
+    return tmp_context.join("variants.toml")
+
+
+def test_load_variants(variants_file):
+    variants_file.write_text(
+        "[[variant]]\n"
+        "name = \"full.sql\"\n\n"
+        "[[variant]]\n"
+        "name = \"gen3-en.sql\"\n"
+        "languages = [\"en\"]\n"
+        "generation = 3\n"
+        "tables = [\"types\", \"moves\"]\n", encoding="utf8"
+    )
+
+    full, gen3 = variants.load_variants(variants_file.strpath)
+    assert full == dict(variants.DEFAULT_OPTIONS, name="full.sql")
+    assert gen3["languages"] == ["en"] and gen3["generation"] == 3
+    assert gen3["tables"] == ["types", "moves"]
+
+
+@pytest.mark.parametrize("content, message", [
+    ("", "contains no"),
+    ("[[variant]]\ngeneration = 3\n", "needs a name"),
+    ("[[variant]]\nname = \"a.sql\"\ncolor = 1\n", "Unknown variant option"),
+    ("[[variant]]\nname = \"a.sql\"\ngeneration = true\n", "Invalid value"),
+    ("[[variant]]\nname = \"a.sql\"\nlanguages = [\"de\"]\n",
+     "Unknown language"),
+    ("[[variant]]\nname = \"a.sql\"\ntables = [\"moves\"]\n",
+     "need the types tables"),
+    ("[[variant]]\nname = \"a.sql\"\n[[variant]]\nname = \"a.sql\"\n",
+     "unique"),
+])
+def test_load_invalid_variants(variants_file, content, message):
+    variants_file.write_text(content, encoding="utf8")
+    with pytest.raises(ValueError) as err_info:
+        variants.load_variants(variants_file.strpath)
+    err_info.match(message)